@@ -1,14 +1,94 @@
 import os
-import requests
+import asyncio
+import logging
+import time
 from dotenv import load_dotenv
 import random
+from typing import List, Optional, Tuple
+
+from catalogo_local import CatalogoLocal, MuestreadorLocal
+from metricas import registro
+from indice_recetas import IndiceRecetas, agregar_platos_locales
+from spoonacular_cache import cache_busquedas
+from spoonacular_circuito import CircuitoAbierto, CircuitoSpoonacular
+from spoonacular_client import ClienteSpoonacular, PoliticaReintentos, SesionSpoonacular
+from sugerencias_precargadas import ReservaSugerencias
 
 # Cargar variables de entorno
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # API Key de Spoonacular
 SPOONACULAR_API_KEY = os.getenv("SPOONACULAR_API_KEY")
-SPOONACULAR_BASE_URL = "https://api.spoonacular.com"
+# Apuntar a spoonacular_simulado.py para pruebas de carga sin red ni cuota
+SPOONACULAR_BASE_URL = os.getenv("SPOONACULAR_BASE_URL", "https://api.spoonacular.com")
+
+# Límites y reintentos de las llamadas a Spoonacular
+SPOONACULAR_TIMEOUT = float(os.getenv("SPOONACULAR_TIMEOUT", "10"))
+SPOONACULAR_MAX_CONEXIONES = int(os.getenv("SPOONACULAR_MAX_CONEXIONES", "20"))
+# SPOONACULAR_REINTENTOS cuenta los intentos totales por búsqueda: 1 = sin reintentos
+REINTENTOS_SPOONACULAR = PoliticaReintentos(intentos=int(os.getenv("SPOONACULAR_REINTENTOS", "3")))
+
+# Tiempo máximo de /generar-menu esperando a la API; lo que falte sale del banco local
+PLAZO_MENU_SEGUNDOS = float(os.getenv("SPOONACULAR_PLAZO_MENU", "8"))
+
+# Cortocircuito compartido: con la API caída, lenta o sin cuota se usan recetas locales al momento
+circuito_spoonacular = CircuitoSpoonacular(
+    umbral_fallos=int(os.getenv("SPOONACULAR_CIRCUITO_UMBRAL", "5")),
+    tiempo_apertura=float(os.getenv("SPOONACULAR_CIRCUITO_SEGUNDOS", "30")),
+    latencia_lenta=float(os.getenv("SPOONACULAR_LATENCIA_LENTA", "5"))
+)
+if not SPOONACULAR_API_KEY:
+    circuito_spoonacular.abrir("sin_api_key", float("inf"))
+
+# Clientes compartidos (conexiones reutilizadas entre búsquedas): asíncrono y síncrono
+cliente_spoonacular = ClienteSpoonacular(
+    SPOONACULAR_BASE_URL, SPOONACULAR_API_KEY, timeout=SPOONACULAR_TIMEOUT,
+    reintentos=REINTENTOS_SPOONACULAR, max_conexiones=SPOONACULAR_MAX_CONEXIONES,
+    circuito=circuito_spoonacular
+)
+sesion_spoonacular = SesionSpoonacular(
+    SPOONACULAR_BASE_URL, SPOONACULAR_API_KEY, timeout=SPOONACULAR_TIMEOUT,
+    reintentos=REINTENTOS_SPOONACULAR, max_conexiones=SPOONACULAR_MAX_CONEXIONES,
+    circuito=circuito_spoonacular
+)
+
+# Métricas del camino de búsqueda de recetas (expuestas en /metrics)
+DURACION_BUSQUEDAS = registro.histograma(
+    "recetas_busqueda_segundos", "Duración de la búsqueda de candidatas de una comida, caché incluida", ("modo",)
+)
+RESPALDOS_LOCALES = registro.contador(
+    "recetas_respaldo_local_total", "Comidas servidas del banco local porque la API no dio candidatas", ("motivo",)
+)
+SUGERENCIAS = registro.contador(
+    "sugerencias_total", "Sugerencias servidas por origen (reserva precargada, búsqueda directa o banco local)",
+    ("origen",)
+)
+_ESTADOS_CIRCUITO = {"cerrado": 0, "semiabierto": 1, "abierto": 2}
+
+
+def _tasa_aciertos_cache() -> Optional[float]:
+    consultas = cache_busquedas.aciertos + cache_busquedas.obsoletos + cache_busquedas.fallos
+    return (cache_busquedas.aciertos + cache_busquedas.obsoletos) / consultas if consultas else None
+
+
+registro.calculada("spoonacular_cache_aciertos_total", "Búsquedas servidas desde la caché vigentes",
+                   lambda: cache_busquedas.aciertos, tipo="counter")
+registro.calculada("spoonacular_cache_obsoletos_total", "Búsquedas servidas desde la caché ya caducadas (revalidándose)",
+                   lambda: cache_busquedas.obsoletos, tipo="counter")
+registro.calculada("spoonacular_cache_fallos_total", "Búsquedas que no estaban en la caché",
+                   lambda: cache_busquedas.fallos, tipo="counter")
+registro.calculada("spoonacular_cache_tasa_aciertos", "Fracción de búsquedas servidas desde la caché",
+                   _tasa_aciertos_cache)
+registro.calculada("spoonacular_cuota_restante", "Puntos de cuota diaria restantes según la última respuesta",
+                   lambda: circuito_spoonacular.cuota_restante)
+registro.calculada("spoonacular_circuito_estado", "Estado del circuito (0 cerrado, 1 semiabierto, 2 abierto)",
+                   lambda: _ESTADOS_CIRCUITO[circuito_spoonacular.estado])
+registro.calculada("spoonacular_circuito_rechazadas_total", "Búsquedas cortadas por el circuito abierto",
+                   lambda: circuito_spoonacular.rechazadas, tipo="counter")
+
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
 
 # Banco de recetas locales para cuando la API no esté disponible
 RECETAS_LOCALES = {
@@ -170,22 +250,20 @@ RECETAS_LOCALES = {
     }
 }
 
-def generar_menu_semanal(preferencias: str = "", restricciones: str = "", tipo_cocina: str = "mediterránea"):
+# Banco local compilado: IDs estables entre procesos y muestreo sin reemplazo
+catalogo_local = CatalogoLocal(RECETAS_LOCALES)
+
+# Índice de preferencias sobre el banco, dietas_2.json y los menús de casa
+agregar_platos_locales(catalogo_local)
+indice_local = IndiceRecetas(catalogo_local)
+
+def parametros_cocina(tipo_cocina: str, restricciones: str) -> Tuple[str, str]:
     """
-    Genera un menú semanal usando Spoonacular API
-    
-    Args:
-        preferencias: Preferencias alimentarias del usuario
-        restricciones: Restricciones dietéticas (vegetariano, sin gluten, etc.)
-        tipo_cocina: Tipo de cocina (mediterránea, asiática, etc.)
+    Traduce el tipo de cocina y las restricciones a los parámetros de Spoonacular
     
     Returns:
-        dict: Menú semanal con comida y cena para cada día
+        tuple: (cuisine, diet)
     """
-    
-    dias = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
-    menu_semanal = {}
-    
     # Mapear tipo de cocina a cuisine de Spoonacular
     cuisine_map = {
         "mediterránea": "mediterranean",
@@ -208,28 +286,90 @@ def generar_menu_semanal(preferencias: str = "", restricciones: str = "", tipo_c
     elif "sin gluten" in restricciones.lower() or "gluten free" in restricciones.lower():
         diet = "gluten free"
     
+    return cuisine, diet
+
+
+def parametros_busqueda(cuisine: str, diet: str, meal_type: str, query: str = "", numero: int = 10) -> dict:
+    """Parámetros de complexSearch para una comida (sin la API key)"""
+    params = {
+        "number": numero,  # Pedimos más recetas para tener variedad
+        "cuisine": cuisine,
+        "type": meal_type if meal_type != "lunch" else "main course",
+        "addRecipeInformation": False,
+        "sort": "random",  # Ordenar aleatoriamente
+    }
+    
+    if diet:
+        params["diet"] = diet
+    
+    if query:
+        params["query"] = query
+    
+    return params
+
+
+# Búsqueda sin restricciones cuando la específica no devuelve resultados
+PARAMETROS_BUSQUEDA_SIMPLE = {
+    "number": 10,
+    "type": "main course",
+    "sort": "random",
+}
+
+# Candidatas pedidas de una vez por comida para toda la semana: siete días con
+# margen para que el filtro de IDs usados no la agote
+CANDIDATOS_POR_RESERVA = 30
+
+# Búsquedas extra por comida si, aun así, la reserva se agota
+MAX_RELLENOS_RESERVA = 2
+
+
+def generar_menu_semanal(preferencias: str = "", restricciones: str = "", tipo_cocina: str = "mediterránea"):
+    """
+    Genera un menú semanal usando Spoonacular API
+    
+    Args:
+        preferencias: Preferencias alimentarias del usuario
+        restricciones: Restricciones dietéticas (vegetariano, sin gluten, etc.)
+        tipo_cocina: Tipo de cocina (mediterránea, asiática, etc.)
+    
+    Returns:
+        dict: Menú semanal con comida y cena para cada día
+    """
+    
+    dias = DIAS_SEMANA
+    menu_semanal = {}
+    
+    cuisine, diet = parametros_cocina(tipo_cocina, restricciones)
+    
     try:
-        # Lista para almacenar IDs de recetas ya usadas y evitar repetición
-        used_recipe_ids = []
+        # Una reserva de candidatas por comida; las recetas se eligen en local
+        comidas = ("lunch", "dinner")
+        muestreador = catalogo_local.muestreador()
+        reservas = {
+            comida: reserva_local(muestreador, cuisine, comida, preferencias) if tiene_recetas_locales(cuisine, comida)
+            else ReservaCandidatos(buscar_candidatos(cuisine, diet, comida, preferencias, CANDIDATOS_POR_RESERVA))
+            for comida in comidas
+        }
+        # IDs de recetas ya usadas para evitar repetición
+        usados = set()
         
         for dia in dias:
-            # Buscar receta para comida (asegurando que sea diferente)
-            lunch_recipe, lunch_id = buscar_receta(cuisine, diet, "lunch", preferencias, used_recipe_ids)
-            used_recipe_ids.append(lunch_id)
-            
-            # Buscar receta para cena (asegurando que sea diferente)
-            dinner_recipe, dinner_id = buscar_receta(cuisine, diet, "dinner", preferencias, used_recipe_ids)
-            used_recipe_ids.append(dinner_id)
-            
-            menu_semanal[dia] = {
-                "lunch": lunch_recipe,
-                "dinner": dinner_recipe
-            }
+            menu_semanal[dia] = {}
+            for comida in comidas:
+                reserva = reservas[comida]
+                while reserva.necesita_relleno(usados):
+                    reserva.rellenar(buscar_candidatos(
+                        cuisine, diet, comida, preferencias, CANDIDATOS_POR_RESERVA, refrescar=True
+                    ))
+                
+                nombre, recipe_id = reserva.elegir(usados) or receta_generica(cuisine)
+                usados.add(recipe_id)
+                menu_semanal[dia][comida] = nombre
         
         return menu_semanal
         
     except Exception as e:
-        print(f"Error al generar menú: {e}")
+        logger.exception("Error al generar menú: %s", e)
         return None
 
 
@@ -248,113 +388,412 @@ def buscar_receta(cuisine: str, diet: str, meal_type: str, query: str = "", excl
         tuple: (nombre de la receta, ID de la receta)
     """
     
-    if exclude_ids is None:
-        exclude_ids = []
+    excluidos = set(exclude_ids or ())
     
-    # Intentar primero usar recetas locales si la API tiene problemas
-    meal_key = "lunch" if meal_type == "lunch" else "dinner"
+    if tiene_recetas_locales(cuisine, meal_type):
+        eleccion = reserva_local(catalogo_local.muestreador(), cuisine, meal_type, query).elegir(excluidos)
+    else:
+        eleccion = elegir_sin_repetir(buscar_candidatos(cuisine, diet, meal_type, query), excluidos)
+    if eleccion is not None:
+        logger.debug("Receta seleccionada: %s", eleccion[0])
+        return eleccion
     
-    if cuisine in RECETAS_LOCALES and meal_key in RECETAS_LOCALES[cuisine]:
-        recetas_disponibles = RECETAS_LOCALES[cuisine][meal_key].copy()
-        
-        # Mezclar para más variedad
-        random.shuffle(recetas_disponibles)
-        
-        # Buscar una receta que no esté en exclude_ids (usando índice como ID)
-        for idx, receta in enumerate(recetas_disponibles):
-            recipe_id = hash(receta) % 10000  # Generar un ID único basado en el nombre
-            if recipe_id not in exclude_ids:
-                print(f"✨ Receta local seleccionada: {receta}")
-                return (receta, recipe_id)
-        
-        # Si todas están usadas, usar la primera
-        if recetas_disponibles:
-            receta = recetas_disponibles[0]
-            recipe_id = hash(receta) % 10000
-            print(f"⚠️ Reutilizando receta local: {receta}")
-            return (receta, recipe_id)
+    return receta_generica(cuisine)
+
+
+def receta_generica(cuisine: str) -> Tuple[str, int]:
+    """Receta de relleno cuando ni la API ni el banco local dan candidatas"""
+    logger.warning("Sin candidatas para %s, usando receta genérica", cuisine)
+    return (f"Receta {cuisine.capitalize()}", random.randint(1000, 9999))
+
+
+def tiene_recetas_locales(cuisine: str, meal_type: str) -> bool:
+    """Indica si la cocina se sirve desde el banco local, sin llamar a la API"""
+    return catalogo_local.ids(cuisine, meal_type) is not None
+
+
+def candidatos_locales(cuisine: str, meal_type: str) -> Optional[List[Tuple[str, int]]]:
+    """
+    Recetas del banco local para una cocina
     
-    params = {
-        "apiKey": SPOONACULAR_API_KEY,
-        "number": 10,  # Pedimos más recetas para tener variedad
-        "cuisine": cuisine,
-        "type": meal_type if meal_type != "lunch" else "main course",
-        "addRecipeInformation": False,
-        "sort": "random",  # Ordenar aleatoriamente
-    }
+    Returns:
+        list: Pares (nombre, ID estable), o None si la cocina no está en el banco local
+    """
+    return catalogo_local.candidatos(cuisine, meal_type)
+
+
+def cocina_respaldo(cuisine: str, meal_type: str) -> str:
+    """
+    Cocina del banco local que sustituye a la API cuando no da candidatas
     
-    if diet:
-        params["diet"] = diet
+    Las cocinas sin banco local (saludable, vegetariana...) usan el mediterráneo.
+    """
+    return cuisine if tiene_recetas_locales(cuisine, meal_type) else "mediterranean"
+
+
+def candidatos_respaldo(cuisine: str, meal_type: str) -> List[Tuple[str, int]]:
+    """Recetas locales para cuando la API no da candidatas"""
+    return candidatos_locales(cocina_respaldo(cuisine, meal_type), meal_type)
+
+
+def elegir_sin_repetir(candidatos: List[Tuple[str, int]], usados) -> Optional[Tuple[str, int]]:
+    """
+    Elige al azar un candidato cuyo ID no esté usado; si todos lo están, el primero
     
-    if query:
-        params["query"] = query
+    Returns:
+        tuple: (nombre, ID), o None si no hay candidatos
+    """
+    disponibles = [candidato for candidato in candidatos if candidato[1] not in usados]
+    if disponibles:
+        return random.choice(disponibles)
+    if candidatos:
+        logger.info("Todas las candidatas excluidas, repitiendo: %s", candidatos[0][0])
+        return candidatos[0]
+    return None
+
+
+class ReservaCandidatos:
+    """
+    Candidatas de una comida (cocina, dieta, tipo) para toda la semana
     
-    try:
-        print(f"🔍 Buscando receta: cuisine={cuisine}, meal={meal_type}, diet={diet}")
-        print(f"📡 API URL: {SPOONACULAR_BASE_URL}/recipes/complexSearch")
-        print(f"🔑 API Key presente: {'Sí' if SPOONACULAR_API_KEY else 'No'}")
+    Se piden de una vez y las siete recetas se sortean en local. Solo se
+    vuelve a la API cuando los IDs ya usados agotan la reserva.
+    """
+    
+    def __init__(self, candidatos: List[Tuple[str, int]]):
+        """
+        Args:
+            candidatos: Pares (nombre, ID) de la búsqueda inicial
+        """
+        self.candidatos = list(candidatos)
+        self.rellenos = 0
+    
+    def necesita_relleno(self, usados) -> bool:
+        """
+        True si la reserva está agotada y aún quedan rellenos
         
-        response = requests.get(
-            f"{SPOONACULAR_BASE_URL}/recipes/complexSearch",
-            params=params,
-            timeout=10
+        Una reserva vacía no se rellena: la búsqueda inicial ya falló y
+        repetirla solo alargaría la petición.
+        """
+        return (
+            bool(self.candidatos)
+            and self.rellenos < MAX_RELLENOS_RESERVA
+            and all(recipe_id in usados for _, recipe_id in self.candidatos)
         )
+    
+    def rellenar(self, candidatos: List[Tuple[str, int]]):
+        """Añade las candidatas de una búsqueda extra, sin duplicar IDs"""
+        self.rellenos += 1
+        conocidos = {recipe_id for _, recipe_id in self.candidatos}
+        self.candidatos.extend(c for c in candidatos if c[1] not in conocidos)
+    
+    def elegir(self, usados) -> Optional[Tuple[str, int]]:
+        return elegir_sin_repetir(self.candidatos, usados)
+
+
+class ReservaLocal:
+    """
+    Reserva de una comida servida desde el banco local
+    
+    Misma interfaz que ReservaCandidatos, pero las recetas salen del
+    muestreador sin reemplazo de la petición y nunca se va a la API. Los
+    platos preferidos, si los hay, se sirven antes y en su orden.
+    """
+    
+    def __init__(self, muestreador: MuestreadorLocal, cuisine: str, meal_type: str,
+                 preferidas: List[Tuple[str, int]] = ()):
+        self.muestreador = muestreador
+        self.cuisine = cuisine
+        self.meal_type = meal_type
+        self.preferidas = list(preferidas)
+        self._siguiente_preferida = 0
+    
+    def necesita_relleno(self, usados) -> bool:
+        return False
+    
+    def rellenar(self, candidatos: List[Tuple[str, int]]):
+        pass
+    
+    def elegir(self, usados) -> Optional[Tuple[str, int]]:
+        """Extrae una receta no usada, primero de las preferidas; agotado el banco, repite la primera"""
+        # Los usados solo crecen: las preferidas ya descartadas no se vuelven a mirar
+        while self._siguiente_preferida < len(self.preferidas):
+            candidato = self.preferidas[self._siguiente_preferida]
+            self._siguiente_preferida += 1
+            if candidato[1] not in usados:
+                return candidato
         
-        print(f"📊 Status Code: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Resultados recibidos: {len(data.get('results', []))} recetas")
-            
-            if data.get("results") and len(data["results"]) > 0:
-                # Filtrar recetas que no estén en la lista de excluidas
-                available_recipes = [r for r in data["results"] if r["id"] not in exclude_ids]
-                print(f"🎲 Recetas disponibles después de filtrar: {len(available_recipes)}")
-                
-                if available_recipes:
-                    # Seleccionar una receta aleatoria de las disponibles
-                    selected_recipe = random.choice(available_recipes)
-                    print(f"✨ Receta seleccionada: {selected_recipe['title']}")
-                    return (selected_recipe["title"], selected_recipe["id"])
-                elif data["results"]:
-                    # Si todas están excluidas, usar la primera disponible
-                    selected_recipe = data["results"][0]
-                    print(f"⚠️ Todas excluidas, usando: {selected_recipe['title']}")
-                    return (selected_recipe["title"], selected_recipe["id"])
-            
+        eleccion = self.muestreador.extraer(self.cuisine, self.meal_type, usados)
+        if eleccion is None:
+            eleccion = elegir_sin_repetir(candidatos_locales(self.cuisine, self.meal_type), usados)
+        return eleccion
+
+
+def reserva_local(muestreador: MuestreadorLocal, cuisine: str, meal_type: str, preferencias: str = "") -> ReservaLocal:
+    """
+    Reserva del banco local que tiene en cuenta las preferencias
+    
+    Los platos de la cocina pedida que encajan con las preferencias van
+    delante de los sorteados. Solo si esa cocina no tiene ninguno se toma
+    el mejor de otras cocinas o fuentes del índice local.
+    """
+    preferidas = []
+    if preferencias:
+        preferidas = indice_local.buscar(preferencias, meal_type, cuisine, rng=muestreador.rng)
+    return ReservaLocal(muestreador, cuisine, meal_type, preferidas)
+
+
+def buscar_en_spoonacular(params: dict, refrescar: bool = False) -> Optional[List[dict]]:
+    """
+    complexSearch a través de la caché persistente
+    
+    Args:
+        params: Parámetros de la búsqueda (sin la API key)
+        refrescar: Saltarse la lectura de la caché (para pedir recetas nuevas)
+    """
+    logger.debug("Buscando recetas: %s", params)
+    if refrescar:
+        resultados = sesion_spoonacular.complex_search(params)
+        if resultados is not None:
+            cache_busquedas.guardar(params, resultados)
+        return resultados
+    
+    return cache_busquedas.obtener_o_buscar(params, lambda: sesion_spoonacular.complex_search(params))
+
+
+async def buscar_en_spoonacular_async(params: dict, refrescar: bool = False) -> Optional[List[dict]]:
+    """Como buscar_en_spoonacular, con el cliente asíncrono compartido"""
+    if refrescar:
+        resultados = await cliente_spoonacular.complex_search(params)
+        if resultados is not None:
+            await asyncio.to_thread(cache_busquedas.guardar, params, resultados)
+        return resultados
+    
+    return await cache_busquedas.obtener_o_buscar_async(params, lambda: cliente_spoonacular.complex_search(params))
+
+
+def _candidatos_api(resultados: Optional[List[dict]], cuisine: str, meal_type: str,
+                    motivo: str = "sin_resultados") -> List[Tuple[str, int]]:
+    """Candidatas de los resultados de la API, o las del banco local si no hay"""
+    if not resultados:
+        RESPALDOS_LOCALES.inc(motivo=motivo)
+        logger.info("Usando recetas locales para %s/%s (%s)", cuisine, meal_type, motivo)
+        return candidatos_respaldo(cuisine, meal_type)
+    return [(resultado["title"], resultado["id"]) for resultado in resultados]
+
+
+def buscar_candidatos(cuisine: str, diet: str, meal_type: str, query: str = "", numero: int = 10,
+                      refrescar: bool = False) -> List[Tuple[str, int]]:
+    """
+    Busca las recetas candidatas de una comida (versión síncrona)
+    
+    Args:
+        numero: Recetas a pedir a la API
+        refrescar: Pedir recetas nuevas aunque la búsqueda esté en caché
+    
+    Returns:
+        list: Pares (nombre, ID); las del banco local si la API falla
+    """
+    locales = candidatos_locales(cuisine, meal_type)
+    if locales is not None:
+        return locales
+    
+    inicio = time.perf_counter()
+    motivo = "sin_resultados"
+    try:
+        resultados = buscar_en_spoonacular(parametros_busqueda(cuisine, diet, meal_type, query, numero), refrescar)
+        if resultados == []:
             # Si no hay resultados, buscar sin restricciones específicas
-            print("⚠️ Sin resultados, intentando búsqueda simplificada...")
-            params_simple = {
-                "apiKey": SPOONACULAR_API_KEY,
-                "number": 10,
-                "type": "main course",
-                "sort": "random",
-            }
-            response_simple = requests.get(
-                f"{SPOONACULAR_BASE_URL}/recipes/complexSearch",
-                params=params_simple,
-                timeout=10
-            )
-            if response_simple.status_code == 200:
-                data_simple = response_simple.json()
-                if data_simple.get("results") and len(data_simple["results"]) > 0:
-                    available_recipes = [r for r in data_simple["results"] if r["id"] not in exclude_ids]
-                    if available_recipes:
-                        selected_recipe = random.choice(available_recipes)
-                        print(f"✨ Receta simplificada: {selected_recipe['title']}")
-                        return (selected_recipe["title"], selected_recipe["id"])
+            logger.info("Sin resultados para %s/%s, intentando búsqueda simplificada", cuisine, meal_type)
+            resultados = buscar_en_spoonacular(PARAMETROS_BUSQUEDA_SIMPLE, refrescar)
+    except CircuitoAbierto as e:
+        resultados, motivo = None, "circuito"
+        logger.debug("Circuito abierto (%s)", e)
+    except Exception as e:
+        resultados, motivo = None, "error"
+        logger.warning("Error al buscar receta: %s", e)
+    finally:
+        DURACION_BUSQUEDAS.observar(time.perf_counter() - inicio, modo="sync")
+    
+    return _candidatos_api(resultados, cuisine, meal_type, motivo)
+
+
+async def buscar_candidatos_async(cuisine: str, diet: str, meal_type: str, query: str = "",
+                                  numero: int = 10, refrescar: bool = False) -> List[Tuple[str, int]]:
+    """
+    Busca las recetas candidatas de una comida sin bloquear el bucle de eventos
+    
+    A diferencia de buscar_receta no elige ninguna: devuelve todas las
+    candidatas para que la elección sin repeticiones se haga en local.
+    
+    Args:
+        numero: Recetas a pedir a la API
+        refrescar: Pedir recetas nuevas aunque la búsqueda esté en caché
+    
+    Returns:
+        list: Pares (nombre, ID); las del banco local si la API falla
+    """
+    locales = candidatos_locales(cuisine, meal_type)
+    if locales is not None:
+        return locales
+    
+    inicio = time.perf_counter()
+    motivo = "sin_resultados"
+    try:
+        resultados = await buscar_en_spoonacular_async(
+            parametros_busqueda(cuisine, diet, meal_type, query, numero), refrescar
+        )
+        if resultados == []:
+            logger.info("Sin resultados para %s/%s, intentando búsqueda simplificada", cuisine, meal_type)
+            resultados = await buscar_en_spoonacular_async(PARAMETROS_BUSQUEDA_SIMPLE, refrescar)
+    except CircuitoAbierto as e:
+        resultados, motivo = None, "circuito"
+        logger.debug("Circuito abierto (%s)", e)
+    except asyncio.CancelledError:
+        # El plazo del menú cancela la búsqueda: no es un error de la API
+        raise
+    except Exception as e:
+        # Además de los errores de red, un cuerpo que no es JSON o sin los campos esperados
+        resultados, motivo = None, "error"
+        logger.warning("Error al buscar receta: %r", e)
+    finally:
+        DURACION_BUSQUEDAS.observar(time.perf_counter() - inicio, modo="async")
+    
+    return _candidatos_api(resultados, cuisine, meal_type, motivo)
+
+
+async def generar_dias_menu_async(preferencias: str = "", restricciones: str = "", tipo_cocina: str = "mediterránea"):
+    """
+    Genera el menú semanal día a día, con una búsqueda por tipo de comida
+    
+    Las reservas de comidas y cenas se piden a la vez y las catorce recetas
+    se sortean en local, así que una semana cuesta dos llamadas a la API en
+    lugar de catorce. La garantía de no repetir recetas se mantiene: las
+    recetas se eligen en orden (lunes comida, lunes cena, ...) y una reserva
+    agotada por los IDs usados se rellena con otra búsqueda.
+    
+    Toda la espera a la API está acotada por PLAZO_MENU_SEGUNDOS: las
+    búsquedas que no terminan a tiempo se cancelan y su comida sale del banco
+    local.
+    
+    Args:
+        preferencias: Preferencias alimentarias del usuario
+        restricciones: Restricciones dietéticas (vegetariano, sin gluten, etc.)
+        tipo_cocina: Tipo de cocina (mediterránea, asiática, etc.)
+    
+    Yields:
+        tuple: (día, {"lunch": ..., "dinner": ...}) en cuanto se eligen sus dos recetas
+    """
+    cuisine, diet = parametros_cocina(tipo_cocina, restricciones)
+    comidas = ("lunch", "dinner")
+    limite = time.monotonic() + PLAZO_MENU_SEGUNDOS
+    
+    muestreador = catalogo_local.muestreador()
+    reservas = {
+        comida: reserva_local(muestreador, cuisine, comida, preferencias)
+        for comida in comidas if tiene_recetas_locales(cuisine, comida)
+    }
+    
+    # Solo las comidas sin banco local salen a la API
+    tareas = {
+        comida: asyncio.ensure_future(
+            buscar_candidatos_async(cuisine, diet, comida, preferencias, CANDIDATOS_POR_RESERVA)
+        )
+        for comida in comidas if comida not in reservas
+    }
+    try:
+        pendientes = set()
+        if tareas:
+            _, pendientes = await asyncio.wait(tareas.values(), timeout=PLAZO_MENU_SEGUNDOS)
+    finally:
+        # Si quien consume se va (cliente de streaming desconectado) no quedan búsquedas sueltas
+        for tarea in tareas.values():
+            if not tarea.done():
+                tarea.cancel()
+    
+    for comida, tarea in tareas.items():
+        if tarea in pendientes:
+            logger.warning("Plazo del menú agotado para %s/%s, usando recetas locales", cuisine, comida)
+            RESPALDOS_LOCALES.inc(motivo="plazo")
+            reservas[comida] = reserva_local(muestreador, cocina_respaldo(cuisine, comida), comida, preferencias)
         else:
-            print(f"❌ Error API: {response.status_code}")
-            print(f"📄 Respuesta: {response.text}")
-        
-        print(f"⚠️ Retornando receta genérica")
-        return (f"Receta {cuisine.capitalize()}", random.randint(1000, 9999))
-        
+            reservas[comida] = ReservaCandidatos(tarea.result())
+    
+    usados = set()
+    
+    for dia in DIAS_SEMANA:
+        menu_dia = {}
+        for comida in comidas:
+            reserva = reservas[comida]
+            while reserva.necesita_relleno(usados) and time.monotonic() < limite:
+                try:
+                    nuevas = await asyncio.wait_for(
+                        buscar_candidatos_async(cuisine, diet, comida, preferencias,
+                                                CANDIDATOS_POR_RESERVA, refrescar=True),
+                        timeout=limite - time.monotonic()
+                    )
+                except asyncio.TimeoutError:
+                    nuevas = []
+                reserva.rellenar(nuevas)
+            
+            nombre, recipe_id = reserva.elegir(usados) or receta_generica(cuisine)
+            usados.add(recipe_id)
+            menu_dia[comida] = nombre
+        yield dia, menu_dia
+
+
+async def generar_menu_semanal_async(preferencias: str = "", restricciones: str = "", tipo_cocina: str = "mediterránea"):
+    """
+    Genera un menú semanal completo (ver generar_dias_menu_async)
+    
+    Args:
+        preferencias: Preferencias alimentarias del usuario
+        restricciones: Restricciones dietéticas (vegetariano, sin gluten, etc.)
+        tipo_cocina: Tipo de cocina (mediterránea, asiática, etc.)
+    
+    Returns:
+        dict: Menú semanal con comida y cena para cada día
+    """
+    try:
+        return {
+            dia: menu_dia
+            async for dia, menu_dia in generar_dias_menu_async(preferencias, restricciones, tipo_cocina)
+        }
     except Exception as e:
-        print(f"❌ Error al buscar receta: {e}")
-        import traceback
-        traceback.print_exc()
-        return (f"Plato {cuisine.capitalize()}", random.randint(1000, 9999))
+        logger.exception("Error al generar menú: %s", e)
+        return None
+
+
+# Estilos de /sugerir-comida y su cocina en Spoonacular
+COCINAS_SUGERENCIA = {
+    "mediterráneo": "mediterranean",
+    "asiático": "asian",
+    "mexicano": "mexican",
+    "italiano": "italian",
+    "español": "spanish"
+}
+
+
+async def buscar_titulos_sugerencia(cuisine: str, meal_type: str, numero: int) -> Optional[List[str]]:
+    """Lote de títulos al azar para rellenar la reserva de sugerencias"""
+    params = {"number": numero, "cuisine": cuisine, "type": meal_type, "sort": "random"}
+    # Sin caché: cada relleno debe traer recetas nuevas
+    resultados = await buscar_en_spoonacular_async(params, refrescar=True)
+    return None if resultados is None else [resultado["title"] for resultado in resultados]
+
+
+def claves_sugerencia() -> List[Tuple[str, str]]:
+    """Todas las combinaciones (cocina, tipo de comida) que puede pedir /sugerir-comida"""
+    return [(cuisine, meal_type) for cuisine in COCINAS_SUGERENCIA.values() for meal_type in ("main course", "dinner")]
+
+
+# Sugerencias listas en memoria; app.py arranca su trabajador de relleno
+reserva_sugerencias = ReservaSugerencias(
+    buscar_titulos_sugerencia,
+    capacidad=int(os.getenv("SUGERENCIAS_CAPACIDAD", "10")),
+    umbral=int(os.getenv("SUGERENCIAS_UMBRAL", "3"))
+)
+SUGERENCIAS_PRECALENTAR = os.getenv("SUGERENCIAS_PRECALENTAR", "").lower() in ("1", "true", "si", "sí")
 
 
 def generar_sugerencia_comida(dia: str, tipo_comida: str = "comida", estilo: str = "mediterráneo"):
@@ -370,41 +809,40 @@ def generar_sugerencia_comida(dia: str, tipo_comida: str = "comida", estilo: str
         str: Sugerencia de plato
     """
     
-    cuisine_map = {
-        "mediterráneo": "mediterranean",
-        "asiático": "asian",
-        "mexicano": "mexican",
-        "italiano": "italian",
-        "español": "spanish"
-    }
-    
-    cuisine = cuisine_map.get(estilo.lower(), "mediterranean")
+    cuisine = COCINAS_SUGERENCIA.get(estilo.lower(), "mediterranean")
     meal_type = "dinner" if tipo_comida.lower() == "cena" else "main course"
     
+    # Primero la reserva precargada; solo si está vacía se busca en directo
+    sugerencia = reserva_sugerencias.sacar(cuisine, meal_type)
+    if sugerencia is not None:
+        SUGERENCIAS.inc(origen="reserva")
+        return sugerencia
+    
     try:
         params = {
-            "apiKey": SPOONACULAR_API_KEY,
             "number": 5,  # Pedir múltiples opciones
             "cuisine": cuisine,
             "type": meal_type,
             "sort": "random",
         }
         
-        response = requests.get(
-            f"{SPOONACULAR_BASE_URL}/recipes/complexSearch",
-            params=params,
-            timeout=10
-        )
+        try:
+            resultados = buscar_en_spoonacular(params)
+        except CircuitoAbierto as e:
+            logger.debug("Circuito abierto (%s)", e)
+            resultados = None
         
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("results") and len(data["results"]) > 0:
-                # Seleccionar una receta aleatoria
-                selected = random.choice(data["results"])
-                return selected["title"]
+        if resultados:
+            # Seleccionar una receta aleatoria
+            selected = random.choice(resultados)
+            SUGERENCIAS.inc(origen="directa")
+            return selected["title"]
         
-        return f"Plato {estilo.capitalize()} para {tipo_comida}"
+        RESPALDOS_LOCALES.inc(motivo="sugerencia")
+        SUGERENCIAS.inc(origen="local")
+        nombre, _ = random.choice(candidatos_respaldo(cuisine, "dinner" if meal_type == "dinner" else "lunch"))
+        return nombre
         
     except Exception as e:
-        print(f"Error al generar sugerencia: {e}")
+        logger.exception("Error al generar sugerencia: %s", e)
         return None
@@ -0,0 +1,270 @@
+"""
+Almacén de archivos generados (PDF, TXT, CSV) con caducidad y límite de disco
+Planificador de Menús - 2026
+
+Los generadores dejaban archivos con marca de tiempo en el directorio de
+trabajo para siempre. El almacén los guarda en un único directorio:
+- cada tipo (extensión) tiene su tiempo de vida
+- el total en disco tiene un presupuesto; al superarlo se borran primero los
+  archivos usados hace más tiempo (LRU)
+- el contenido se guarda una sola vez por hash (sha256): dos nombres con los
+  mismos bytes comparten archivo
+
+El índice (nombre -> hash, tipo, fechas) se guarda en indice.json con
+escritura atómica. Varios procesos (workers de uvicorn, scripts) comparten el
+directorio: cada operación toma un bloqueo de archivo (indice.lock) y relee el
+índice antes de modificarlo, así ninguna escritura pisa la de otro proceso.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+TTL_POR_DEFECTO = {
+    "pdf": 7 * 24 * 3600,
+    "txt": 24 * 3600,
+    "csv": 24 * 3600,
+}
+
+TTL_DESCONOCIDO = 24 * 3600
+
+
+class AlmacenArtefactos:
+    def __init__(self, directorio: str, max_bytes: int = 256 * 1024 * 1024,
+                 ttl_por_tipo: Optional[Dict[str, float]] = None):
+        """
+        Inicializar el almacén
+
+        Args:
+            directorio: Directorio del almacén (se crea si no existe)
+            max_bytes: Presupuesto total de disco para los archivos
+            ttl_por_tipo: Segundos de vida por extensión ('pdf', 'txt', 'csv')
+        """
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.ttl_por_tipo = {**TTL_POR_DEFECTO, **(ttl_por_tipo or {})}
+        self._lock = threading.Lock()
+        self._indice: Optional[Dict[str, Dict[str, Any]]] = None
+        self.expulsados = 0
+        self.deduplicados = 0
+
+    # Rutas e índice
+
+    def _ruta_indice(self) -> str:
+        return os.path.join(self.directorio, "indice.json")
+
+    def _ruta_objeto(self, sha: str, tipo: str) -> str:
+        return os.path.join(self.directorio, "objetos", sha[:2], f"{sha}.{tipo}")
+
+    @contextmanager
+    def _bloqueo(self) -> Iterator[Dict[str, Dict[str, Any]]]:
+        """
+        Toma el lock del proceso y el bloqueo de archivo, y devuelve el índice releído
+
+        Otro proceso puede haber cambiado indice.json desde la última operación:
+        leerlo con el bloqueo tomado evita guardar una copia antigua encima.
+        """
+        with self._lock:
+            os.makedirs(self.directorio, exist_ok=True)
+            with open(os.path.join(self.directorio, "indice.lock"), 'a+b') as bloqueo:
+                _bloquear_archivo(bloqueo)
+                try:
+                    yield self._cargar_indice()
+                finally:
+                    _desbloquear_archivo(bloqueo)
+
+    def _cargar_indice(self) -> Dict[str, Dict[str, Any]]:
+        """Lee el índice del disco (con el bloqueo tomado)"""
+        try:
+            with open(self._ruta_indice(), 'r', encoding='utf-8') as archivo:
+                self._indice = json.load(archivo)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._indice = {}
+        return self._indice
+
+    def _guardar_indice(self):
+        """Escribe el índice de forma atómica (con el bloqueo tomado)"""
+        ruta = self._ruta_indice()
+        ruta_temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(self._indice, archivo, ensure_ascii=False)
+        os.replace(ruta_temporal, ruta)
+
+    # Operaciones
+
+    def guardar(self, nombre: str, contenido: bytes) -> str:
+        """
+        Guarda un archivo generado
+
+        Args:
+            nombre: Nombre lógico del archivo; su extensión decide el tipo y el TTL
+            contenido: Bytes del archivo
+
+        Returns:
+            Ruta del archivo en el almacén
+        """
+        tipo = os.path.splitext(nombre)[1].lstrip('.').lower() or "bin"
+        sha = hashlib.sha256(contenido).hexdigest()
+        ruta = self._ruta_objeto(sha, tipo)
+        ahora = time.time()
+
+        with self._bloqueo() as indice:
+            if os.path.exists(ruta):
+                self.deduplicados += 1
+            else:
+                os.makedirs(os.path.dirname(ruta), exist_ok=True)
+                ruta_temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(ruta_temporal, 'wb') as archivo:
+                    archivo.write(contenido)
+                os.replace(ruta_temporal, ruta)
+
+            anterior = indice.get(nombre)
+            indice[nombre] = {
+                "sha256": sha,
+                "tipo": tipo,
+                "bytes": len(contenido),
+                "creado": ahora,
+                "ultimo_acceso": ahora,
+            }
+            if anterior is not None and anterior["sha256"] != sha:
+                self._borrar_si_huerfano(anterior["sha256"], anterior["tipo"])
+
+            # El archivo recién guardado nunca se expulsa: quien lo pidió va a leerlo
+            self._purgar(ahora, conservar=nombre)
+            self._guardar_indice()
+
+        return ruta
+
+    def obtener(self, nombre: str) -> Optional[str]:
+        """Devuelve la ruta de un archivo vigente y lo marca como usado, o None"""
+        ahora = time.time()
+        with self._bloqueo() as indice:
+            entrada = indice.get(nombre)
+            if entrada is None or self._caducado(entrada, ahora):
+                return None
+
+            ruta = self._ruta_objeto(entrada["sha256"], entrada["tipo"])
+            if not os.path.exists(ruta):
+                del self._indice[nombre]
+                self._guardar_indice()
+                return None
+
+            entrada["ultimo_acceso"] = ahora
+            self._guardar_indice()
+            return ruta
+
+    def purgar(self) -> int:
+        """Borra los archivos caducados y los que exceden el presupuesto; devuelve cuántos nombres se quitaron"""
+        with self._bloqueo():
+            antes = len(self._indice)
+            self._purgar(time.time())
+            quitados = antes - len(self._indice)
+            if quitados:
+                self._guardar_indice()
+            return quitados
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Devuelve el estado actual del almacén"""
+        with self._bloqueo() as indice:
+            objetos = {(entrada["sha256"], entrada["tipo"]): entrada["bytes"] for entrada in indice.values()}
+            return {
+                "directorio": self.directorio,
+                "archivos": len(indice),
+                "objetos": len(objetos),
+                "bytes_en_disco": sum(objetos.values()),
+                "max_bytes": self.max_bytes,
+                "expulsados": self.expulsados,
+                "deduplicados": self.deduplicados,
+            }
+
+    # Expulsión (con el bloqueo tomado)
+
+    def _caducado(self, entrada: Dict[str, Any], ahora: float) -> bool:
+        ttl = self.ttl_por_tipo.get(entrada["tipo"], TTL_DESCONOCIDO)
+        return ahora - entrada["creado"] > ttl
+
+    def _borrar_si_huerfano(self, sha: str, tipo: str):
+        """Borra un objeto si ningún nombre del índice lo referencia"""
+        if any(entrada["sha256"] == sha and entrada["tipo"] == tipo for entrada in self._indice.values()):
+            return
+        try:
+            os.remove(self._ruta_objeto(sha, tipo))
+        except FileNotFoundError:
+            pass
+
+    def _quitar(self, nombre: str):
+        entrada = self._indice.pop(nombre)
+        self.expulsados += 1
+        self._borrar_si_huerfano(entrada["sha256"], entrada["tipo"])
+
+    def _purgar(self, ahora: float, conservar: Optional[str] = None):
+        for nombre in [nombre for nombre, entrada in self._indice.items() if self._caducado(entrada, ahora)]:
+            self._quitar(nombre)
+
+        # Bytes reales en disco: los objetos compartidos cuentan una sola vez
+        objetos = {(entrada["sha256"], entrada["tipo"]): entrada["bytes"] for entrada in self._indice.values()}
+        total = sum(objetos.values())
+        if total <= self.max_bytes:
+            return
+
+        for nombre in sorted(self._indice, key=lambda n: self._indice[n]["ultimo_acceso"]):
+            if total <= self.max_bytes:
+                break
+            if nombre == conservar:
+                continue
+            entrada = self._indice[nombre]
+            self._quitar(nombre)
+            clave_objeto = (entrada["sha256"], entrada["tipo"])
+            if not any((e["sha256"], e["tipo"]) == clave_objeto for e in self._indice.values()):
+                total -= entrada["bytes"]
+
+
+def _bloquear_archivo(archivo):
+    """Bloqueo exclusivo entre procesos; espera a que el otro proceso lo suelte"""
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+        return
+    archivo.seek(0)
+    while True:
+        try:
+            msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            # LK_LOCK se rinde tras 10 intentos de un segundo
+            continue
+
+
+def _desbloquear_archivo(archivo):
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+        return
+    archivo.seek(0)
+    msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _ttl_desde_entorno() -> Dict[str, float]:
+    """TTL por tipo desde ALMACEN_TTL_HORAS_<TIPO> (p. ej. ALMACEN_TTL_HORAS_PDF=48)"""
+    ttls = {}
+    for tipo in TTL_POR_DEFECTO:
+        horas = os.getenv(f"ALMACEN_TTL_HORAS_{tipo.upper()}")
+        if horas:
+            ttls[tipo] = float(horas) * 3600
+    return ttls
+
+
+# Almacén compartido por los generadores
+almacen = AlmacenArtefactos(
+    directorio=os.getenv("ALMACEN_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "almacen_artefactos"),
+    max_bytes=int(os.getenv("ALMACEN_MAX_BYTES", str(256 * 1024 * 1024))),
+    ttl_por_tipo=_ttl_desde_entorno()
+)
@@ -1,15 +1,101 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
-from pydantic import BaseModel
-from typing import Optional
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import datetime
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import logging
+import os
 import ai_menu
 import menu_casa
 import dieta_pdf_generator
-import menu_semanal_pdf_generator
-import os
+import pdf_cache
+import pdf_render_service
+import pdf_salida
+import lote_menus
+import menu_vista_previa
+import almacen_artefactos
+import spoonacular_cache
+import metricas
+import random
+from pdf_render_service import servicio_render
+
+# Logs con nivel de los módulos de la aplicación (LOG_LEVEL=DEBUG para ver cada búsqueda)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Estado del arranque, consultado por /ready
+estado_arranque = {"listo": False, "precalentado": [], "error": None, "segundos": None}
+
+async def precalentar_pdfs():
+    """
+    Arranca el pool preparando reportlab y deja en la caché los PDFs de modelos de dieta
+    
+    Los documentos de modelos de dieta no dependen de la petición, así que la
+    primera petición tras un despliegue ya los encuentra renderizados.
+    """
+    inicio = datetime.now()
+    try:
+        await asyncio.to_thread(servicio_render.iniciar)
+        
+        modelos, _ = dieta_pdf_generator.cargar_modelos_dieta()
+        numeros = sorted(
+            int(clave.rsplit('_', 1)[1])
+            for clave in modelos.get('modelos_dieta', {})
+            if clave.startswith('modelo_')
+        )
+        documentos = [("completo",), ("resumen",)] + [("modelo", numero) for numero in numeros]
+        
+        await asyncio.gather(*(obtener_artefacto_dieta(*documento) for documento in documentos))
+        estado_arranque["precalentado"] = ["_".join(map(str, documento)) for documento in documentos]
+    except Exception as e:
+        # Una instancia fría sigue pudiendo atender peticiones: se informa y se marca lista
+        estado_arranque["error"] = str(e)
+        logger.warning("Error al precalentar los PDFs: %s", e, exc_info=True)
+    finally:
+        estado_arranque["segundos"] = round((datetime.now() - inicio).total_seconds(), 3)
+        estado_arranque["listo"] = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Arranca el pool de renderizado de PDFs
+    
+    Con PDF_PRECALENTAR activo el precalentamiento se hace en segundo plano:
+    /health responde desde el principio y /ready devuelve 503 hasta que termina.
+    """
+    # Los archivos caducados de ejecuciones anteriores se borran al arrancar
+    almacen_artefactos.almacen.purgar()
+    
+    tarea_precalentado = None
+    if servicio_render.precalentar:
+        tarea_precalentado = asyncio.create_task(precalentar_pdfs())
+    else:
+        servicio_render.iniciar()
+        estado_arranque["listo"] = True
+    
+    # Trabajador que rellena en segundo plano las sugerencias de /sugerir-comida
+    ai_menu.reserva_sugerencias.iniciar(
+        ai_menu.claves_sugerencia() if ai_menu.SUGERENCIAS_PRECALENTAR else ()
+    )
+    
+    yield
+    
+    await ai_menu.reserva_sugerencias.detener()
+    if tarea_precalentado is not None and not tarea_precalentado.done():
+        tarea_precalentado.cancel()
+    servicio_render.detener()
+    await ai_menu.cliente_spoonacular.cerrar()
+    ai_menu.sesion_spoonacular.cerrar()
+    spoonacular_cache.cache_busquedas.cerrar()
 
-app = FastAPI(title="Menu Generator API", version="1.0.0")
+app = FastAPI(title="Menu Generator API", version="1.0.0", lifespan=lifespan)
 
 # Configurar CORS para permitir peticiones desde el frontend React
 app.add_middleware(
@@ -38,6 +124,55 @@ class SugerenciaRequest(BaseModel):
 class MenuCasaRequest(BaseModel):
     id_cristina: Optional[int] = 1
     id_marisa: Optional[int] = 1
+    semilla: Optional[int] = None
+
+class PacienteMenu(BaseModel):
+    nombre: str = Field(..., min_length=1, max_length=100)
+    modo: Literal["aleatorio", "secuencial"] = "aleatorio"
+    semilla: Optional[int] = None
+
+class LoteMenusRequest(BaseModel):
+    pacientes: List[PacienteMenu] = Field(..., min_length=1, max_length=500)
+
+def respuesta_pdf(contenido_pdf: bytes, nombre_archivo: str, cabeceras: Optional[dict] = None) -> Response:
+    """Devuelve como descarga un PDF renderizado en memoria, sin pasar por disco"""
+    headers = {"Content-Disposition": f'attachment; filename="{nombre_archivo}"'}
+    headers.update(cabeceras or {})
+    return Response(
+        content=contenido_pdf,
+        media_type="application/pdf",
+        headers=headers
+    )
+
+def respuesta_pdf_cacheada(request: Request, artefacto: pdf_cache.ArtefactoPDF, nombre_archivo: str) -> Response:
+    """Devuelve un PDF cacheado con su ETag, o 304 si el cliente ya tiene esa versión"""
+    # no-cache obliga a revalidar: la fecha de cabecera cambia cada día
+    cabeceras = {"ETag": artefacto.etag, "Cache-Control": "no-cache"}
+    
+    if pdf_cache.etag_coincide(request.headers.get("if-none-match"), artefacto.etag):
+        return Response(status_code=304, headers=cabeceras)
+    
+    return respuesta_pdf(artefacto.contenido, nombre_archivo, cabeceras)
+
+async def obtener_artefacto_dieta(tipo: str, *parametros) -> pdf_cache.ArtefactoPDF:
+    """Busca un PDF de modelos de dieta en la caché o lo renderiza en el pool de procesos"""
+    generator = dieta_pdf_generator.DietaPDFGenerator()
+    clave = generator.clave_artefacto(tipo, *parametros)
+    
+    artefacto = pdf_cache.cache_pdfs.obtener(clave)
+    if artefacto is None:
+        contenido_pdf = await servicio_render.renderizar(
+            pdf_render_service.renderizar_dieta,
+            tipo, parametros, generator.huella_datos(), generator.fecha_cabecera
+        )
+        pdf_salida.registrar_documento(tipo, contenido_pdf)
+        artefacto = pdf_cache.cache_pdfs.guardar(clave, contenido_pdf)
+    
+    return artefacto
+
+def error_cola_llena(e: pdf_render_service.ColaRenderLlena) -> HTTPException:
+    """Convierte la cola de renderizado llena en un 503 para que el cliente reintente"""
+    return HTTPException(status_code=503, detail=f"Servidor ocupado generando PDFs: {str(e)}", headers={"Retry-After": "1"})
 
 @app.get("/", response_class=HTMLResponse)
 def read_root():
@@ -239,6 +374,8 @@ def read_root():
                         <li><code>GET /dieta-modelos/info</code> - Información JSON de modelos</li>
                         <li><code>POST /generar-menu</code> - Generar menú con IA</li>
                         <li><code>POST /generar-menu-casa</code> - Generar PDF menú casa</li>
+                        <li><code>GET /dieta-2/menu-semanal/html</code> - Vista previa del menú semanal</li>
+                        <li><code>GET /menu-casa/vista-previa/html</code> - Vista previa del menú casa</li>
                     </ul>
                     <p style="margin-top: 15px;">
                         <a href="/dieta-modelos/info" class="btn">Ver API JSON</a>
@@ -282,13 +419,45 @@ def health_check():
     """Endpoint para verificar el estado del servidor"""
     return {"status": "ok", "message": "Servidor funcionando correctamente"}
 
+@app.get("/ready")
+def readiness_check():
+    """Indica si la instancia puede recibir tráfico (503 mientras se precalientan los PDFs)"""
+    if not estado_arranque["listo"]:
+        return JSONResponse(status_code=503, content={"status": "arrancando", **estado_arranque})
+    return {"status": "ok", **estado_arranque}
+
+@app.get("/pdf/estado")
+def estado_pdf():
+    """Estado del pool de renderizado, de la caché y de los tamaños de los PDFs"""
+    return {
+        "render": servicio_render.estadisticas(),
+        "cache": pdf_cache.cache_pdfs.estadisticas(),
+        "tamanos": pdf_salida.informe_tamanos(),
+        "vista_previa": menu_vista_previa.estadisticas_cache(),
+        "almacen": almacen_artefactos.almacen.estadisticas()
+    }
+
+@app.get("/spoonacular/estado")
+def estado_spoonacular():
+    """Estado de la caché persistente de búsquedas, del circuito de Spoonacular y de la reserva de sugerencias"""
+    return {
+        "cache": spoonacular_cache.cache_busquedas.estadisticas(),
+        "circuito": ai_menu.circuito_spoonacular.estadisticas(),
+        "sugerencias": ai_menu.reserva_sugerencias.estadisticas()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Métricas de la búsqueda de recetas en formato de texto de Prometheus"""
+    return PlainTextResponse(metricas.registro.exponer(), media_type="text/plain; version=0.0.4")
+
 @app.get("/favicon.ico")
 def favicon():
     """Endpoint para manejar la petición del favicon y evitar error 404"""
     return {"message": "No favicon configured"}
 
 @app.post("/generar-menu")
-def generar_menu(request: MenuRequest):
+async def generar_menu(request: MenuRequest):
     """
     Genera un menú semanal completo usando IA
     
@@ -300,7 +469,7 @@ def generar_menu(request: MenuRequest):
     }
     """
     try:
-        menu = ai_menu.generar_menu_semanal(
+        menu = await ai_menu.generar_menu_semanal_async(
             preferencias=request.preferencias,
             restricciones=request.restricciones,
             tipo_cocina=request.tipo_cocina
@@ -321,6 +490,48 @@ def generar_menu(request: MenuRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al generar menú: {str(e)}")
 
+def evento_menu(formato: str, tipo: str, datos: dict) -> str:
+    """Un evento del menú en streaming: una línea NDJSON o un evento SSE"""
+    if formato == "sse":
+        return f"event: {tipo}\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n"
+    return json.dumps({"tipo": tipo, **datos}, ensure_ascii=False) + "\n"
+
+@app.post("/generar-menu/stream")
+async def generar_menu_stream(request: MenuRequest, formato: Literal["ndjson", "sse"] = "ndjson"):
+    """
+    Genera el menú semanal y envía cada día en cuanto se eligen su comida y su cena
+
+    Mismo body que /generar-menu. Eventos, en NDJSON (una línea JSON con
+    "tipo") o como server-sent events (?formato=sse):
+    - dia: {"dia": "Lunes", "comidas": {"lunch": "...", "dinner": "..."}}, de lunes a domingo
+    - fin: {"success": true, "parametros": {...}} al completar la semana
+    - error: {"detail": "..."} si la generación falla a medias
+    Ninguna receta se repite en la semana, igual que en /generar-menu.
+    """
+    parametros = {
+        "preferencias": request.preferencias,
+        "restricciones": request.restricciones,
+        "tipo_cocina": request.tipo_cocina
+    }
+
+    async def eventos():
+        try:
+            async for dia, comidas in ai_menu.generar_dias_menu_async(**parametros):
+                yield evento_menu(formato, "dia", {"dia": dia, "comidas": comidas})
+        except Exception as e:
+            # La cabecera 200 ya se envió: el error viaja como último evento
+            logger.exception("Error al generar menú en streaming: %s", e)
+            yield evento_menu(formato, "error", {"detail": f"Error al generar menú: {str(e)}"})
+            return
+        yield evento_menu(formato, "fin", {"success": True, "parametros": parametros})
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream" if formato == "sse" else "application/x-ndjson",
+        # Sin caché ni buffer en proxies: cada día debe llegar en cuanto sale
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/sugerir-comida")
 def sugerir_comida(request: SugerenciaRequest):
     """
@@ -353,7 +564,7 @@ def sugerir_comida(request: SugerenciaRequest):
         raise HTTPException(status_code=500, detail=f"Error al generar sugerencia: {str(e)}")
 
 @app.post("/generar-menu-casa")
-def generar_menu_casa(request: MenuCasaRequest):
+async def generar_menu_casa(request: MenuCasaRequest):
     """
     Genera un PDF con el menú de casa para Cristina y Marisa
     Usa cristina_menu1.json para Cristina (selección aleatoria de Primeros y Segundos)
@@ -361,24 +572,24 @@ def generar_menu_casa(request: MenuCasaRequest):
     Body:
     {
         "id_cristina": 1,
-        "id_marisa": 1
+        "id_marisa": 1,
+        "semilla": 42  (opcional, la misma de /menu-casa/vista-previa)
     }
     """
     try:
-        # Generar el PDF usando cristina_menu1.json
-        archivo_pdf = menu_casa.generar_menu_desde_cristina_menu1(
-            archivo_salida="menu_semanal_casa.pdf"
-        )
+        # Construir los menús usando cristina_menu1.json
+        menus = menu_casa.construir_menus_desde_cristina_menu1(request.semilla)
         
-        if archivo_pdf is None or not os.path.exists(archivo_pdf):
+        if menus is None:
             raise HTTPException(status_code=500, detail="Error al generar el PDF")
         
+        contenido_pdf = await servicio_render.renderizar(pdf_render_service.renderizar_menu_casa, *menus)
+        pdf_salida.registrar_documento("menu_casa", contenido_pdf)
+        
         # Devolver el PDF como descarga
-        return FileResponse(
-            path=archivo_pdf,
-            media_type="application/pdf",
-            filename="menu_semanal_casa.pdf"
-        )
+        return respuesta_pdf(contenido_pdf, "menu_semanal_casa.pdf")
+    except pdf_render_service.ColaRenderLlena as e:
+        raise error_cola_llena(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al generar menú casa: {str(e)}")
 
@@ -400,27 +611,21 @@ def menus_disponibles():
         raise HTTPException(status_code=500, detail=f"Error al listar menús: {str(e)}")
 
 @app.get("/dieta-modelos/generar-pdf-completo")
-def generar_pdf_dieta_completo():
+async def generar_pdf_dieta_completo(request: Request):
     """
     Genera un PDF con todos los modelos de dieta médica (1-4)
     """
     try:
-        generator = dieta_pdf_generator.DietaPDFGenerator()
-        archivo_pdf = generator.generar_pdf_todos_los_modelos("modelos_dieta_completos.pdf")
-        
-        if not os.path.exists(archivo_pdf):
-            raise HTTPException(status_code=500, detail="Error al generar el PDF completo")
+        artefacto = await obtener_artefacto_dieta("completo")
         
-        return FileResponse(
-            path=archivo_pdf,
-            media_type="application/pdf",
-            filename="modelos_dieta_completos.pdf"
-        )
+        return respuesta_pdf_cacheada(request, artefacto, "modelos_dieta_completos.pdf")
+    except pdf_render_service.ColaRenderLlena as e:
+        raise error_cola_llena(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al generar PDF completo: {str(e)}")
 
 @app.get("/dieta-modelos/generar-pdf-modelo/{modelo_numero}")
-def generar_pdf_dieta_modelo(modelo_numero: int):
+async def generar_pdf_dieta_modelo(modelo_numero: int, request: Request):
     """
     Genera un PDF para un modelo específico de dieta (1, 2, 3, o 4)
     """
@@ -428,38 +633,25 @@ def generar_pdf_dieta_modelo(modelo_numero: int):
         raise HTTPException(status_code=400, detail="El número de modelo debe ser 1, 2, 3 o 4")
     
     try:
-        generator = dieta_pdf_generator.DietaPDFGenerator()
-        nombre_archivo = f"modelo_dieta_{modelo_numero}.pdf"
-        archivo_pdf = generator.generar_pdf_modelo_individual(modelo_numero, nombre_archivo)
-        
-        if not os.path.exists(archivo_pdf):
-            raise HTTPException(status_code=500, detail=f"Error al generar el PDF del modelo {modelo_numero}")
+        artefacto = await obtener_artefacto_dieta("modelo", modelo_numero)
         
-        return FileResponse(
-            path=archivo_pdf,
-            media_type="application/pdf",
-            filename=nombre_archivo
-        )
+        return respuesta_pdf_cacheada(request, artefacto, f"modelo_dieta_{modelo_numero}.pdf")
+    except pdf_render_service.ColaRenderLlena as e:
+        raise error_cola_llena(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al generar PDF modelo {modelo_numero}: {str(e)}")
 
 @app.get("/dieta-modelos/generar-resumen")
-def generar_resumen_dieta():
+async def generar_resumen_dieta(request: Request):
     """
     Genera un PDF con tabla resumen de todos los modelos de dieta
     """
     try:
-        generator = dieta_pdf_generator.DietaPDFGenerator()
-        archivo_pdf = generator.generar_tabla_resumen()
-        
-        if not os.path.exists(archivo_pdf):
-            raise HTTPException(status_code=500, detail="Error al generar el resumen")
+        artefacto = await obtener_artefacto_dieta("resumen")
         
-        return FileResponse(
-            path=archivo_pdf,
-            media_type="application/pdf",
-            filename="resumen_modelos_dieta.pdf"
-        )
+        return respuesta_pdf_cacheada(request, artefacto, "resumen_modelos_dieta.pdf")
+    except pdf_render_service.ColaRenderLlena as e:
+        raise error_cola_llena(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al generar resumen: {str(e)}")
 
@@ -469,37 +661,100 @@ def obtener_info_modelos():
     Obtiene la información de los modelos de dieta en formato JSON
     """
     try:
-        generator = dieta_pdf_generator.DietaPDFGenerator()
+        modelos_dieta, _ = dieta_pdf_generator.cargar_modelos_dieta()
         return {
             "success": True,
             "modelos_disponibles": [1, 2, 3, 4],
             "descripcion": "Modelos de dieta de 1000 kcal para cirugía de obesidad",
-            "modelos": generator.modelos_dieta
+            "modelos": modelos_dieta
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener información: {str(e)}")
 
 @app.get("/dieta-2/generar-menu-semanal-pdf")
-def generar_menu_semanal_dieta2():
+async def generar_menu_semanal_dieta2(modo: Literal["aleatorio", "secuencial"] = "aleatorio",
+                                      semilla: Optional[int] = None):
     """
-    Genera un PDF con menú semanal aleatorio usando opciones de dietas_2.json
+    Genera un PDF con menú semanal usando opciones de dietas_2.json
+    Con la semilla de /dieta-2/menu-semanal se obtiene el mismo menú de la vista previa
     """
     try:
-        # Generar PDF con menú aleatorio
-        archivo_pdf = menu_semanal_pdf_generator.generar_menu_semanal_pdf(modo='aleatorio')
+        contenido_pdf = await servicio_render.renderizar(pdf_render_service.renderizar_menu_semanal, modo, semilla)
+        pdf_salida.registrar_documento("menu_semanal", contenido_pdf)
         
-        if not os.path.exists(archivo_pdf):
-            raise HTTPException(status_code=500, detail="Error al generar el PDF del menú semanal")
-        
-        return FileResponse(
-            path=archivo_pdf,
-            media_type="application/pdf",
-            filename=os.path.basename(archivo_pdf),
-            headers={"Content-Disposition": f"attachment; filename={os.path.basename(archivo_pdf)}"}
-        )
+        fecha_actual = datetime.now().strftime("%Y%m%d_%H%M")
+        return respuesta_pdf(contenido_pdf, f"menu_semanal_dieta2_{fecha_actual}.pdf")
+    except pdf_render_service.ColaRenderLlena as e:
+        raise error_cola_llena(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al generar menú semanal PDF: {str(e)}")
 
+def semilla_vista_previa(semilla: Optional[int]) -> int:
+    """Elige una semilla nueva si el cliente no envía ninguna, para poder pedir luego el mismo PDF"""
+    return semilla if semilla is not None else random.randrange(2**31)
+
+@app.get("/dieta-2/menu-semanal")
+def vista_previa_menu_semanal(modo: Literal["aleatorio", "secuencial"] = "aleatorio",
+                              semilla: Optional[int] = None):
+    """
+    Devuelve en JSON el menú semanal de dietas_2.json sin generar el PDF
+    La semilla de la respuesta reproduce el mismo menú en /dieta-2/generar-menu-semanal-pdf
+    """
+    try:
+        return {"success": True, **menu_vista_previa.vista_menu_dietas(modo, semilla_vista_previa(semilla))}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar vista previa: {str(e)}")
+
+@app.get("/dieta-2/menu-semanal/html", response_class=HTMLResponse)
+def vista_previa_menu_semanal_html(modo: Literal["aleatorio", "secuencial"] = "aleatorio",
+                                   semilla: Optional[int] = None):
+    """Devuelve el menú semanal de dietas_2.json como página HTML ligera"""
+    try:
+        return HTMLResponse(content=menu_vista_previa.html_menu_dietas(modo, semilla_vista_previa(semilla)))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar vista previa: {str(e)}")
+
+@app.get("/menu-casa/vista-previa")
+def vista_previa_menu_casa(semilla: Optional[int] = None):
+    """
+    Devuelve en JSON los menús de casa sin generar el PDF
+    La semilla de la respuesta reproduce los mismos menús en /generar-menu-casa
+    """
+    try:
+        return {"success": True, **menu_vista_previa.vista_menu_casa(semilla_vista_previa(semilla))}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar vista previa: {str(e)}")
+
+@app.get("/menu-casa/vista-previa/html", response_class=HTMLResponse)
+def vista_previa_menu_casa_html(semilla: Optional[int] = None):
+    """Devuelve los menús de casa como página HTML ligera"""
+    try:
+        return HTMLResponse(content=menu_vista_previa.html_menu_casa(semilla_vista_previa(semilla)))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar vista previa: {str(e)}")
+
+@app.post("/dieta-2/generar-menus-semanales-zip")
+async def generar_menus_semanales_zip(request: LoteMenusRequest):
+    """
+    Genera un menú semanal en PDF por paciente y los devuelve en un ZIP en streaming
+    
+    Body:
+    {
+        "pacientes": [
+            {"nombre": "Paciente 101", "modo": "aleatorio", "semilla": 42},
+            {"nombre": "Paciente 102", "modo": "secuencial"}
+        ]
+    }
+    """
+    pacientes = [paciente.model_dump() for paciente in request.pacientes]
+    fecha_actual = datetime.now().strftime("%Y%m%d_%H%M")
+    
+    return StreamingResponse(
+        lote_menus.generar_zip_menus(pacientes, servicio_render),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="menus_semanales_dieta2_{fecha_actual}.zip"'}
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
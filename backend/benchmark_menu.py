@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la generación del menú semanal contra Spoonacular simulado
+Planificador de Menús - 2026
+
+Genera menús con generar_menu_semanal_async apuntando al sustituto de
+spoonacular_simulado.py, montado en el mismo proceso (httpx.ASGITransport):
+sin red, sin cuota y con la latencia y los errores que se indiquen. Mide:
+- sobrecarga propia: menús con latencia de Spoonacular nula
+- extremo a extremo: menús con la latencia inyectada
+La caché de búsquedas se vacía antes de cada menú para medir siempre el
+camino completo.
+
+Uso:
+    python benchmark_menu.py
+    python benchmark_menu.py --latencia lognormal:0.3:0.5 --tasa-errores 0.05
+    python benchmark_menu.py --grabaciones spoonacular_grabaciones.json --latencia grabada
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+import ai_menu
+from spoonacular_cache import CacheBusquedas
+from spoonacular_circuito import CircuitoSpoonacular
+from spoonacular_client import ClienteSpoonacular
+from spoonacular_simulado import ARCHIVO_GRABACIONES, ConfigSimulado, GrabacionesSpoonacular, crear_app
+
+
+def _percentil(valores: List[float], percentil: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(percentil * (len(ordenados) - 1))))]
+
+
+async def medir_menus(config: ConfigSimulado, grabaciones: GrabacionesSpoonacular, menus: int = 20,
+                      tipo_cocina: str = "saludable") -> Dict[str, Any]:
+    """
+    Genera varios menús seguidos contra el sustituto y resume sus duraciones
+
+    Returns:
+        dict: Mediana, p95 y máximo en milisegundos, y peticiones a la API
+    """
+    app = crear_app(grabaciones, config)
+    cliente = ClienteSpoonacular("http://spoonacular.simulado", "clave", transport=httpx.ASGITransport(app=app),
+                                 circuito=CircuitoSpoonacular())
+    anterior, cache_anterior = ai_menu.cliente_spoonacular, ai_menu.cache_busquedas
+    ai_menu.cliente_spoonacular, ai_menu.cache_busquedas = cliente, CacheBusquedas()
+
+    duraciones = []
+    try:
+        for _ in range(menus):
+            ai_menu.cache_busquedas.limpiar()
+            inicio = time.perf_counter()
+            await ai_menu.generar_menu_semanal_async(tipo_cocina=tipo_cocina)
+            duraciones.append((time.perf_counter() - inicio) * 1000)
+    finally:
+        await cliente.cerrar()
+        ai_menu.cliente_spoonacular, ai_menu.cache_busquedas = anterior, cache_anterior
+
+    return {
+        "mediana_ms": round(statistics.median(duraciones), 2),
+        "p95_ms": round(_percentil(duraciones, 0.95), 2),
+        "max_ms": round(max(duraciones), 2),
+        "peticiones": app.state.simulado["peticiones"],
+    }
+
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del menú semanal contra Spoonacular simulado")
+    parser.add_argument("--menus", type=int, default=20, help="Menús generados por medida")
+    parser.add_argument("--cocina", default="saludable", help="Tipo de cocina del menú")
+    parser.add_argument("--grabaciones", default=ARCHIVO_GRABACIONES, help="Archivo JSON de grabaciones")
+    parser.add_argument("--latencia", default="lognormal:0.3:0.5",
+                        help="'fija:S', 'lognormal:MEDIANA:SIGMA' o 'grabada'")
+    parser.add_argument("--tasa-errores", type=float, default=0.0, help="Fracción de respuestas 429/5xx")
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args(argumentos)
+
+    grabaciones = GrabacionesSpoonacular(args.grabaciones)
+    medidas = {
+        "sobrecarga": ConfigSimulado(latencia="0", semilla=args.semilla),
+        "extremo_a_extremo": ConfigSimulado(latencia=args.latencia, tasa_errores=args.tasa_errores,
+                                            semilla=args.semilla),
+    }
+
+    print(f"{'medida':<20} {'mediana':>10} {'p95':>10} {'máx':>10} {'peticiones':>11}")
+    for nombre, config in medidas.items():
+        resultado = asyncio.run(medir_menus(config, grabaciones, args.menus, args.cocina))
+        print(f"{nombre:<20} {resultado['mediana_ms']:>8.1f}ms {resultado['p95_ms']:>8.1f}ms "
+              f"{resultado['max_ms']:>8.1f}ms {resultado['peticiones']:>11}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
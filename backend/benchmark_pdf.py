@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de los generadores de PDF
+Planificador de Menús - 2026
+
+Mide cada generador público con varias repeticiones y compara los resultados
+con la línea base guardada en benchmark_pdf_baseline.json:
+- tiempo de pared (mediana y mínimo, sin tracemalloc activo; se compara el
+  mínimo, que es la medida menos sensible al ruido de la máquina)
+- pico de memoria asignada (tracemalloc, en una ejecución aparte)
+- bytes del PDF escrito
+
+Uso:
+    python benchmark_pdf.py                      # compara con la línea base
+    python benchmark_pdf.py --guardar-baseline   # guarda una nueva línea base
+    python benchmark_pdf.py --casos modelo_individual tabla_resumen
+
+Devuelve código de salida 1 si algún caso empeora más de la tolerancia.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import reportlab
+
+from dieta_pdf_generator import DietaPDFGenerator
+from menu_semanal_pdf_generator import MenuSemanalPDFGenerator
+from pdf_cache import cache_pdfs
+import menu_casa
+
+ARCHIVO_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_pdf_baseline.json")
+
+TOLERANCIAS_POR_DEFECTO = {
+    "tiempo": 0.50,
+    "memoria": 0.25,
+    "bytes": 0.10,
+}
+
+# Holgura absoluta de tiempo: en casos de pocos milisegundos el ruido supera el porcentaje
+HOLGURA_TIEMPO_MS = 5.0
+
+
+def crear_casos() -> Dict[str, Callable[[str], str]]:
+    """
+    Casos del benchmark: cada uno recibe la ruta de salida y devuelve la del PDF escrito
+    """
+    generador_dieta = DietaPDFGenerator()
+    generador_menu = MenuSemanalPDFGenerator()
+
+    # Menús de casa fijos para que todas las repeticiones maqueten lo mismo
+    estado_random = random.getstate()
+    random.seed(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        menus_casa = menu_casa.construir_menus_desde_cristina_menu1()
+    random.setstate(estado_random)
+
+    def menu_casa_semanal(ruta: str) -> str:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return menu_casa.generar_pdf_menu_semanal(*menus_casa, archivo_salida=ruta)
+
+    casos = {
+        "todos_los_modelos": generador_dieta.generar_pdf_todos_los_modelos,
+        "modelo_individual": lambda ruta: generador_dieta.generar_pdf_modelo_individual(1, ruta),
+        "tabla_resumen": generador_dieta.generar_tabla_resumen,
+        "menu_semanal": lambda ruta: generador_menu.generar_menu_semanal_pdf(ruta, modo='secuencial'),
+    }
+    if menus_casa is not None:
+        casos["menu_casa"] = menu_casa_semanal
+    return casos
+
+
+def medir_caso(generar: Callable[[str], str], repeticiones: int = 5,
+               con_cache: bool = False) -> Dict[str, Any]:
+    """
+    Mide un caso del benchmark
+
+    Args:
+        generar: Función que escribe el PDF en la ruta recibida
+        repeticiones: Número de ejecuciones cronometradas
+        con_cache: Si es False se vacía la caché de PDFs antes de cada ejecución
+
+    Returns:
+        Tiempos en milisegundos, pico de memoria y bytes del PDF
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "benchmark.pdf")
+
+        # Ejecución de calentamiento (imports perezosos, fuentes, etc.)
+        generar(ruta)
+
+        tiempos = []
+        for _ in range(repeticiones):
+            if not con_cache:
+                cache_pdfs.limpiar()
+            inicio = time.perf_counter()
+            ruta_pdf = generar(ruta)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+
+        if not con_cache:
+            cache_pdfs.limpiar()
+        tracemalloc.start()
+        try:
+            generar(ruta)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        tamano = os.path.getsize(ruta_pdf)
+
+    return {
+        "repeticiones": repeticiones,
+        "tiempo_mediano_ms": round(statistics.median(tiempos), 2),
+        "tiempo_minimo_ms": round(min(tiempos), 2),
+        "pico_memoria_bytes": pico,
+        "bytes": tamano,
+    }
+
+
+def comparar_con_baseline(resultados: Dict[str, Dict[str, Any]],
+                          baseline: Dict[str, Dict[str, Any]],
+                          tolerancias: Optional[Dict[str, float]] = None) -> List[str]:
+    """
+    Compara los resultados con la línea base
+
+    Returns:
+        Lista de regresiones detectadas (vacía si todo está dentro de la tolerancia)
+    """
+    tolerancias = {**TOLERANCIAS_POR_DEFECTO, **(tolerancias or {})}
+    metricas = {
+        "tiempo_minimo_ms": "tiempo",
+        "pico_memoria_bytes": "memoria",
+        "bytes": "bytes",
+    }
+
+    regresiones = []
+    for caso, resultado in resultados.items():
+        referencia = baseline.get(caso)
+        if referencia is None:
+            continue
+        for metrica, tipo in metricas.items():
+            limite = referencia[metrica] * (1 + tolerancias[tipo])
+            if tipo == "tiempo":
+                limite = max(limite, referencia[metrica] + HOLGURA_TIEMPO_MS)
+            if resultado[metrica] > limite:
+                regresiones.append(
+                    f"{caso}: {metrica} {resultado[metrica]} > {referencia[metrica]} "
+                    f"(+{tolerancias[tipo]:.0%} permitido)"
+                )
+    return regresiones
+
+
+def cargar_baseline(ruta: str = ARCHIVO_BASELINE) -> Dict[str, Any]:
+    """Lee la línea base guardada (vacía si no existe)"""
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+
+def guardar_baseline(resultados: Dict[str, Dict[str, Any]], ruta: str = ARCHIVO_BASELINE):
+    """Guarda los resultados como nueva línea base junto con el entorno de medida"""
+    datos = {
+        "entorno": {
+            "python": platform.python_version(),
+            "reportlab": reportlab.Version,
+            "plataforma": platform.platform(),
+        },
+        "casos": resultados,
+    }
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(datos, archivo, ensure_ascii=False, indent=2)
+        archivo.write("\n")
+
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    """Función principal del benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark de los generadores de PDF")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Ejecuciones cronometradas por caso")
+    parser.add_argument("--casos", nargs="*", help="Casos a medir (por defecto todos)")
+    parser.add_argument("--con-cache", action="store_true", help="No vaciar la caché de PDFs entre ejecuciones")
+    parser.add_argument("--guardar-baseline", action="store_true", help="Guardar los resultados como línea base")
+    parser.add_argument("--baseline", default=ARCHIVO_BASELINE, help="Archivo de línea base")
+    parser.add_argument("--tolerancia-tiempo", type=float, default=TOLERANCIAS_POR_DEFECTO["tiempo"])
+    parser.add_argument("--tolerancia-memoria", type=float, default=TOLERANCIAS_POR_DEFECTO["memoria"])
+    parser.add_argument("--tolerancia-bytes", type=float, default=TOLERANCIAS_POR_DEFECTO["bytes"])
+    args = parser.parse_args(argumentos)
+
+    casos = crear_casos()
+    seleccion = args.casos or list(casos)
+    desconocidos = [caso for caso in seleccion if caso not in casos]
+    if desconocidos:
+        parser.error(f"Casos desconocidos: {', '.join(desconocidos)}. Opciones: {', '.join(casos)}")
+
+    print(f"📊 Benchmark de PDFs ({args.repeticiones} repeticiones por caso)\n")
+    print(f"{'caso':<20} {'mediana ms':>11} {'mínimo ms':>10} {'pico KB':>9} {'bytes':>8}")
+
+    resultados = {}
+    for nombre in seleccion:
+        resultado = medir_caso(casos[nombre], args.repeticiones, args.con_cache)
+        resultados[nombre] = resultado
+        print(f"{nombre:<20} {resultado['tiempo_mediano_ms']:>11.2f} {resultado['tiempo_minimo_ms']:>10.2f} "
+              f"{resultado['pico_memoria_bytes'] / 1024:>9.1f} {resultado['bytes']:>8}")
+
+    if args.guardar_baseline:
+        guardar_baseline(resultados, args.baseline)
+        print(f"\n💾 Línea base guardada en {args.baseline}")
+        return 0
+
+    baseline = cargar_baseline(args.baseline).get("casos", {})
+    if not baseline:
+        print("\n⚠️  No hay línea base; ejecuta con --guardar-baseline para crearla")
+        return 0
+
+    regresiones = comparar_con_baseline(resultados, baseline, {
+        "tiempo": args.tolerancia_tiempo,
+        "memoria": args.tolerancia_memoria,
+        "bytes": args.tolerancia_bytes,
+    })
+    if regresiones:
+        print("\n❌ Regresiones respecto a la línea base:")
+        for regresion in regresiones:
+            print(f"   - {regresion}")
+        return 1
+
+    print("\n✅ Sin regresiones respecto a la línea base")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
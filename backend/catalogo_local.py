@@ -0,0 +1,137 @@
+"""
+Catálogo indexado del banco de recetas locales
+Planificador de Menús - 2026
+
+El banco de recetas (cocina -> comida -> nombres) se compila una vez al
+importar:
+- cada nombre distinto recibe un ID entero estable, igual en todos los
+  procesos. Los IDs son negativos para no chocar nunca con los de Spoonacular,
+  que comparten el mismo conjunto de IDs usados del menú
+- cada (cocina, comida) guarda la tupla de sus IDs
+- se pueden añadir más fuentes de platos (dietas, menús de casa) como
+  cocinas propias; un nombre repetido conserva su ID
+
+Un MuestreadorLocal por petición extrae recetas sin reemplazo con un
+Fisher-Yates parcial: cada extracción es O(1) y la exclusión de IDs ya usados
+es una consulta a un set.
+"""
+
+import random
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def clave_comida(meal_type: str) -> str:
+    """Comida del banco local para un tipo de Spoonacular ('main course' cuenta como 'lunch')"""
+    return "lunch" if meal_type == "lunch" else "dinner"
+
+
+class CatalogoLocal:
+    def __init__(self, recetas: Dict[str, Dict[str, List[str]]]):
+        """
+        Compilar el catálogo
+
+        Args:
+            recetas: Banco de recetas {cocina: {comida: [nombres]}}
+        """
+        self.nombres: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._por_comida: Dict[Tuple[str, str], Tuple[int, ...]] = {}
+
+        for cuisine, comidas in recetas.items():
+            for meal_key, nombres in comidas.items():
+                self.agregar(cuisine, meal_key, nombres)
+
+    def agregar(self, cuisine: str, meal_key: str, nombres: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Añade platos a una cocina y comida (sin duplicar los que ya tenga)
+
+        Returns:
+            tuple: IDs de la cocina y comida tras añadirlos
+        """
+        ids = list(self._por_comida.get((cuisine, meal_key), ()))
+        for nombre in nombres:
+            recipe_id = self._registrar(nombre)
+            if recipe_id not in ids:
+                ids.append(recipe_id)
+        self._por_comida[(cuisine, meal_key)] = tuple(ids)
+        return self._por_comida[(cuisine, meal_key)]
+
+    def _registrar(self, nombre: str) -> int:
+        recipe_id = self._ids.get(nombre)
+        if recipe_id is None:
+            self.nombres.append(nombre)
+            recipe_id = -len(self.nombres)
+            self._ids[nombre] = recipe_id
+        return recipe_id
+
+    def id_de(self, nombre: str) -> Optional[int]:
+        """ID estable de una receta del banco, o None si no está"""
+        return self._ids.get(nombre)
+
+    def nombre(self, recipe_id: int) -> str:
+        """Nombre de la receta con un ID del catálogo"""
+        return self.nombres[-recipe_id - 1]
+
+    def ids(self, cuisine: str, meal_type: str) -> Optional[Tuple[int, ...]]:
+        """IDs de una cocina y comida, o None si la cocina no está en el banco"""
+        return self._por_comida.get((cuisine, clave_comida(meal_type)))
+
+    def comidas(self) -> Iterator[Tuple[str, str, Tuple[int, ...]]]:
+        """Recorre las entradas (cocina, comida, IDs) del catálogo"""
+        for (cuisine, meal_key), ids in self._por_comida.items():
+            yield cuisine, meal_key, ids
+
+    def candidatos(self, cuisine: str, meal_type: str) -> Optional[List[Tuple[str, int]]]:
+        """Pares (nombre, ID) de una cocina y comida, en el orden del banco"""
+        ids = self.ids(cuisine, meal_type)
+        if ids is None:
+            return None
+        return [(self.nombre(recipe_id), recipe_id) for recipe_id in ids]
+
+    def muestreador(self, rng: Optional[random.Random] = None) -> "MuestreadorLocal":
+        """Muestreador sin reemplazo para una petición"""
+        return MuestreadorLocal(self, rng)
+
+
+class MuestreadorLocal:
+    def __init__(self, catalogo: CatalogoLocal, rng: Optional[random.Random] = None):
+        """
+        Inicializar el muestreador
+
+        Args:
+            catalogo: Catálogo del que se extraen las recetas
+            rng: Generador aleatorio (con semilla para resultados reproducibles)
+        """
+        self.catalogo = catalogo
+        self.rng = rng or random
+        # Por (cocina, comida): IDs permutados y cuántos se han extraído ya
+        self._restantes: Dict[Tuple[str, str], List[int]] = {}
+        self._extraidos: Dict[Tuple[str, str], int] = {}
+
+    def extraer(self, cuisine: str, meal_type: str, excluidos: Set[int] = frozenset()) -> Optional[Tuple[str, int]]:
+        """
+        Extrae una receta no extraída antes ni excluida
+
+        Returns:
+            tuple: (nombre, ID), o None si no quedan recetas disponibles
+        """
+        clave = (cuisine, clave_comida(meal_type))
+        ids = self._restantes.get(clave)
+        if ids is None:
+            originales = self.catalogo.ids(cuisine, meal_type)
+            if originales is None:
+                return None
+            ids = self._restantes[clave] = list(originales)
+
+        i = self._extraidos.get(clave, 0)
+        while i < len(ids):
+            j = self.rng.randrange(i, len(ids))
+            ids[i], ids[j] = ids[j], ids[i]
+            recipe_id = ids[i]
+            i += 1
+            if recipe_id not in excluidos:
+                self._extraidos[clave] = i
+                return (self.catalogo.nombre(recipe_id), recipe_id)
+
+        self._extraidos[clave] = i
+        return None
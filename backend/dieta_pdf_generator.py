@@ -3,10 +3,13 @@ Generador de PDFs para los modelos de dieta médica
 Osakidetza - Unidad de Nutrición 2015
 """
 
+import hashlib
 import json
 import os
+import threading
 from datetime import datetime
-from typing import Dict, Any, List
+from io import BytesIO
+from typing import Dict, Any, List, Optional, Tuple
 from reportlab.lib.pagesizes import A4, letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm, inch
@@ -16,89 +19,104 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.platypus.tableofcontents import TableOfContents
 from reportlab.pdfgen import canvas
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+from pdf_cache import calcular_clave
+from pdf_estilos import ESTILOS_DIETA, HOJA_BASE
+from pdf_decoraciones import dibujar_formulario
+from pdf_salida import obtener_perfil, opciones_documento
+
+
+# Caché de modelos_dieta.json por proceso: se relee solo si el archivo cambia
+_RUTA_MODELOS_DIETA = os.path.join(os.path.dirname(__file__), 'modelos_dieta.json')
+_modelos_cargados: Dict[str, Any] = {}
+_lock_modelos = threading.Lock()
+
+
+def cargar_modelos_dieta() -> Tuple[Dict[str, Any], str]:
+    """
+    Carga los modelos de dieta compartidos y su huella (hash del contenido)
+    
+    El diccionario devuelto se comparte entre generadores y no debe modificarse.
+    """
+    try:
+        estado = os.stat(_RUTA_MODELOS_DIETA)
+    except FileNotFoundError:
+        raise FileNotFoundError("No se encontró el archivo modelos_dieta.json")
+    
+    version = (estado.st_mtime_ns, estado.st_size)
+    
+    with _lock_modelos:
+        if _modelos_cargados.get('version') != version:
+            try:
+                with open(_RUTA_MODELOS_DIETA, 'r', encoding='utf-8') as file:
+                    datos = json.load(file)
+            except json.JSONDecodeError:
+                raise ValueError("Error al decodificar el archivo JSON")
+            
+            serializado = json.dumps(datos, sort_keys=True, ensure_ascii=False)
+            _modelos_cargados.update(
+                version=version,
+                datos=datos,
+                huella=hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+            )
+        
+        return _modelos_cargados['datos'], _modelos_cargados['huella']
 
 
 class DietaPDFGenerator:
     def __init__(self):
-        self.modelos_dieta = self.cargar_modelos_dieta()
-        self.styles = getSampleStyleSheet()
+        self.modelos_dieta, self._huella = cargar_modelos_dieta()
+        # Fecha impresa en la cabecera; junto con los datos determina el PDF
+        self.fecha_cabecera = datetime.now().strftime('%d/%m/%Y')
+        self.styles = HOJA_BASE
         self.setup_custom_styles()
     
     def setup_custom_styles(self):
-        """Configura estilos personalizados para el PDF"""
-        # Estilo para el título principal
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            textColor=colors.darkblue
-        )
-        
-        # Estilo para títulos de modelo
-        self.model_title_style = ParagraphStyle(
-            'ModelTitle',
-            parent=self.styles['Heading1'],
-            fontSize=16,
-            spaceAfter=15,
-            spaceBefore=15,
-            textColor=colors.darkgreen
-        )
-        
-        # Estilo para comidas
-        self.meal_title_style = ParagraphStyle(
-            'MealTitle',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            spaceAfter=10,
-            spaceBefore=10,
-            textColor=colors.darkred
-        )
-        
-        # Estilo para texto normal
-        self.normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            spaceAfter=6,
-            spaceBefore=3
-        )
-        
-        # Estilo para ingredientes
-        self.ingredient_style = ParagraphStyle(
-            'Ingredient',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            leftIndent=20,
-            spaceAfter=3
-        )
+        """Asigna los estilos personalizados del registro compartido"""
+        self.title_style = ESTILOS_DIETA.title_style
+        self.model_title_style = ESTILOS_DIETA.model_title_style
+        self.meal_title_style = ESTILOS_DIETA.meal_title_style
+        self.normal_style = ESTILOS_DIETA.normal_style
+        self.ingredient_style = ESTILOS_DIETA.ingredient_style
     
     def cargar_modelos_dieta(self) -> Dict[str, Any]:
         """Carga los modelos de dieta desde el archivo JSON"""
-        try:
-            ruta_json = os.path.join(os.path.dirname(__file__), 'modelos_dieta.json')
-            with open(ruta_json, 'r', encoding='utf-8') as file:
-                return json.load(file)
-        except FileNotFoundError:
-            raise FileNotFoundError("No se encontró el archivo modelos_dieta.json")
-        except json.JSONDecodeError:
-            raise ValueError("Error al decodificar el archivo JSON")
+        return cargar_modelos_dieta()[0]
     
-    def crear_header_footer(self, canvas, doc):
-        """Crea header y footer personalizados"""
-        canvas.saveState()
-        
+    def huella_datos(self) -> str:
+        """Hash de los modelos de dieta cargados"""
+        return self._huella
+    
+    def clave_artefacto(self, tipo: str, *parametros) -> str:
+        """Clave de caché de un PDF: tipo de documento, datos de origen, fecha de cabecera y perfil de salida"""
+        return calcular_clave(tipo, parametros, self.huella_datos(), self.fecha_cabecera, obtener_perfil().nombre)
+    
+    def dibujar_decoracion_fija(self, canvas, fecha_cabecera: Optional[str] = None):
+        """Dibuja la parte fija del header y footer (todo salvo el número de página)"""
         # Header
         canvas.setFont('Helvetica-Bold', 12)
         canvas.setFillColor(colors.darkblue)
         canvas.drawString(2*cm, A4[1] - 2*cm, "OSAKIDETZA - Modelos de Dieta")
-        canvas.drawString(A4[0] - 8*cm, A4[1] - 2*cm, f"Fecha: {datetime.now().strftime('%d/%m/%Y')}")
+        canvas.drawString(A4[0] - 8*cm, A4[1] - 2*cm, f"Fecha: {fecha_cabecera or self.fecha_cabecera}")
         
         # Footer
         canvas.setFont('Helvetica', 9)
         canvas.setFillColor(colors.grey)
         canvas.drawString(2*cm, 2*cm, "Unidad de Nutrición 2015")
+    
+    def crear_header_footer(self, canvas, doc):
+        """Crea header y footer personalizados"""
+        canvas.saveState()
+        
+        # La parte fija se define una vez por documento y se reutiliza en cada página
+        fecha_cabecera = getattr(doc, 'fecha_cabecera', None)
+        dibujar_formulario(
+            canvas,
+            "DecoracionDieta",
+            lambda canvas_form: self.dibujar_decoracion_fija(canvas_form, fecha_cabecera)
+        )
+        
+        canvas.setFont('Helvetica', 9)
+        canvas.setFillColor(colors.grey)
         canvas.drawCentredString(A4[0]/2, 2*cm, f"Página {doc.page}")
         
         canvas.restoreState()
@@ -182,21 +200,40 @@ class DietaPDFGenerator:
         elementos.append(PageBreak())
         return elementos
     
-    def generar_pdf_todos_los_modelos(self, nombre_archivo: str = "modelos_dieta_completos.pdf") -> str:
-        """Genera un PDF con todos los modelos de dieta"""
-        ruta_archivo = os.path.join(os.path.dirname(__file__), nombre_archivo)
-        
-        # Crear documento
-        doc = SimpleDocTemplate(
-            ruta_archivo,
-            pagesize=A4,
-            rightMargin=2*cm,
-            leftMargin=2*cm,
-            topMargin=3*cm,
-            bottomMargin=3*cm
-        )
+    def construir_pdf(self, contenido: List, fecha_cabecera: Optional[str] = None, **opciones_extra) -> bytes:
+        """
+        Construye el PDF en memoria y devuelve su contenido en bytes
+        
+        La fecha de cabecera viaja con el documento y no con el generador: el
+        mismo generador puede construir a la vez PDFs con fechas distintas.
+        """
+        buffer = BytesIO()
+        
+        opciones = {
+            'pagesize': A4,
+            'rightMargin': 2*cm,
+            'leftMargin': 2*cm,
+            'topMargin': 3*cm,
+            'bottomMargin': 3*cm,
+            **opciones_documento()
+        }
+        opciones.update(opciones_extra)
+        
+        doc = SimpleDocTemplate(buffer, **opciones)
+        doc.fecha_cabecera = fecha_cabecera or self.fecha_cabecera
+        doc.build(contenido, onFirstPage=self.crear_header_footer, onLaterPages=self.crear_header_footer)
         
-        # Contenido del documento
+        return buffer.getvalue()
+    
+    def guardar_pdf(self, contenido_pdf: bytes, nombre_archivo: str) -> str:
+        """Guarda un PDF ya renderizado junto al módulo y devuelve su ruta"""
+        ruta_archivo = os.path.join(os.path.dirname(__file__), nombre_archivo)
+        with open(ruta_archivo, 'wb') as archivo:
+            archivo.write(contenido_pdf)
+        return ruta_archivo
+    
+    def contenido_portada(self) -> List:
+        """Genera la portada con las instrucciones generales"""
         contenido = []
         
         # Título principal
@@ -213,6 +250,12 @@ class DietaPDFGenerator:
         
         contenido.append(Spacer(1, 1*cm))
         contenido.append(PageBreak())
+        return contenido
+    
+    def renderizar_todos_los_modelos(self, fecha_cabecera: Optional[str] = None) -> bytes:
+        """Renderiza en memoria el PDF con todos los modelos de dieta"""
+        # Contenido del documento
+        contenido = self.contenido_portada()
         
         # Generar cada modelo
         modelos = self.modelos_dieta.get('modelos_dieta', {})
@@ -222,16 +265,14 @@ class DietaPDFGenerator:
             contenido.extend(modelo_contenido)
         
         # Construir PDF
-        doc.build(contenido, onFirstPage=self.crear_header_footer, onLaterPages=self.crear_header_footer)
-        
-        return ruta_archivo
+        return self.construir_pdf(contenido, fecha_cabecera)
     
-    def generar_pdf_modelo_individual(self, modelo_numero: int, nombre_archivo: str = None) -> str:
-        """Genera un PDF para un modelo específico"""
-        if nombre_archivo is None:
-            nombre_archivo = f"modelo_dieta_{modelo_numero}.pdf"
-        
-        ruta_archivo = os.path.join(os.path.dirname(__file__), nombre_archivo)
+    def generar_pdf_todos_los_modelos(self, nombre_archivo: str = "modelos_dieta_completos.pdf") -> str:
+        """Genera un PDF con todos los modelos de dieta"""
+        return self.guardar_pdf(self.renderizar_todos_los_modelos(), nombre_archivo)
+    
+    def renderizar_modelo_individual(self, modelo_numero: int, fecha_cabecera: Optional[str] = None) -> bytes:
+        """Renderiza en memoria el PDF de un modelo específico"""
         modelo_key = f"modelo_{modelo_numero}"
         
         if modelo_key not in self.modelos_dieta.get('modelos_dieta', {}):
@@ -239,16 +280,6 @@ class DietaPDFGenerator:
         
         modelo_data = self.modelos_dieta['modelos_dieta'][modelo_key]
         
-        # Crear documento
-        doc = SimpleDocTemplate(
-            ruta_archivo,
-            pagesize=A4,
-            rightMargin=2*cm,
-            leftMargin=2*cm,
-            topMargin=3*cm,
-            bottomMargin=3*cm
-        )
-        
         # Contenido del documento
         contenido = []
         
@@ -262,17 +293,17 @@ class DietaPDFGenerator:
         contenido.extend(modelo_contenido[:-1])  # Quitar el PageBreak final
         
         # Construir PDF
-        doc.build(contenido, onFirstPage=self.crear_header_footer, onLaterPages=self.crear_header_footer)
-        
-        return ruta_archivo
+        return self.construir_pdf(contenido, fecha_cabecera)
     
-    def generar_tabla_resumen(self) -> str:
-        """Genera un PDF con tabla resumen de todos los modelos"""
-        nombre_archivo = "resumen_modelos_dieta.pdf"
-        ruta_archivo = os.path.join(os.path.dirname(__file__), nombre_archivo)
+    def generar_pdf_modelo_individual(self, modelo_numero: int, nombre_archivo: str = None) -> str:
+        """Genera un PDF para un modelo específico"""
+        if nombre_archivo is None:
+            nombre_archivo = f"modelo_dieta_{modelo_numero}.pdf"
         
-        # Crear documento
-        doc = SimpleDocTemplate(ruta_archivo, pagesize=A4)
+        return self.guardar_pdf(self.renderizar_modelo_individual(modelo_numero), nombre_archivo)
+    
+    def renderizar_tabla_resumen(self, fecha_cabecera: Optional[str] = None) -> bytes:
+        """Renderiza en memoria el PDF con tabla resumen de todos los modelos"""
         contenido = []
         
         # Título
@@ -310,8 +341,19 @@ class DietaPDFGenerator:
         
         contenido.append(tabla)
         
-        doc.build(contenido, onFirstPage=self.crear_header_footer, onLaterPages=self.crear_header_footer)
-        return ruta_archivo
+        # Márgenes por defecto de SimpleDocTemplate
+        return self.construir_pdf(
+            contenido,
+            fecha_cabecera,
+            rightMargin=inch,
+            leftMargin=inch,
+            topMargin=inch,
+            bottomMargin=inch
+        )
+    
+    def generar_tabla_resumen(self, nombre_archivo: str = "resumen_modelos_dieta.pdf") -> str:
+        """Genera un PDF con tabla resumen de todos los modelos"""
+        return self.guardar_pdf(self.renderizar_tabla_resumen(), nombre_archivo)
 
 
 def main():
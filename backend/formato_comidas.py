@@ -0,0 +1,78 @@
+"""
+Formato de las comidas de un menú semanal de dietas_2.json
+Planificador de Menús - 2026
+
+La tabla del PDF y la vista previa HTML muestran el mismo plan, así que las dos
+celdas salen de este único formateador: alimentos con sus cantidades, opciones
+con la cantidad de cada una, detalles y complementos. El resultado usa el
+marcado que entienden tanto los párrafos de reportlab como HTML (<b>, <i> y el
+salto de línea indicado), con los textos del JSON escapados.
+"""
+
+from typing import Any, List
+from xml.sax.saxutils import escape
+
+
+def _texto_opcion(opcion: Any) -> str:
+    if not isinstance(opcion, dict):
+        return str(opcion)
+    tipo = opcion.get('tipo', '')
+    cantidad = opcion.get('cantidad', '')
+    return f"{tipo} ({cantidad})" if cantidad else tipo
+
+
+def _lineas_alimentos(alimentos: List[dict]) -> List[str]:
+    lineas = []
+    for alimento in alimentos:
+        nombre = alimento.get('nombre', '')
+        cantidad = alimento.get('cantidad', '')
+        opciones = alimento.get('opciones', [])
+
+        if opciones:
+            lineas.append(f"• {nombre} ({cantidad})" if cantidad else f"• {nombre}")
+            lineas.append(f"  Opciones: {', '.join(_texto_opcion(opcion) for opcion in opciones)}")
+        elif cantidad:
+            lineas.append(f"• {nombre}: {cantidad}")
+        else:
+            lineas.append(f"• {nombre}")
+    return lineas
+
+
+def formatear_comida(comida_info: Any, salto: str = "<br/>") -> str:
+    """
+    Marcado de un desayuno, snack, comida o cena
+
+    Args:
+        comida_info: Comida tal como la genera el planificador
+        salto: Salto de línea ('<br/>' para reportlab, '<br>' para HTML)
+    """
+    if not isinstance(comida_info, dict):
+        return escape(str(comida_info))
+
+    if 'alimentos' in comida_info:
+        # Desayuno o snack
+        lineas = [escape(linea) for linea in _lineas_alimentos(comida_info['alimentos'])]
+        return f"<b>{escape(comida_info.get('tipo', ''))}</b>{salto}" + salto.join(lineas)
+
+    if 'plato_principal' in comida_info:
+        # Comida o cena
+        resultado = f"<b>{escape(comida_info['plato_principal'])}</b>{salto}"
+
+        detalles = comida_info.get('detalles', {})
+        if isinstance(detalles, dict):
+            detalles = ', '.join(f"{clave}: {valor}" for clave, valor in detalles.items())
+        if detalles:
+            resultado += f"<i>{escape(str(detalles))}</i>{salto}"
+
+        complementos = comida_info.get('complementos', [])
+        if complementos:
+            resultado += f"{salto}<b>Complementos:</b>{salto}"
+            for complemento in complementos:
+                nombre = complemento.get('nombre', '')
+                cantidad = complemento.get('cantidad', '')
+                texto = f"• {nombre}: {cantidad}" if cantidad else f"• {nombre}"
+                resultado += f"{escape(texto)}{salto}"
+
+        return resultado
+
+    return escape(str(comida_info))
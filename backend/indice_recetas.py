@@ -0,0 +1,156 @@
+"""
+Índice invertido de los platos locales para buscar por preferencias
+Planificador de Menús - 2026
+
+Con una cocina del banco local las preferencias del usuario se ignoraban:
+solo la búsqueda en Spoonacular las tenía en cuenta. El índice reúne todos los
+platos que conoce la aplicación (banco de recetas, dietas_2.json y menús de
+casa) y los ordena en memoria según los términos de las preferencias.
+
+Textos y consultas se normalizan igual: sin tildes, en minúsculas, sin
+palabras vacías y con un singular aproximado ('lentejas' -> 'lenteja').
+La puntuación suma el IDF de cada término encontrado. Con una cocina pedida
+solo se devuelven sus platos; los de otras cocinas y fuentes únicamente
+completan el resultado cuando esa cocina tiene menos coincidencias que el
+mínimo pedido.
+"""
+
+import json
+import logging
+import math
+import os
+import random
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from catalogo_local import CatalogoLocal, clave_comida
+
+logger = logging.getLogger(__name__)
+
+PALABRAS_VACIAS = frozenset({
+    "a", "al", "con", "de", "del", "el", "en", "la", "las", "lo", "los", "o", "u", "un", "una", "y", "e",
+    "the", "and", "with", "of",
+})
+
+_DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def quitar_tildes(texto: str) -> str:
+    """Texto en minúsculas y sin tildes ni diéresis ('Albóndigas' -> 'albondigas')"""
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Términos de búsqueda de un texto"""
+    terminos = []
+    for palabra in re.findall(r"[a-z0-9]+", quitar_tildes(texto)):
+        if palabra in PALABRAS_VACIAS:
+            continue
+        if len(palabra) > 3 and palabra.endswith("s"):
+            palabra = palabra[:-1]
+        terminos.append(palabra)
+    return terminos
+
+
+class IndiceRecetas:
+    def __init__(self, catalogo: CatalogoLocal):
+        """
+        Indexar todos los platos del catálogo
+
+        Args:
+            catalogo: Catálogo con el banco local y las demás fuentes ya añadidas
+        """
+        self.catalogo = catalogo
+        self._publicaciones: Dict[str, Set[int]] = defaultdict(set)
+        self._comidas: Dict[int, Set[str]] = defaultdict(set)
+        self._cocinas: Dict[int, Set[str]] = defaultdict(set)
+
+        for cuisine, meal_key, ids in catalogo.comidas():
+            for recipe_id in ids:
+                self._comidas[recipe_id].add(meal_key)
+                self._cocinas[recipe_id].add(cuisine)
+
+        for recipe_id in self._comidas:
+            for termino in tokenizar(catalogo.nombre(recipe_id)):
+                self._publicaciones[termino].add(recipe_id)
+
+        total = len(self._comidas)
+        self._idf = {
+            termino: math.log(1 + total / len(ids))
+            for termino, ids in self._publicaciones.items()
+        }
+
+    def buscar(self, consulta: str, meal_type: Optional[str] = None, cuisine: Optional[str] = None,
+               rng: Optional[random.Random] = None, minimo: int = 1) -> List[Tuple[str, int]]:
+        """
+        Platos que contienen algún término de la consulta, del más al menos relevante
+
+        Args:
+            consulta: Preferencias del usuario en texto libre
+            meal_type: Solo platos de esta comida (lunch/dinner, opcional)
+            cuisine: Cocina cuyos platos van primero (opcional)
+            rng: Generador aleatorio para desempatar (con semilla, reproducible)
+            minimo: Con menos coincidencias de la cocina pedida, se completa con las de otras
+
+        Returns:
+            list: Pares (nombre, ID); vacía si nada coincide
+        """
+        puntuaciones: Dict[int, float] = defaultdict(float)
+        for termino in set(tokenizar(consulta)):
+            for recipe_id in self._publicaciones.get(termino, ()):
+                puntuaciones[recipe_id] += self._idf[termino]
+
+        if meal_type is not None:
+            meal_key = clave_comida(meal_type)
+            puntuaciones = {i: p for i, p in puntuaciones.items() if meal_key in self._comidas[i]}
+
+        rng = rng or random
+        orden = sorted(puntuaciones, key=lambda i: (-puntuaciones[i], rng.random()))
+
+        if cuisine is not None:
+            # El IDF no debe sacar al usuario de la cocina que ha elegido
+            de_la_cocina = [i for i in orden if cuisine in self._cocinas[i]]
+            otras = [i for i in orden if cuisine not in self._cocinas[i]]
+            orden = de_la_cocina + (otras[:minimo - len(de_la_cocina)] if len(de_la_cocina) < minimo else [])
+
+        return [(self.catalogo.nombre(recipe_id), recipe_id) for recipe_id in orden]
+
+
+def _cargar_json(ruta: str):
+    try:
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logger.warning("No se pudo indexar %s: %s", ruta, e)
+        return None
+
+
+def agregar_platos_locales(catalogo: CatalogoLocal, directorio: str = _DIRECTORIO):
+    """
+    Añade al catálogo los platos de dietas_2.json y de los menús de casa
+
+    Cada fuente queda como una cocina propia ('dietas_2', 'casa'); los platos
+    que ya estaban en el banco conservan su ID.
+    """
+    datos = _cargar_json(os.path.join(directorio, "dietas_2.json"))
+    if datos:
+        dietas = datos.get("dietas_2", {})
+        for seccion, meal_key in (("comidas", "lunch"), ("cenas", "dinner")):
+            opciones = dietas.get(seccion, {}).get("opciones", [])
+            catalogo.agregar("dietas_2", meal_key, [opcion["plato"] for opcion in opciones if "plato" in opcion])
+
+    # Primeros y segundos de Cristina se sirven a mediodía
+    datos = _cargar_json(os.path.join(directorio, "cristina_menu1.json"))
+    if datos:
+        catalogo.agregar("casa", "lunch", datos.get("Primeros", []) + datos.get("Segundos", []))
+
+    for archivo in ("cristina_menus.json", "marisa_menus.json"):
+        datos = _cargar_json(os.path.join(directorio, archivo))
+        for menu in (datos or {}).get("menus", []):
+            for comidas in menu.get("semana", {}).values():
+                for meal_key in ("lunch", "dinner"):
+                    if comidas.get(meal_key):
+                        catalogo.agregar("casa", meal_key, [comidas[meal_key]])
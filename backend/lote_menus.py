@@ -0,0 +1,121 @@
+"""
+Generación por lotes de menús semanales en un ZIP en streaming
+Planificador de Menús - 2026
+
+Los PDFs de cada paciente se renderizan en paralelo en el pool de procesos y
+se añaden al ZIP en el orden en que terminan. Solo hay unos pocos PDFs en
+memoria a la vez y nunca se escribe nada en disco.
+"""
+
+import asyncio
+import re
+import zipfile
+from typing import AsyncIterator, Dict, List, Optional
+
+import pdf_render_service
+import pdf_salida
+from pdf_render_service import ServicioRender
+
+
+class _SalidaZip:
+    """Destino no posicionable para zipfile: acumula lo escrito hasta que se vacía"""
+
+    def __init__(self):
+        self._partes: List[bytes] = []
+
+    def write(self, datos) -> int:
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self) -> bytes:
+        datos = b''.join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def nombre_archivo_paciente(indice: int, nombre: str) -> str:
+    """Nombre único y seguro para el PDF de un paciente dentro del ZIP"""
+    nombre_seguro = re.sub(r'[^\w\-]+', '_', nombre).strip('_') or 'paciente'
+    return f"{indice:03d}_{nombre_seguro}.pdf"
+
+
+async def _renderizar_paciente(servicio: ServicioRender, indice: int, paciente: Dict):
+    """
+    Renderiza el menú de un paciente, esperando turno si la cola del pool está llena
+
+    Returns:
+        Tupla (indice, paciente, contenido_pdf, error)
+    """
+    try:
+        contenido_pdf = await servicio.renderizar(
+            pdf_render_service.renderizar_menu_semanal,
+            paciente.get('modo', 'aleatorio'),
+            paciente.get('semilla'),
+            paciente['nombre'],
+            esperar_sitio=True
+        )
+        return indice, paciente, contenido_pdf, None
+    except Exception as e:
+        return indice, paciente, None, e
+
+
+async def generar_zip_menus(pacientes: List[Dict], servicio: ServicioRender,
+                            max_en_curso: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    Genera un ZIP con un menú semanal en PDF por paciente, trozo a trozo
+
+    Args:
+        pacientes: Lista de dicts con 'nombre', 'modo' y 'semilla'
+        servicio: Servicio de renderizado donde se construyen los PDFs
+        max_en_curso: Máximo de PDFs renderizándose o esperando a entrar en el ZIP
+
+    Yields:
+        Trozos consecutivos del archivo ZIP
+    """
+    if max_en_curso is None:
+        max_en_curso = max(1, servicio.max_workers) * 2
+
+    salida = _SalidaZip()
+    pendientes = set()
+    siguientes = iter(enumerate(pacientes, start=1))
+
+    def lanzar_siguientes():
+        while len(pendientes) < max_en_curso:
+            try:
+                indice, paciente = next(siguientes)
+            except StopIteration:
+                return
+            pendientes.add(asyncio.ensure_future(_renderizar_paciente(servicio, indice, paciente)))
+
+    try:
+        # Los PDF ya van comprimidos: se guardan sin volver a comprimir
+        with zipfile.ZipFile(salida, mode='w', compression=zipfile.ZIP_STORED) as archivo_zip:
+            lanzar_siguientes()
+
+            while pendientes:
+                terminadas, _ = await asyncio.wait(pendientes, return_when=asyncio.FIRST_COMPLETED)
+
+                for tarea in terminadas:
+                    pendientes.discard(tarea)
+                    indice, paciente, contenido_pdf, error = tarea.result()
+                    nombre_pdf = nombre_archivo_paciente(indice, paciente['nombre'])
+
+                    if error is not None:
+                        # Un paciente fallido no interrumpe el lote: se deja constancia en el ZIP
+                        archivo_zip.writestr(f"ERRORES/{nombre_pdf[:-4]}.txt", f"Error al generar el menú: {error}")
+                    else:
+                        pdf_salida.registrar_documento("menu_semanal_lote", contenido_pdf)
+                        archivo_zip.writestr(nombre_pdf, contenido_pdf)
+                    yield salida.vaciar()
+
+                lanzar_siguientes()
+
+        # Directorio central del ZIP
+        yield salida.vaciar()
+    finally:
+        # Si el cliente se desconecta se cancelan los renderizados pendientes
+        for tarea in pendientes:
+            tarea.cancel()
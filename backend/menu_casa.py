@@ -5,16 +5,21 @@ Lee los archivos JSON de menús y genera PDFs imprimibles
 
 import json
 from datetime import datetime
-from typing import Dict, List, Optional
+from io import BytesIO
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
 from reportlab.platypus import (
     SimpleDocTemplate, Table, TableStyle, Paragraph, 
-    Spacer, PageBreak
+    Spacer, PageBreak, Flowable
 )
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from pdf_estilos import ESTILOS_MENU_CASA
+from pdf_salida import opciones_documento
+from pdf_streaming import DocumentoStreaming
+from pdf_parrafos import parrafo_celda
 
 
 def cargar_menus(archivo_json: str) -> Dict:
@@ -87,183 +92,238 @@ def obtener_menu_por_id(archivo_json: str, menu_id: int) -> Optional[Dict]:
     return None
 
 
-def generar_pdf_menu_semanal(
-    menu_cristina: Dict,
-    menu_marisa: Dict,
-    archivo_salida: str = "menu_semanal_casa.pdf"
-):
+def crear_tabla_menu(menu: Dict, nombre_persona: str, color_header) -> Table:
     """
-    Genera un PDF con los menús semanales de Cristina y Marisa
-    Formato optimizado para impresión
+    Crea la tabla semanal (comida y cena) de una persona
     
     Args:
-        menu_cristina: Diccionario con el menú de Cristina
-        menu_marisa: Diccionario con el menú de Marisa
-        archivo_salida: Nombre del archivo PDF de salida
+        menu: Diccionario con el menú ('nombre' y 'semana')
+        nombre_persona: Nombre que se muestra en la cabecera
+        color_header: Color de la cabecera y del borde
     """
-    doc = SimpleDocTemplate(
-        archivo_salida,
-        pagesize=A4,
-        rightMargin=1.5*cm,
-        leftMargin=1.5*cm,
-        topMargin=2*cm,
-        bottomMargin=2*cm
-    )
+    heading_style = ESTILOS_MENU_CASA.heading_style
+    normal_style = ESTILOS_MENU_CASA.normal_style
     
-    # Estilos
-    styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=20,
-        textColor=colors.HexColor('#2C3E50'),
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#34495E'),
-        spaceAfter=10,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
+    datos = []
     
-    # Elementos del documento
-    elementos = []
+    # Encabezado de la persona
+    datos.append([parrafo_celda(f"<b>{nombre_persona}</b>", heading_style), '', ''])
+    datos.append([parrafo_celda(f"<i>{menu['nombre']}</i>", normal_style), '', ''])
+    datos.append(['', '', ''])
     
-    # Título principal
-    fecha_actual = datetime.now().strftime("%d/%m/%Y")
-    titulo = Paragraph(f"🏠 MENÚ SEMANAL DE CASA", title_style)
-    fecha = Paragraph(f"Semana del {fecha_actual}", subtitle_style)
+    # Encabezado de columnas
+    datos.append([
+        parrafo_celda('<b>DÍA</b>', normal_style),
+        parrafo_celda('<b>COMIDA</b>', normal_style),
+        parrafo_celda('<b>CENA</b>', normal_style)
+    ])
     
-    elementos.append(titulo)
-    elementos.append(fecha)
-    elementos.append(Spacer(1, 1*cm))
+    # Días de la semana
+    dias = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+    semana = menu.get('semana', {})
     
-    # Función auxiliar para crear tabla de menú
-    def crear_tabla_menu(menu: Dict, nombre_persona: str, color_header):
-        datos = []
-        
-        # Encabezado de la persona
-        datos.append([Paragraph(f"<b>{nombre_persona}</b>", styles['Heading2']), '', ''])
-        datos.append([Paragraph(f"<i>{menu['nombre']}</i>", styles['Normal']), '', ''])
-        datos.append(['', '', ''])
+    for dia in dias:
+        dia_menu = semana.get(dia, {})
+        lunch = dia_menu.get('lunch', 'No disponible')
+        dinner = dia_menu.get('dinner', 'No disponible')
         
-        # Encabezado de columnas
         datos.append([
-            Paragraph('<b>DÍA</b>', styles['Normal']),
-            Paragraph('<b>COMIDA</b>', styles['Normal']),
-            Paragraph('<b>CENA</b>', styles['Normal'])
+            parrafo_celda(f'<b>{dia}</b>', normal_style),
+            parrafo_celda(lunch, normal_style),
+            parrafo_celda(dinner, normal_style)
         ])
+    
+    # Crear tabla
+    tabla = Table(datos, colWidths=[3.5*cm, 7*cm, 7*cm])
+    
+    # Estilo de la tabla
+    tabla.setStyle(TableStyle([
+        # Encabezado de persona
+        ('SPAN', (0, 0), (2, 0)),
+        ('BACKGROUND', (0, 0), (2, 0), color_header),
+        ('TEXTCOLOR', (0, 0), (2, 0), colors.white),
+        ('ALIGN', (0, 0), (2, 0), 'CENTER'),
+        ('FONTNAME', (0, 0), (2, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (2, 0), 14),
+        ('BOTTOMPADDING', (0, 0), (2, 0), 12),
         
-        # Días de la semana
-        dias = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
-        semana = menu.get('semana', {})
+        # Nombre del menú
+        ('SPAN', (0, 1), (2, 1)),
+        ('ALIGN', (0, 1), (2, 1), 'CENTER'),
+        ('FONTSIZE', (0, 1), (2, 1), 10),
+        ('TEXTCOLOR', (0, 1), (2, 1), colors.grey),
         
-        for dia in dias:
-            dia_menu = semana.get(dia, {})
-            lunch = dia_menu.get('lunch', 'No disponible')
-            dinner = dia_menu.get('dinner', 'No disponible')
-            
-            datos.append([
-                Paragraph(f'<b>{dia}</b>', styles['Normal']),
-                Paragraph(lunch, styles['Normal']),
-                Paragraph(dinner, styles['Normal'])
-            ])
+        # Encabezado de columnas
+        ('BACKGROUND', (0, 3), (2, 3), colors.HexColor('#ECF0F1')),
+        ('TEXTCOLOR', (0, 3), (2, 3), colors.HexColor('#2C3E50')),
+        ('ALIGN', (0, 3), (2, 3), 'CENTER'),
+        ('FONTNAME', (0, 3), (2, 3), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 3), (2, 3), 10),
+        ('BOTTOMPADDING', (0, 3), (2, 3), 8),
         
-        # Crear tabla
-        tabla = Table(datos, colWidths=[3.5*cm, 7*cm, 7*cm])
+        # Contenido de la tabla
+        ('BACKGROUND', (0, 4), (0, 10), colors.HexColor('#F8F9FA')),
+        ('FONTNAME', (0, 4), (0, 10), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 4), (0, 10), 9),
+        ('FONTSIZE', (1, 4), (2, 10), 8),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('ALIGN', (0, 4), (0, 10), 'LEFT'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 4), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 4), (-1, -1), 6),
         
-        # Estilo de la tabla
-        tabla.setStyle(TableStyle([
-            # Encabezado de persona
-            ('SPAN', (0, 0), (2, 0)),
-            ('BACKGROUND', (0, 0), (2, 0), color_header),
-            ('TEXTCOLOR', (0, 0), (2, 0), colors.white),
-            ('ALIGN', (0, 0), (2, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (2, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (2, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (2, 0), 12),
-            
-            # Nombre del menú
-            ('SPAN', (0, 1), (2, 1)),
-            ('ALIGN', (0, 1), (2, 1), 'CENTER'),
-            ('FONTSIZE', (0, 1), (2, 1), 10),
-            ('TEXTCOLOR', (0, 1), (2, 1), colors.grey),
-            
-            # Encabezado de columnas
-            ('BACKGROUND', (0, 3), (2, 3), colors.HexColor('#ECF0F1')),
-            ('TEXTCOLOR', (0, 3), (2, 3), colors.HexColor('#2C3E50')),
-            ('ALIGN', (0, 3), (2, 3), 'CENTER'),
-            ('FONTNAME', (0, 3), (2, 3), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 3), (2, 3), 10),
-            ('BOTTOMPADDING', (0, 3), (2, 3), 8),
-            
-            # Contenido de la tabla
-            ('BACKGROUND', (0, 4), (0, 10), colors.HexColor('#F8F9FA')),
-            ('FONTNAME', (0, 4), (0, 10), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 4), (0, 10), 9),
-            ('FONTSIZE', (1, 4), (2, 10), 8),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('ALIGN', (0, 4), (0, 10), 'LEFT'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 4), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 4), (-1, -1), 6),
-            
-            # Bordes
-            ('GRID', (0, 3), (-1, -1), 1, colors.HexColor('#BDC3C7')),
-            ('BOX', (0, 0), (-1, -1), 2, color_header),
-            
-            # Alternar colores de filas
-            ('ROWBACKGROUNDS', (0, 4), (-1, -1), [colors.white, colors.HexColor('#FAFAFA')])
-        ]))
+        # Bordes
+        ('GRID', (0, 3), (-1, -1), 1, colors.HexColor('#BDC3C7')),
+        ('BOX', (0, 0), (-1, -1), 2, color_header),
         
-        return tabla
+        # Alternar colores de filas
+        ('ROWBACKGROUNDS', (0, 4), (-1, -1), [colors.white, colors.HexColor('#FAFAFA')])
+    ]))
+    
+    return tabla
+
+
+def iterar_elementos_menu_semanal(menu_cristina: Dict, menu_marisa: Dict,
+                                  fecha: Optional[datetime] = None) -> Iterator[Flowable]:
+    """
+    Produce uno a uno los elementos del PDF de una semana de casa
+    
+    Args:
+        menu_cristina: Diccionario con el menú de Cristina
+        menu_marisa: Diccionario con el menú de Marisa
+        fecha: Fecha de la semana que se imprime (por defecto, hoy)
+    """
+    # Título principal
+    fecha_actual = (fecha or datetime.now()).strftime("%d/%m/%Y")
+    titulo = Paragraph(f"🏠 MENÚ SEMANAL DE CASA", ESTILOS_MENU_CASA.title_style)
+    fecha = Paragraph(f"Semana del {fecha_actual}", ESTILOS_MENU_CASA.subtitle_style)
+    
+    yield titulo
+    yield fecha
+    yield Spacer(1, 1*cm)
     
     # Menú de Cristina
     color_cristina = colors.HexColor('#E74C3C')
-    tabla_cristina = crear_tabla_menu(menu_cristina, "👩 CRISTINA", color_cristina)
-    elementos.append(tabla_cristina)
-    elementos.append(Spacer(1, 1*cm))
+    yield crear_tabla_menu(menu_cristina, "👩 CRISTINA", color_cristina)
+    yield Spacer(1, 1*cm)
     
     # Salto de página
-    elementos.append(PageBreak())
+    yield PageBreak()
     
     # Repetir título en segunda página
-    elementos.append(titulo)
-    elementos.append(fecha)
-    elementos.append(Spacer(1, 1*cm))
+    yield titulo
+    yield fecha
+    yield Spacer(1, 1*cm)
     
     # Menú de Marisa
     color_marisa = colors.HexColor('#3498DB')
-    tabla_marisa = crear_tabla_menu(menu_marisa, "👩 MARISA", color_marisa)
-    elementos.append(tabla_marisa)
+    yield crear_tabla_menu(menu_marisa, "👩 MARISA", color_marisa)
+
+
+def _crear_documento(destino) -> DocumentoStreaming:
+    """Documento A4 con los márgenes de impresión de los menús de casa"""
+    return DocumentoStreaming(
+        destino,
+        pagesize=A4,
+        rightMargin=1.5*cm,
+        leftMargin=1.5*cm,
+        topMargin=2*cm,
+        bottomMargin=2*cm,
+        **opciones_documento()
+    )
+
+
+def renderizar_pdf_menu_semanal(menu_cristina: Dict, menu_marisa: Dict,
+                                fecha: Optional[datetime] = None) -> bytes:
+    """
+    Renderiza en memoria el PDF con los menús semanales de Cristina y Marisa
+    Formato optimizado para impresión
+    
+    Args:
+        menu_cristina: Diccionario con el menú de Cristina
+        menu_marisa: Diccionario con el menú de Marisa
+        fecha: Fecha de la semana que se imprime (por defecto, hoy)
+        
+    Returns:
+        Contenido del PDF en bytes
+    """
+    buffer = BytesIO()
+    doc = _crear_documento(buffer)
+    doc.build(iterar_elementos_menu_semanal(menu_cristina, menu_marisa, fecha))
+    return buffer.getvalue()
+
+
+def renderizar_libro_menus_casa(
+    semanas: Iterable[Tuple[Dict, Dict]],
+    destino=None,
+    fecha: Optional[datetime] = None
+) -> Optional[bytes]:
+    """
+    Renderiza un libro con muchas semanas de menús de casa
+    
+    'semanas' puede ser un generador: cada semana se pide cuando le toca
+    maquetarse, así que la memoria no crece con el número de semanas más
+    allá del propio PDF.
+    
+    Args:
+        semanas: Pares (menu_cristina, menu_marisa), uno por semana
+        destino: Archivo donde escribir el PDF; si no se indica se devuelven los bytes
+        fecha: Fecha que se imprime en cada semana (por defecto, hoy)
+        
+    Returns:
+        Contenido del PDF en bytes, o None si se escribió en 'destino'
+    """
+    fecha = fecha or datetime.now()
+    
+    def elementos_libro():
+        for indice, (menu_cristina, menu_marisa) in enumerate(semanas):
+            if indice:
+                yield PageBreak()
+            yield from iterar_elementos_menu_semanal(menu_cristina, menu_marisa, fecha)
+    
+    buffer = destino if destino is not None else BytesIO()
+    doc = _crear_documento(buffer)
+    doc.build(elementos_libro())
+    return None if destino is not None else buffer.getvalue()
+
+
+def generar_pdf_menu_semanal(
+    menu_cristina: Dict,
+    menu_marisa: Dict,
+    archivo_salida: str = "menu_semanal_casa.pdf"
+):
+    """
+    Genera un PDF con los menús semanales de Cristina y Marisa
+    Formato optimizado para impresión
+    
+    Args:
+        menu_cristina: Diccionario con el menú de Cristina
+        menu_marisa: Diccionario con el menú de Marisa
+        archivo_salida: Nombre del archivo PDF de salida
+    """
+    contenido_pdf = renderizar_pdf_menu_semanal(menu_cristina, menu_marisa)
+    
+    with open(archivo_salida, 'wb') as f:
+        f.write(contenido_pdf)
     
-    # Generar PDF
-    doc.build(elementos)
     print(f"\n✅ PDF generado exitosamente: {archivo_salida}")
     return archivo_salida
 
 
-def generar_menu_desde_cristina_menu1(archivo_salida: str = "menu_semanal_casa.pdf"):
+def construir_menus_desde_cristina_menu1(semilla: Optional[int] = None) -> Optional[Tuple[Dict, Dict]]:
     """
-    Genera menú usando cristina_menu1.json (con Primeros y Segundos)
-    y marisa_menus.json
+    Construye los menús de la semana usando cristina_menu1.json
+    (con Primeros y Segundos) y marisa_menus.json
     
     Args:
-        archivo_salida: Nombre del archivo de salida
+        semilla: Semilla para reproducir la selección de recetas (opcional)
+    
+    Returns:
+        Tupla (menu_cristina, menu_marisa) o None si falta algún dato
     """
     import random
-    
-    print("\n" + "="*60)
-    print("🏠 GENERADOR DE MENÚ SEMANAL DE CASA")
-    print("="*60)
+    aleatorio = random.Random(semilla) if semilla is not None else random
     
     # Cargar cristina_menu1.json
     try:
@@ -285,13 +345,13 @@ def generar_menu_desde_cristina_menu1(archivo_salida: str = "menu_semanal_casa.p
     semana_cristina = {}
     
     # Seleccionar recetas únicas para la semana
-    primeros_semana = random.sample(primeros, min(7, len(primeros)))
-    segundos_semana = random.sample(segundos, min(7, len(segundos)))
+    primeros_semana = aleatorio.sample(primeros, min(7, len(primeros)))
+    segundos_semana = aleatorio.sample(segundos, min(7, len(segundos)))
     
     for i, dia in enumerate(dias):
         semana_cristina[dia] = {
-            "lunch": primeros_semana[i] if i < len(primeros_semana) else random.choice(primeros),
-            "dinner": segundos_semana[i] if i < len(segundos_semana) else random.choice(segundos)
+            "lunch": primeros_semana[i] if i < len(primeros_semana) else aleatorio.choice(primeros),
+            "dinner": segundos_semana[i] if i < len(segundos_semana) else aleatorio.choice(segundos)
         }
     
     menu_cristina = {
@@ -312,8 +372,43 @@ def generar_menu_desde_cristina_menu1(archivo_salida: str = "menu_semanal_casa.p
     print(f"\n📋 Menú generado para Cristina desde cristina_menu1.json")
     print(f"📋 Menú seleccionado para Marisa: {menu_marisa['nombre']}")
     
+    return menu_cristina, menu_marisa
+
+
+def renderizar_menu_desde_cristina_menu1() -> Optional[bytes]:
+    """
+    Renderiza en memoria el PDF del menú construido desde cristina_menu1.json
+    
+    Returns:
+        Contenido del PDF en bytes o None si no se pudieron cargar los menús
+    """
+    menus = construir_menus_desde_cristina_menu1()
+    
+    if menus is None:
+        return None
+    
+    return renderizar_pdf_menu_semanal(*menus)
+
+
+def generar_menu_desde_cristina_menu1(archivo_salida: str = "menu_semanal_casa.pdf"):
+    """
+    Genera menú usando cristina_menu1.json (con Primeros y Segundos)
+    y marisa_menus.json
+    
+    Args:
+        archivo_salida: Nombre del archivo de salida
+    """
+    print("\n" + "="*60)
+    print("🏠 GENERADOR DE MENÚ SEMANAL DE CASA")
+    print("="*60)
+    
+    menus = construir_menus_desde_cristina_menu1()
+    
+    if menus is None:
+        return None
+    
     # Generar PDF
-    return generar_pdf_menu_semanal(menu_cristina, menu_marisa, archivo_salida)
+    return generar_pdf_menu_semanal(*menus, archivo_salida)
 
 def generar_menu_casa_automatico(
     id_cristina: int = 1,
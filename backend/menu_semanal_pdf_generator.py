@@ -6,80 +6,42 @@ Planificador de Menús - 2026
 import json
 import os
 from datetime import datetime
-from typing import Dict, Any, List
+from io import BytesIO
+from typing import Dict, Any, Iterator, List, Optional
+from xml.sax.saxutils import escape
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
 from reportlab.lib.colors import black, blue, red, green, darkblue, darkgreen
 from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Flowable
 from reportlab.pdfgen import canvas
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from planificador_semanal_simple import PlanificadorSemanalSimple
+from pdf_estilos import ESTILOS_MENU_SEMANAL, HOJA_BASE
+from pdf_decoraciones import dibujar_formulario
+from pdf_salida import obtener_perfil, opciones_documento
+from pdf_streaming import DocumentoStreaming
+from pdf_parrafos import parrafo_celda
+from formato_comidas import formatear_comida
+from almacen_artefactos import almacen
 
 
 class MenuSemanalPDFGenerator:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
+        self.styles = HOJA_BASE
         self.setup_custom_styles()
         
     def setup_custom_styles(self):
-        """Configura estilos personalizados para el PDF"""
-        # Estilo para el título principal
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=20,
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            textColor=darkblue,
-            fontName='Helvetica-Bold'
-        )
-        
-        # Estilo para subtítulos
-        self.subtitle_style = ParagraphStyle(
-            'SubTitle',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            spaceAfter=10,
-            spaceBefore=10,
-            alignment=TA_CENTER,
-            textColor=darkgreen
-        )
-        
-        # Estilo para texto normal
-        self.normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceBefore=3,
-            spaceAfter=3
-        )
-        
-        # Estilo para encabezados de tabla
-        self.header_style = ParagraphStyle(
-            'HeaderStyle',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            alignment=TA_CENTER,
-            textColor=colors.white,
-            fontName='Helvetica-Bold'
-        )
-        
-        # Estilo para contenido de tabla
-        self.cell_style = ParagraphStyle(
-            'CellStyle',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            alignment=TA_LEFT,
-            spaceBefore=2,
-            spaceAfter=2
-        )
+        """Asigna los estilos personalizados del registro compartido"""
+        self.title_style = ESTILOS_MENU_SEMANAL.title_style
+        self.subtitle_style = ESTILOS_MENU_SEMANAL.subtitle_style
+        self.normal_style = ESTILOS_MENU_SEMANAL.normal_style
+        self.header_style = ESTILOS_MENU_SEMANAL.header_style
+        self.cell_style = ESTILOS_MENU_SEMANAL.cell_style
     
-    def crear_encabezado_y_pie(self, canvas_obj, doc):
-        """Crear encabezado y pie de página para cada página"""
-        canvas_obj.saveState()
-        
+    def dibujar_decoracion_fija(self, canvas_obj, fecha_actual: str):
+        """Dibujar la parte fija del encabezado y pie (todo salvo el número de página)"""
         # === ENCABEZADO ===
         # Línea superior
         canvas_obj.setStrokeColor(darkblue)
@@ -89,15 +51,11 @@ class MenuSemanalPDFGenerator:
         # Título en encabezado
         canvas_obj.setFont("Helvetica-Bold", 12)
         canvas_obj.setFillColor(darkblue)
-        width = A4[0]
-        text = "PLANIFICADOR SEMANAL - DIETAS 2"
-        text_width = canvas_obj.stringWidth(text, "Helvetica-Bold", 12)
-        canvas_obj.drawString((width - text_width) / 2, A4[1] - 1.5*cm, text)
+        canvas_obj.drawCentredString(A4[0] / 2, A4[1] - 1.5*cm, "PLANIFICADOR SEMANAL - DIETAS 2")
         
         # Fecha de generación
         canvas_obj.setFont("Helvetica", 10)
         canvas_obj.setFillColor(black)
-        fecha_actual = datetime.now().strftime("%d/%m/%Y - %H:%M")
         canvas_obj.drawRightString(A4[0] - 2*cm, A4[1] - 1.5*cm, f"Generado: {fecha_actual}")
         
         # === PIE DE PÁGINA ===
@@ -106,95 +64,33 @@ class MenuSemanalPDFGenerator:
         canvas_obj.setLineWidth(1)
         canvas_obj.line(2*cm, 2*cm, A4[0] - 2*cm, 2*cm)
         
-        # Número de página
+        # Información adicional
         canvas_obj.setFont("Helvetica", 9)
         canvas_obj.setFillColor(colors.grey)
-        text = f"Página {doc.page}"
-        text_width = canvas_obj.stringWidth(text, "Helvetica", 9)
-        canvas_obj.drawString((width - text_width) / 2, 1.5*cm, text)
+        canvas_obj.drawCentredString(A4[0] / 2, 1*cm, "Planificador de Menús - Sistema Automatizado")
+    
+    def crear_encabezado_y_pie(self, canvas_obj, doc):
+        """Crear encabezado y pie de página para cada página"""
+        canvas_obj.saveState()
         
-        # Información adicional
-        info_text = "Planificador de Menús - Sistema Automatizado"
-        info_width = canvas_obj.stringWidth(info_text, "Helvetica", 9)
-        canvas_obj.drawString((width - info_width) / 2, 1*cm, info_text)
+        # La parte fija se define una vez por documento y se reutiliza en cada página
+        fecha_actual = getattr(doc, 'fecha_generacion', None) or datetime.now().strftime("%d/%m/%Y - %H:%M")
+        dibujar_formulario(
+            canvas_obj,
+            "DecoracionMenuSemanal",
+            lambda canvas_form: self.dibujar_decoracion_fija(canvas_form, fecha_actual)
+        )
+        
+        # Número de página
+        canvas_obj.setFont("Helvetica", 9)
+        canvas_obj.setFillColor(colors.grey)
+        canvas_obj.drawCentredString(A4[0] / 2, 1.5*cm, f"Página {doc.page}")
         
         canvas_obj.restoreState()
     
     def formatear_texto_comida(self, comida_info: Dict) -> str:
-        """Formatear información de comida para mostrar en tabla"""
-        if isinstance(comida_info, dict):
-            if 'alimentos' in comida_info:
-                # Es un desayuno o snack
-                tipo = comida_info.get('tipo', '')
-                alimentos = comida_info['alimentos']
-                
-                texto_alimentos = []
-                for alimento in alimentos:
-                    nombre = alimento.get('nombre', '')
-                    cantidad = alimento.get('cantidad', '')
-                    opciones = alimento.get('opciones', [])
-                    
-                    if opciones:
-                        # Formatear opciones
-                        opciones_texto = []
-                        for opcion in opciones:
-                            if isinstance(opcion, dict):
-                                tipo_op = opcion.get('tipo', '')
-                                cant_op = opcion.get('cantidad', '')
-                                if cant_op:
-                                    opciones_texto.append(f"{tipo_op} ({cant_op})")
-                                else:
-                                    opciones_texto.append(tipo_op)
-                            else:
-                                opciones_texto.append(str(opcion))
-                        
-                        if cantidad:
-                            texto_alimentos.append(f"• {nombre} ({cantidad})")
-                        else:
-                            texto_alimentos.append(f"• {nombre}")
-                        texto_alimentos.append(f"  Opciones: {', '.join(opciones_texto)}")
-                    elif cantidad:
-                        texto_alimentos.append(f"• {nombre}: {cantidad}")
-                    else:
-                        texto_alimentos.append(f"• {nombre}")
-                
-                resultado = f"<b>{tipo}</b><br/>"
-                resultado += "<br/>".join(texto_alimentos)
-                return resultado
-                
-            elif 'plato_principal' in comida_info:
-                # Es una comida o cena
-                plato = comida_info['plato_principal']
-                detalles = comida_info.get('detalles', {})
-                complementos = comida_info.get('complementos', [])
-                
-                resultado = f"<b>{plato}</b><br/>"
-                
-                # Agregar detalles si existen
-                if detalles:
-                    if isinstance(detalles, dict):
-                        detalles_texto = []
-                        for key, value in detalles.items():
-                            detalles_texto.append(f"{key}: {value}")
-                        if detalles_texto:
-                            resultado += f"<i>{', '.join(detalles_texto)}</i><br/>"
-                    else:
-                        resultado += f"<i>{detalles}</i><br/>"
-                
-                # Agregar complementos
-                if complementos:
-                    resultado += "<br/><b>Complementos:</b><br/>"
-                    for complemento in complementos:
-                        nombre = complemento.get('nombre', '')
-                        cantidad = complemento.get('cantidad', '')
-                        if cantidad:
-                            resultado += f"• {nombre}: {cantidad}<br/>"
-                        else:
-                            resultado += f"• {nombre}<br/>"
-                
-                return resultado
-        
-        return str(comida_info)
+        """Formatear información de comida para mostrar en tabla (el mismo formato que la vista previa)"""
+        return formatear_comida(comida_info)
     
     def crear_tabla_menu(self, menu_semanal: List[Dict]) -> Table:
         """Crear tabla con el menú semanal"""
@@ -203,7 +99,7 @@ class MenuSemanalPDFGenerator:
         
         # Datos de la tabla
         datos_tabla = []
-        datos_tabla.append([Paragraph(header, self.header_style) for header in encabezados])
+        datos_tabla.append([parrafo_celda(header, self.header_style) for header in encabezados])
         
         for menu_dia in menu_semanal:
             dia = menu_dia['dia']
@@ -212,13 +108,13 @@ class MenuSemanalPDFGenerator:
             comida = self.formatear_texto_comida(menu_dia['comida'])
             cena = self.formatear_texto_comida(menu_dia['cena'])
             
-            # Crear párrafos para cada celda
+            # Párrafos compartidos: los textos repetidos se maquetan una sola vez
             fila = [
-                Paragraph(f"<b>{dia}</b>", self.cell_style),
-                Paragraph(desayuno, self.cell_style),
-                Paragraph(snack, self.cell_style),
-                Paragraph(comida, self.cell_style),
-                Paragraph(cena, self.cell_style)
+                parrafo_celda(f"<b>{dia}</b>", self.cell_style),
+                parrafo_celda(desayuno, self.cell_style),
+                parrafo_celda(snack, self.cell_style),
+                parrafo_celda(comida, self.cell_style),
+                parrafo_celda(cena, self.cell_style)
             ]
             datos_tabla.append(fila)
         
@@ -259,56 +155,33 @@ class MenuSemanalPDFGenerator:
         
         return tabla
     
-    def generar_menu_semanal_pdf(self, filename: str = None, modo: str = 'aleatorio') -> str:
+    def iterar_contenido_menu(self, menu_semanal: List[Dict], requisitos: Dict,
+                              modo: str = 'aleatorio', paciente: Optional[str] = None,
+                              titulo: str = "MENÚ SEMANAL - DIETAS 2",
+                              fecha: Optional[datetime] = None) -> Iterator[Flowable]:
         """
-        Generar PDF con menú semanal
+        Producir uno a uno los flowables de un menú semanal
         
         Args:
-            filename: Nombre del archivo PDF (opcional)
+            menu_semanal: Menú generado por el planificador
+            requisitos: Requisitos diarios de dietas_2.json
             modo: 'aleatorio' o 'secuencial'
-        
-        Returns:
-            Ruta del archivo PDF generado
+            paciente: Nombre del paciente que se imprime bajo el título (opcional)
+            titulo: Título de la sección
+            fecha: Fecha de generación que se imprime (por defecto, ahora)
         """
-        # Generar menú usando el planificador
-        planificador = PlanificadorSemanalSimple('dietas_2.json')
-        
-        if not planificador.dietas_data:
-            raise Exception("No se pudieron cargar los datos de dietas_2.json")
-        
-        menu_semanal = planificador.generar_menu_semanal(modo=modo)
-        requisitos = planificador.dietas_data.get('requisitos_diarios', {})
-        
-        # Configurar nombre del archivo
-        if filename is None:
-            fecha_actual = datetime.now().strftime("%Y%m%d_%H%M")
-            filename = f"menu_semanal_dieta2_{fecha_actual}.pdf"
-        
-        # Crear documento PDF
-        doc = SimpleDocTemplate(
-            filename,
-            pagesize=A4,
-            rightMargin=2*cm,
-            leftMargin=2*cm,
-            topMargin=3*cm,
-            bottomMargin=2.5*cm,
-            title="Menú Semanal - Dietas 2"
-        )
-        
-        # Crear contenido
-        contenido = []
-        
         # Título principal
-        titulo = "MENÚ SEMANAL - DIETAS 2"
-        contenido.append(Paragraph(titulo, self.title_style))
-        contenido.append(Spacer(1, 0.5*cm))
+        yield Paragraph(titulo, self.title_style)
+        if paciente:
+            yield Paragraph(f"Paciente: {escape(paciente)}", self.subtitle_style)
+        yield Spacer(1, 0.5*cm)
         
         # Fecha de generación y tipo de menú
-        fecha_generacion = datetime.now().strftime("%d de %B de %Y")
+        fecha_generacion = (fecha or datetime.now()).strftime("%d de %B de %Y")
         tipo_menu = "Aleatorio" if modo == 'aleatorio' else "Secuencial"
         info_generacion = f"Generado el {fecha_generacion} | Tipo: {tipo_menu}"
-        contenido.append(Paragraph(info_generacion, self.subtitle_style))
-        contenido.append(Spacer(1, 0.3*cm))
+        yield Paragraph(info_generacion, self.subtitle_style)
+        yield Spacer(1, 0.3*cm)
         
         # Requisitos diarios
         if requisitos:
@@ -316,15 +189,14 @@ class MenuSemanalPDFGenerator:
             for key, value in requisitos.items():
                 nombre = key.replace('_', ' ').title()
                 req_texto += f"• <b>{nombre}</b>: {value}<br/>"
-            contenido.append(Paragraph(req_texto, self.normal_style))
-            contenido.append(Spacer(1, 0.4*cm))
+            yield Paragraph(req_texto, self.normal_style)
+            yield Spacer(1, 0.4*cm)
         
         # Tabla del menú semanal
-        tabla_menu = self.crear_tabla_menu(menu_semanal)
-        contenido.append(tabla_menu)
+        yield self.crear_tabla_menu(menu_semanal)
         
         # Espacio final
-        contenido.append(Spacer(1, 1*cm))
+        yield Spacer(1, 1*cm)
         
         # Nota final
         nota_final = """
@@ -334,13 +206,144 @@ class MenuSemanalPDFGenerator:
         • Respetar las cantidades y requisitos diarios especificados<br/>
         • Para dudas consulte con su especialista en nutrición
         """
-        contenido.append(Paragraph(nota_final, self.normal_style))
+        yield Paragraph(nota_final, self.normal_style)
+    
+    def crear_documento(self, buffer, title: str, fecha: Optional[datetime] = None) -> DocumentoStreaming:
+        """
+        Crear el documento con márgenes, perfil de salida y fecha de cabecera
+        
+        En el perfil reproducible la cabecera lleva solo el día: con la hora,
+        dos renders del mismo plan tendrían bytes distintos.
+        """
+        doc = DocumentoStreaming(
+            buffer,
+            pagesize=A4,
+            rightMargin=2*cm,
+            leftMargin=2*cm,
+            topMargin=3*cm,
+            bottomMargin=2.5*cm,
+            title=title,
+            **opciones_documento()
+        )
+        # Fecha de la cabecera, calculada una sola vez por documento
+        formato = "%d/%m/%Y" if obtener_perfil().invariante else "%d/%m/%Y - %H:%M"
+        doc.fecha_generacion = (fecha or datetime.now()).strftime(formato)
+        return doc
+    
+    def renderizar_menu_semanal(self, modo: str = 'aleatorio',
+                                planificador: PlanificadorSemanalSimple = None,
+                                semilla: Optional[int] = None,
+                                paciente: Optional[str] = None,
+                                fecha: Optional[datetime] = None) -> bytes:
+        """
+        Renderizar en memoria el PDF con menú semanal
+        
+        Args:
+            modo: 'aleatorio' o 'secuencial'
+            planificador: Planificador ya cargado (opcional, evita releer dietas_2.json)
+            semilla: Semilla para reproducir el menú aleatorio (opcional)
+            paciente: Nombre del paciente que se imprime bajo el título (opcional)
+            fecha: Fecha de generación que se imprime (por defecto, ahora)
+        
+        Returns:
+            Contenido del PDF en bytes
+        """
+        # Generar menú usando el planificador
+        if planificador is None:
+            planificador = PlanificadorSemanalSimple('dietas_2.json')
+        
+        if not planificador.dietas_data:
+            raise Exception("No se pudieron cargar los datos de dietas_2.json")
+        
+        menu_semanal = planificador.generar_menu_semanal(modo=modo, semilla=semilla)
+        requisitos = planificador.dietas_data.get('requisitos_diarios', {})
+        
+        # Crear documento PDF en memoria
+        fecha = fecha or datetime.now()
+        buffer = BytesIO()
+        doc = self.crear_documento(buffer, "Menú Semanal - Dietas 2", fecha)
         
         # Crear PDF con encabezado y pie de página personalizados
-        doc.build(contenido, 
+        doc.build(self.iterar_contenido_menu(menu_semanal, requisitos, modo, paciente, fecha=fecha),
+                 onFirstPage=self.crear_encabezado_y_pie,
+                 onLaterPages=self.crear_encabezado_y_pie)
+        
+        return buffer.getvalue()
+    
+    def renderizar_libro_menus(self, semanas: int, modo: str = 'aleatorio',
+                               planificador: PlanificadorSemanalSimple = None,
+                               semilla: Optional[int] = None,
+                               paciente: Optional[str] = None,
+                               destino=None,
+                               fecha: Optional[datetime] = None) -> Optional[bytes]:
+        """
+        Renderizar un libro con varias semanas de menú, una por página
+        
+        Los menús se generan a medida que se maquetan, así que la memoria no
+        crece con el número de semanas más allá del propio PDF.
+        
+        Args:
+            semanas: Número de semanas del libro
+            modo: 'aleatorio' o 'secuencial'
+            planificador: Planificador ya cargado (opcional)
+            semilla: Semilla base; la semana i usa semilla + i (opcional)
+            paciente: Nombre del paciente (opcional)
+            destino: Archivo donde escribir el PDF; si no se indica se devuelven los bytes
+            fecha: Fecha de generación que se imprime (por defecto, ahora)
+        
+        Returns:
+            Contenido del PDF en bytes, o None si se escribió en 'destino'
+        """
+        if planificador is None:
+            planificador = PlanificadorSemanalSimple('dietas_2.json')
+        
+        if not planificador.dietas_data:
+            raise Exception("No se pudieron cargar los datos de dietas_2.json")
+        
+        requisitos = planificador.dietas_data.get('requisitos_diarios', {})
+        fecha = fecha or datetime.now()
+        
+        def contenido_libro():
+            for semana in range(semanas):
+                if semana:
+                    yield PageBreak()
+                semilla_semana = None if semilla is None else semilla + semana
+                menu_semanal = planificador.generar_menu_semanal(modo=modo, semilla=semilla_semana)
+                yield from self.iterar_contenido_menu(
+                    menu_semanal, requisitos, modo, paciente,
+                    titulo=f"MENÚ SEMANAL - SEMANA {semana + 1}",
+                    fecha=fecha
+                )
+        
+        buffer = destino if destino is not None else BytesIO()
+        doc = self.crear_documento(buffer, f"Libro de menús - {semanas} semanas", fecha)
+        doc.build(contenido_libro(),
                  onFirstPage=self.crear_encabezado_y_pie,
                  onLaterPages=self.crear_encabezado_y_pie)
         
+        return None if destino is not None else buffer.getvalue()
+    
+    def generar_menu_semanal_pdf(self, filename: str = None, modo: str = 'aleatorio') -> str:
+        """
+        Generar PDF con menú semanal
+        
+        Args:
+            filename: Nombre del archivo PDF (opcional; sin él se guarda en el almacén de artefactos)
+            modo: 'aleatorio' o 'secuencial'
+        
+        Returns:
+            Ruta del archivo PDF generado
+        """
+        contenido_pdf = self.renderizar_menu_semanal(modo)
+        
+        # Sin nombre explícito el PDF va al almacén, con caducidad y límite de disco
+        if filename is None:
+            fecha_actual = datetime.now().strftime("%Y%m%d_%H%M")
+            return almacen.guardar(f"menu_semanal_dieta2_{fecha_actual}.pdf", contenido_pdf)
+        
+        with open(filename, 'wb') as archivo:
+            archivo.write(contenido_pdf)
+        
         return filename
 
 
@@ -360,6 +363,20 @@ def generar_menu_semanal_pdf(filename: str = None, modo: str = 'aleatorio') -> s
     return generador.generar_menu_semanal_pdf(filename, modo)
 
 
+def renderizar_menu_semanal_pdf(modo: str = 'aleatorio') -> bytes:
+    """
+    Función de conveniencia para renderizar en memoria el PDF de menú semanal
+    
+    Args:
+        modo: 'aleatorio' o 'secuencial'
+    
+    Returns:
+        Contenido del PDF en bytes
+    """
+    generador = MenuSemanalPDFGenerator()
+    return generador.renderizar_menu_semanal(modo)
+
+
 # Función de prueba
 def main():
     """Función de prueba"""
@@ -0,0 +1,240 @@
+"""
+Vista previa de menús semanales en JSON y HTML, sin pasar por reportlab
+Planificador de Menús - 2026
+
+El frontend puede recorrer y ajustar una semana (cambiando la semilla) en
+milisegundos y pedir el PDF solo al final con la misma semilla, que produce
+exactamente el mismo plan. Las plantillas HTML se compilan una vez al
+importar y las vistas ya generadas se guardan en una caché LRU.
+"""
+
+import os
+import threading
+from datetime import datetime
+from functools import lru_cache
+from html import escape
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import menu_casa
+from formato_comidas import formatear_comida
+from planificador_semanal_simple import PlanificadorSemanalSimple
+
+_RUTA_DIETAS_2 = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dietas_2.json')
+
+TAMANO_CACHE = int(os.getenv("VISTA_PREVIA_CACHE", "256"))
+
+# Plantillas precompiladas
+PLANTILLA_PAGINA = Template("""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>$titulo</title>
+<style>
+body { font-family: Helvetica, Arial, sans-serif; margin: 2em; color: #2C3E50; }
+h1 { color: #00008B; text-align: center; }
+p.subtitulo { text-align: center; color: #006400; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 2em; }
+th { background: #2C3E50; color: white; padding: 6px; }
+td { border: 1px solid #BDC3C7; padding: 6px; vertical-align: top; font-size: 0.9em; }
+tr:nth-child(even) td { background: #FAFAFA; }
+td.dia { font-weight: bold; background: #F8F9FA; }
+a.boton { display: inline-block; background: #3498DB; color: white; padding: 8px 16px; border-radius: 4px; text-decoration: none; }
+</style>
+</head>
+<body>
+<h1>$titulo</h1>
+<p class="subtitulo">$subtitulo</p>
+$cuerpo
+</body>
+</html>
+""")
+
+PLANTILLA_TABLA_DIETAS = Template("""<table>
+<tr><th>Día</th><th>Desayuno</th><th>Snack</th><th>Comida</th><th>Cena</th></tr>
+$filas
+</table>""")
+
+PLANTILLA_FILA_DIETAS = Template(
+    '<tr><td class="dia">$dia</td><td>$desayuno</td><td>$snack</td><td>$comida</td><td>$cena</td></tr>'
+)
+
+PLANTILLA_TABLA_CASA = Template("""<h2>$persona</h2>
+<p><i>$nombre_menu</i></p>
+<table>
+<tr><th>Día</th><th>Comida</th><th>Cena</th></tr>
+$filas
+</table>""")
+
+PLANTILLA_FILA_CASA = Template('<tr><td class="dia">$dia</td><td>$lunch</td><td>$dinner</td></tr>')
+
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+
+# Planificador compartido, recargado solo si cambia dietas_2.json
+_planificador_cargado: Dict[str, Any] = {}
+_lock_planificador = threading.Lock()
+
+
+def _cargar_planificador() -> Tuple[PlanificadorSemanalSimple, Tuple[int, int]]:
+    """Devuelve el planificador de dietas_2.json y la versión del archivo"""
+    estado = os.stat(_RUTA_DIETAS_2)
+    version = (estado.st_mtime_ns, estado.st_size)
+
+    with _lock_planificador:
+        if _planificador_cargado.get('version') != version:
+            _planificador_cargado.update(
+                version=version,
+                planificador=PlanificadorSemanalSimple(_RUTA_DIETAS_2)
+            )
+        return _planificador_cargado['planificador'], version
+
+
+def normalizar_semilla(modo: str, semilla: Optional[int]) -> Optional[int]:
+    """El modo secuencial no depende de la semilla; así comparte entrada de caché"""
+    return None if modo == 'secuencial' else semilla
+
+
+def vista_menu_dietas(modo: str, semilla: Optional[int]) -> Dict[str, Any]:
+    """
+    Plan semanal de dietas_2.json en formato JSON
+
+    El diccionario devuelto se comparte a través de la caché y no debe modificarse.
+
+    Args:
+        modo: 'aleatorio' o 'secuencial'
+        semilla: Semilla del menú aleatorio (la misma que acepta el PDF)
+    """
+    _, version = _cargar_planificador()
+    return _vista_menu_dietas(modo, normalizar_semilla(modo, semilla), version)
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _vista_menu_dietas(modo: str, semilla: Optional[int], version: Tuple[int, int]) -> Dict[str, Any]:
+    planificador, _ = _cargar_planificador()
+    if not planificador.dietas_data:
+        raise ValueError("No se pudieron cargar los datos de dietas_2.json")
+
+    return {
+        "tipo": "dietas_2",
+        "modo": modo,
+        "semilla": semilla,
+        "requisitos": planificador.dietas_data.get('requisitos_diarios', {}),
+        "menu": planificador.generar_menu_semanal(modo=modo, semilla=semilla),
+    }
+
+
+def vista_menu_casa(semilla: int) -> Dict[str, Any]:
+    """
+    Menús de casa de Cristina y Marisa en formato JSON
+
+    Args:
+        semilla: Semilla de la selección de recetas (la misma que acepta el PDF)
+    """
+    return _vista_menu_casa(semilla, datetime.now().strftime("%Y-%m-%d"))
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _vista_menu_casa(semilla: int, fecha: str) -> Dict[str, Any]:
+    menus = menu_casa.construir_menus_desde_cristina_menu1(semilla)
+    if menus is None:
+        raise ValueError("No se pudieron construir los menús de casa")
+
+    menu_cristina, menu_marisa = menus
+    return {
+        "tipo": "casa",
+        "semilla": semilla,
+        "cristina": menu_cristina,
+        "marisa": menu_marisa,
+    }
+
+
+def _lista_html(lineas: List[str]) -> str:
+    return "<br>".join(escape(linea) for linea in lineas)
+
+
+def formatear_comida_html(comida_info: Dict) -> str:
+    """Formatea un desayuno, snack, comida o cena como HTML escapado, igual que la celda del PDF"""
+    return formatear_comida(comida_info, salto="<br>")
+
+
+def html_menu_dietas(modo: str, semilla: Optional[int]) -> str:
+    """Página HTML del plan semanal de dietas_2.json"""
+    _, version = _cargar_planificador()
+    return _html_menu_dietas(modo, normalizar_semilla(modo, semilla), version)
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _html_menu_dietas(modo: str, semilla: Optional[int], version: Tuple[int, int]) -> str:
+    vista = _vista_menu_dietas(modo, semilla, version)
+
+    filas = "\n".join(
+        PLANTILLA_FILA_DIETAS.substitute(
+            dia=escape(dia['dia']),
+            desayuno=formatear_comida_html(dia['desayuno']),
+            snack=formatear_comida_html(dia['snack']),
+            comida=formatear_comida_html(dia['comida']),
+            cena=formatear_comida_html(dia['cena']),
+        )
+        for dia in vista['menu']
+    )
+    requisitos = _lista_html([
+        f"• {clave.replace('_', ' ').title()}: {valor}"
+        for clave, valor in vista['requisitos'].items()
+    ])
+    parametros_pdf = {"modo": modo}
+    if semilla is not None:
+        parametros_pdf["semilla"] = semilla
+    enlace_pdf = f'<a class="boton" href="/dieta-2/generar-menu-semanal-pdf?{urlencode(parametros_pdf)}">Descargar PDF</a>'
+
+    return PLANTILLA_PAGINA.substitute(
+        titulo="MENÚ SEMANAL - DIETAS 2",
+        subtitulo=escape(f"Tipo: {modo.title()} | Semilla: {semilla if semilla is not None else '-'}"),
+        cuerpo=f"<p>{requisitos}</p>\n{PLANTILLA_TABLA_DIETAS.substitute(filas=filas)}\n<p>{enlace_pdf}</p>",
+    )
+
+
+def html_menu_casa(semilla: int) -> str:
+    """Página HTML de los menús de casa de Cristina y Marisa"""
+    return _html_menu_casa(semilla, datetime.now().strftime("%Y-%m-%d"))
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _html_menu_casa(semilla: int, fecha: str) -> str:
+    vista = _vista_menu_casa(semilla, fecha)
+
+    def tabla(persona: str, menu: Dict) -> str:
+        semana = menu.get('semana', {})
+        filas = "\n".join(
+            PLANTILLA_FILA_CASA.substitute(
+                dia=dia,
+                lunch=escape(semana.get(dia, {}).get('lunch', 'No disponible')),
+                dinner=escape(semana.get(dia, {}).get('dinner', 'No disponible')),
+            )
+            for dia in DIAS_SEMANA
+        )
+        return PLANTILLA_TABLA_CASA.substitute(
+            persona=persona,
+            nombre_menu=escape(menu.get('nombre', '')),
+            filas=filas,
+        )
+
+    return PLANTILLA_PAGINA.substitute(
+        titulo="🏠 MENÚ SEMANAL DE CASA",
+        subtitulo=escape(f"Semana del {datetime.now().strftime('%d/%m/%Y')} | Semilla: {semilla}"),
+        cuerpo=tabla("👩 CRISTINA", vista['cristina']) + "\n" + tabla("👩 MARISA", vista['marisa']),
+    )
+
+
+def estadisticas_cache() -> Dict[str, Dict[str, int]]:
+    """Aciertos y fallos de las cachés de vista previa"""
+    return {
+        nombre: funcion.cache_info()._asdict()
+        for nombre, funcion in (
+            ("dietas_json", _vista_menu_dietas),
+            ("dietas_html", _html_menu_dietas),
+            ("casa_json", _vista_menu_casa),
+            ("casa_html", _html_menu_casa),
+        )
+    }
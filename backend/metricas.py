@@ -0,0 +1,171 @@
+"""
+Métricas en memoria con exposición en formato de texto de Prometheus
+Planificador de Menús - 2026
+
+Registro mínimo, sin dependencias, para instrumentar los caminos calientes:
+- Contador: solo crece (peticiones, respuestas por código, respaldos)
+- Histograma: distribución de duraciones en cubetas acumuladas
+- MetricaCalculada: valor leído en cada lectura de /metrics a partir del
+  estado de otro componente (caché, circuito, cuota)
+
+Todas las métricas admiten etiquetas; los valores se guardan por la tupla de
+valores de las etiquetas.
+"""
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CUBETAS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatear_etiquetas(nombres: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    partes = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _formatear_numero(valor: float) -> str:
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class _Metrica:
+    tipo = "untyped"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+
+    def _clave(self, valores: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(valores.get(etiqueta, "")) for etiqueta in self.etiquetas)
+
+    def cabecera(self) -> List[str]:
+        return [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, cantidad: float = 1, **etiquetas: str):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+    def valor(self, **etiquetas: str) -> float:
+        with self._lock:
+            return self._valores.get(self._clave(etiquetas), 0)
+
+    def exponer(self) -> List[str]:
+        with self._lock:
+            valores = sorted(self._valores.items())
+        return [f"{self.nombre}{_formatear_etiquetas(self.etiquetas, clave)} {_formatear_numero(valor)}"
+                for clave, valor in valores]
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 cubetas: Iterable[float] = CUBETAS_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.cubetas = tuple(sorted(cubetas))
+        # Por etiquetas: (cuentas por cubeta, suma, total)
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observar(self, valor: float, **etiquetas: str):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [[0] * len(self.cubetas), 0.0, 0]
+            for i, limite in enumerate(self.cubetas):
+                if valor <= limite:
+                    serie[0][i] += 1
+                    break
+            serie[1] += valor
+            serie[2] += 1
+
+    def total(self, **etiquetas: str) -> int:
+        with self._lock:
+            serie = self._series.get(self._clave(etiquetas))
+            return serie[2] if serie else 0
+
+    def exponer(self) -> List[str]:
+        with self._lock:
+            series = sorted((clave, ([*s[0]], s[1], s[2])) for clave, s in self._series.items())
+        lineas = []
+        for clave, (cuentas, suma, total) in series:
+            acumulado = 0
+            for limite, cuenta in zip(self.cubetas, cuentas):
+                acumulado += cuenta
+                etiquetas = _formatear_etiquetas(self.etiquetas, clave, f'le="{_formatear_numero(limite)}"')
+                lineas.append(f"{self.nombre}_bucket{etiquetas} {acumulado}")
+            etiquetas = _formatear_etiquetas(self.etiquetas, clave, 'le="+Inf"')
+            lineas.append(f"{self.nombre}_bucket{etiquetas} {total}")
+            lineas.append(f"{self.nombre}_sum{_formatear_etiquetas(self.etiquetas, clave)} {_formatear_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{_formatear_etiquetas(self.etiquetas, clave)} {total}")
+        return lineas
+
+
+class MetricaCalculada(_Metrica):
+    def __init__(self, nombre: str, ayuda: str, funcion: Callable[[], Optional[float]], tipo: str = "gauge"):
+        """La función se llama en cada lectura; si devuelve None no se expone valor"""
+        super().__init__(nombre, ayuda)
+        self.tipo = tipo
+        self.funcion = funcion
+
+    def exponer(self) -> List[str]:
+        valor = self.funcion()
+        return [] if valor is None else [f"{self.nombre} {_formatear_numero(valor)}"]
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica: _Metrica) -> _Metrica:
+        # Registrar dos veces el mismo nombre devuelve la métrica existente (recargas de módulos)
+        with self._lock:
+            return self._metricas.setdefault(metrica.nombre, metrica)
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> Contador:
+        return self._registrar(Contador(nombre, ayuda, etiquetas))
+
+    def histograma(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                   cubetas: Iterable[float] = CUBETAS_SEGUNDOS) -> Histograma:
+        return self._registrar(Histograma(nombre, ayuda, etiquetas, cubetas))
+
+    def calculada(self, nombre: str, ayuda: str, funcion: Callable[[], Optional[float]],
+                  tipo: str = "gauge") -> MetricaCalculada:
+        with self._lock:
+            # La función más reciente manda: apunta a los objetos vigentes
+            metrica = self._metricas[nombre] = MetricaCalculada(nombre, ayuda, funcion, tipo)
+            return metrica
+
+    def exponer(self) -> str:
+        """Todas las métricas en formato de texto de Prometheus (versión 0.0.4)"""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        lineas = []
+        for metrica in metricas:
+            lineas.extend(metrica.cabecera())
+            lineas.extend(metrica.exponer())
+        return "\n".join(lineas) + "\n"
+
+
+# Registro compartido por toda la aplicación
+registro = RegistroMetricas()
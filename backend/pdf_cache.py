@@ -0,0 +1,176 @@
+"""
+Caché de artefactos PDF renderizados
+Planificador de Menús - 2026
+
+Los PDFs deterministas (modelos de dieta, resumen) se guardan por una clave
+calculada a partir de sus datos de origen. La caché tiene un nivel en memoria
+con LRU acotado y un nivel opcional en disco respaldado por el almacén de
+artefactos, con su mismo TTL para PDFs y su presupuesto de disco.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import almacen_artefactos
+from almacen_artefactos import AlmacenArtefactos
+
+
+@dataclass(frozen=True)
+class ArtefactoPDF:
+    """PDF renderizado junto con su ETag fuerte"""
+    contenido: bytes
+    etag: str
+
+
+def calcular_etag(contenido: bytes) -> str:
+    """Calcula un ETag fuerte a partir del contenido del PDF"""
+    return f'"{hashlib.sha256(contenido).hexdigest()}"'
+
+
+def calcular_clave(*partes: Any) -> str:
+    """Calcula una clave estable a partir de las partes que determinan un artefacto"""
+    serializado = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """Comprueba si la cabecera If-None-Match contiene el ETag indicado"""
+    if not if_none_match:
+        return False
+
+    for candidato in if_none_match.split(','):
+        candidato = candidato.strip()
+        if candidato == '*':
+            return True
+        # If-None-Match usa comparación débil
+        if candidato.startswith('W/'):
+            candidato = candidato[2:]
+        if candidato == etag:
+            return True
+
+    return False
+
+
+class CacheArtefactos:
+    def __init__(self, max_entradas: int = 32, max_bytes: int = 64 * 1024 * 1024,
+                 almacen: Optional[AlmacenArtefactos] = None):
+        """
+        Inicializar la caché
+
+        Args:
+            max_entradas: Número máximo de artefactos en memoria
+            max_bytes: Tamaño máximo total en memoria
+            almacen: Almacén del nivel en disco (opcional)
+        """
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.almacen = almacen
+        self._entradas: "OrderedDict[str, ArtefactoPDF]" = OrderedDict()
+        self._bytes_en_memoria = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def _nombre_disco(clave: str) -> str:
+        return f"cache_pdf_{clave}.pdf"
+
+    def _guardar_en_memoria(self, clave: str, artefacto: ArtefactoPDF):
+        """Inserta un artefacto en el LRU y expulsa los más antiguos (con el lock tomado)"""
+        anterior = self._entradas.pop(clave, None)
+        if anterior is not None:
+            self._bytes_en_memoria -= len(anterior.contenido)
+
+        if len(artefacto.contenido) > self.max_bytes:
+            return
+
+        self._entradas[clave] = artefacto
+        self._bytes_en_memoria += len(artefacto.contenido)
+
+        while len(self._entradas) > self.max_entradas or self._bytes_en_memoria > self.max_bytes:
+            _, expulsado = self._entradas.popitem(last=False)
+            self._bytes_en_memoria -= len(expulsado.contenido)
+
+    def _leer_disco(self, clave: str) -> Optional[ArtefactoPDF]:
+        if self.almacen is None:
+            return None
+
+        ruta = self.almacen.obtener(self._nombre_disco(clave))
+        if ruta is None:
+            return None
+
+        try:
+            with open(ruta, 'rb') as archivo:
+                contenido = archivo.read()
+        except FileNotFoundError:
+            # Otro proceso lo expulsó entre la consulta y la lectura
+            return None
+
+        return ArtefactoPDF(contenido, calcular_etag(contenido))
+
+    def _escribir_disco(self, clave: str, contenido: bytes):
+        if self.almacen is None:
+            return
+
+        # El almacén escribe de forma atómica y aplica TTL y presupuesto de disco
+        self.almacen.guardar(self._nombre_disco(clave), contenido)
+
+    def obtener(self, clave: str) -> Optional[ArtefactoPDF]:
+        """Busca un artefacto en memoria y, si no está, en disco"""
+        with self._lock:
+            artefacto = self._entradas.get(clave)
+            if artefacto is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return artefacto
+
+        artefacto = self._leer_disco(clave)
+
+        with self._lock:
+            if artefacto is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+            self._guardar_en_memoria(clave, artefacto)
+
+        return artefacto
+
+    def guardar(self, clave: str, contenido: bytes) -> ArtefactoPDF:
+        """Guarda un PDF renderizado y devuelve el artefacto con su ETag"""
+        artefacto = ArtefactoPDF(contenido, calcular_etag(contenido))
+
+        with self._lock:
+            self._guardar_en_memoria(clave, artefacto)
+
+        self._escribir_disco(clave, contenido)
+        return artefacto
+
+    def limpiar(self):
+        """Vacía el nivel en memoria"""
+        with self._lock:
+            self._entradas.clear()
+            self._bytes_en_memoria = 0
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Devuelve el estado actual de la caché"""
+        with self._lock:
+            return {
+                "entradas": len(self._entradas),
+                "bytes_en_memoria": self._bytes_en_memoria,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "directorio": self.almacen.directorio if self.almacen is not None else None,
+            }
+
+
+# Caché compartida por las rutas de la aplicación
+cache_pdfs = CacheArtefactos(
+    max_entradas=int(os.getenv("PDF_CACHE_MAX_ENTRADAS", "32")),
+    max_bytes=int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    almacen=almacen_artefactos.almacen if os.getenv("PDF_CACHE_DISCO") == "1" else None
+)
@@ -0,0 +1,29 @@
+"""
+Decoraciones de página reutilizables para los generadores de PDF
+Planificador de Menús - 2026
+
+Las cabeceras y pies de página son iguales en todas las páginas salvo el
+número de página. La parte fija se dibuja una sola vez por documento como
+form XObject y cada página solo la referencia.
+"""
+
+from typing import Callable
+
+from reportlab.pdfgen.canvas import Canvas
+
+
+def dibujar_formulario(canvas_obj: Canvas, nombre: str, dibujar: Callable[[Canvas], None]):
+    """
+    Referencia en la página actual un form XObject, definiéndolo la primera vez
+
+    Args:
+        canvas_obj: Canvas del documento
+        nombre: Nombre del formulario, único dentro del documento
+        dibujar: Función que dibuja el contenido estático del formulario
+    """
+    if not canvas_obj.hasForm(nombre):
+        canvas_obj.beginForm(nombre)
+        dibujar(canvas_obj)
+        canvas_obj.endForm()
+
+    canvas_obj.doForm(nombre)
@@ -0,0 +1,174 @@
+"""
+Registro de estilos compartido por los generadores de PDF
+Planificador de Menús - 2026
+
+Los estilos se construyen una sola vez al importar el módulo. Los generadores
+solo los leen, así que se pueden compartir entre hilos sin copiarlos. No se
+deben modificar: si un documento necesita una variante, se crea un
+ParagraphStyle nuevo con el estilo del registro como parent.
+"""
+
+from typing import NamedTuple
+
+from reportlab.lib import colors
+from reportlab.lib.colors import darkblue, darkgreen
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.styles import ParagraphStyle, StyleSheet1, getSampleStyleSheet
+
+
+class EstilosDieta(NamedTuple):
+    """Estilos de DietaPDFGenerator"""
+    title_style: ParagraphStyle
+    model_title_style: ParagraphStyle
+    meal_title_style: ParagraphStyle
+    normal_style: ParagraphStyle
+    ingredient_style: ParagraphStyle
+
+
+class EstilosMenuSemanal(NamedTuple):
+    """Estilos de MenuSemanalPDFGenerator"""
+    title_style: ParagraphStyle
+    subtitle_style: ParagraphStyle
+    normal_style: ParagraphStyle
+    header_style: ParagraphStyle
+    cell_style: ParagraphStyle
+
+
+class EstilosMenuCasa(NamedTuple):
+    """Estilos del PDF de menú de casa"""
+    title_style: ParagraphStyle
+    subtitle_style: ParagraphStyle
+    heading_style: ParagraphStyle
+    normal_style: ParagraphStyle
+
+
+def _crear_estilos_dieta(styles: StyleSheet1) -> EstilosDieta:
+    return EstilosDieta(
+        # Estilo para el título principal
+        title_style=ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=18,
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            textColor=colors.darkblue
+        ),
+        # Estilo para títulos de modelo
+        model_title_style=ParagraphStyle(
+            'ModelTitle',
+            parent=styles['Heading1'],
+            fontSize=16,
+            spaceAfter=15,
+            spaceBefore=15,
+            textColor=colors.darkgreen
+        ),
+        # Estilo para comidas
+        meal_title_style=ParagraphStyle(
+            'MealTitle',
+            parent=styles['Heading2'],
+            fontSize=14,
+            spaceAfter=10,
+            spaceBefore=10,
+            textColor=colors.darkred
+        ),
+        # Estilo para texto normal
+        normal_style=ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=11,
+            spaceAfter=6,
+            spaceBefore=3
+        ),
+        # Estilo para ingredientes
+        ingredient_style=ParagraphStyle(
+            'Ingredient',
+            parent=styles['Normal'],
+            fontSize=10,
+            leftIndent=20,
+            spaceAfter=3
+        ),
+    )
+
+
+def _crear_estilos_menu_semanal(styles: StyleSheet1) -> EstilosMenuSemanal:
+    return EstilosMenuSemanal(
+        # Estilo para el título principal
+        title_style=ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=20,
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            textColor=darkblue,
+            fontName='Helvetica-Bold'
+        ),
+        # Estilo para subtítulos
+        subtitle_style=ParagraphStyle(
+            'SubTitle',
+            parent=styles['Heading2'],
+            fontSize=14,
+            spaceAfter=10,
+            spaceBefore=10,
+            alignment=TA_CENTER,
+            textColor=darkgreen
+        ),
+        # Estilo para texto normal
+        normal_style=ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=10,
+            spaceBefore=3,
+            spaceAfter=3
+        ),
+        # Estilo para encabezados de tabla
+        header_style=ParagraphStyle(
+            'HeaderStyle',
+            parent=styles['Normal'],
+            fontSize=11,
+            alignment=TA_CENTER,
+            textColor=colors.white,
+            fontName='Helvetica-Bold'
+        ),
+        # Estilo para contenido de tabla
+        cell_style=ParagraphStyle(
+            'CellStyle',
+            parent=styles['Normal'],
+            fontSize=9,
+            alignment=TA_LEFT,
+            spaceBefore=2,
+            spaceAfter=2
+        ),
+    )
+
+
+def _crear_estilos_menu_casa(styles: StyleSheet1) -> EstilosMenuCasa:
+    return EstilosMenuCasa(
+        title_style=ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=20,
+            textColor=colors.HexColor('#2C3E50'),
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        subtitle_style=ParagraphStyle(
+            'CustomSubtitle',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=colors.HexColor('#34495E'),
+            spaceAfter=10,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        heading_style=styles['Heading2'],
+        normal_style=styles['Normal'],
+    )
+
+
+# Hoja de estilos base de reportlab, compartida por todos los generadores
+HOJA_BASE = getSampleStyleSheet()
+
+ESTILOS_DIETA = _crear_estilos_dieta(HOJA_BASE)
+ESTILOS_MENU_SEMANAL = _crear_estilos_menu_semanal(HOJA_BASE)
+ESTILOS_MENU_CASA = _crear_estilos_menu_casa(HOJA_BASE)
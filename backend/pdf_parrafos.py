@@ -0,0 +1,112 @@
+"""
+Párrafos de celda con maquetación memorizada
+Planificador de Menús - 2026
+
+Las tablas de menús repiten los mismos textos (desayunos, snacks,
+complementos, nombres de días) en cada fila, semana y paciente. Cada
+Paragraph nuevo volvía a analizar el marcado y a partir las líneas.
+parrafo_celda devuelve una instancia compartida por (texto, estilo), y esa
+instancia guarda el resultado de wrap por ancho disponible, así que el coste
+de maquetar un lote crece con los textos distintos y no con las celdas.
+
+La caché es por hilo: Flowable.drawOn guarda el canvas en la propia
+instancia, de modo que dos hilos no pueden dibujar a la vez el mismo
+párrafo. En el pool de procesos cada trabajador tiene un solo hilo y la
+caché se reutiliza entre todos los documentos que renderiza.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph
+
+MAX_PARRAFOS = int(os.getenv("PDF_CACHE_PARRAFOS", "2048"))
+
+# Atributos que Paragraph.wrap (y breakLines) dejan en la instancia
+_ATRIBUTOS_MAQUETACION = (
+    'width', 'height', 'blPara', '_wrapWidths',
+    '_width_max', '_splitLongWordCount', '_hyphenations',
+)
+
+_AUSENTE = object()
+
+
+class ParrafoCelda(Paragraph):
+    """Paragraph que memoriza su maquetación para cada ancho disponible"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._maquetaciones: Dict[float, Tuple[Tuple[float, float], Dict[str, Any]]] = {}
+
+    def wrap(self, availWidth, availHeight):
+        maquetacion = self._maquetaciones.get(availWidth)
+        if maquetacion is not None:
+            tamano, atributos = maquetacion
+            self.__dict__.update(atributos)
+            return tamano
+
+        tamano = super().wrap(availWidth, availHeight)
+        atributos = {}
+        for nombre in _ATRIBUTOS_MAQUETACION:
+            valor = getattr(self, nombre, _AUSENTE)
+            if valor is not _AUSENTE:
+                atributos[nombre] = valor
+        self._maquetaciones[availWidth] = (tamano, atributos)
+        return tamano
+
+
+_local = threading.local()
+
+
+def _cache_hilo() -> Dict[str, Any]:
+    cache = getattr(_local, 'cache', None)
+    if cache is None:
+        cache = _local.cache = {"parrafos": OrderedDict(), "aciertos": 0, "fallos": 0}
+    return cache
+
+
+def parrafo_celda(texto: str, estilo: ParagraphStyle) -> ParrafoCelda:
+    """
+    Devuelve el párrafo compartido para un texto y un estilo
+
+    Los estilos deben ser los del registro compartido (pdf_estilos): la clave
+    usa la identidad del objeto estilo.
+
+    Args:
+        texto: Texto con el marcado de reportlab
+        estilo: Estilo del párrafo
+    """
+    cache = _cache_hilo()
+    parrafos = cache["parrafos"]
+    clave = (texto, estilo)
+
+    parrafo = parrafos.get(clave)
+    if parrafo is not None:
+        parrafos.move_to_end(clave)
+        cache["aciertos"] += 1
+        return parrafo
+
+    cache["fallos"] += 1
+    parrafo = ParrafoCelda(texto, estilo)
+    parrafos[clave] = parrafo
+    if len(parrafos) > MAX_PARRAFOS:
+        parrafos.popitem(last=False)
+    return parrafo
+
+
+def estadisticas_parrafos() -> Dict[str, int]:
+    """Estado de la caché de párrafos del hilo actual"""
+    cache = _cache_hilo()
+    return {
+        "parrafos": len(cache["parrafos"]),
+        "aciertos": cache["aciertos"],
+        "fallos": cache["fallos"],
+    }
+
+
+def limpiar_parrafos():
+    """Vacía la caché de párrafos del hilo actual"""
+    _local.cache = None
@@ -0,0 +1,256 @@
+"""
+Servicio de renderizado de PDFs en un pool de procesos
+Planificador de Menús - 2026
+
+reportlab es Python puro y está limitado por el GIL, así que los PDFs se
+construyen en procesos trabajadores. Cada trabajador importa reportlab, carga
+modelos_dieta.json y dietas_2.json y prepara los estilos una sola vez al
+arrancar; después solo recibe tareas de renderizado.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from dieta_pdf_generator import DietaPDFGenerator
+from menu_semanal_pdf_generator import MenuSemanalPDFGenerator
+from planificador_semanal_simple import PlanificadorSemanalSimple
+import menu_casa
+
+
+class ColaRenderLlena(Exception):
+    """Se alcanzó el límite de PDFs pendientes de renderizar"""
+
+
+# Estado de cada proceso trabajador, preparado una sola vez
+_estado_worker: Dict[str, Any] = {}
+
+
+def _inicializar_worker(precalentar: bool = False):
+    """
+    Carga datos y generadores del proceso trabajador
+
+    Args:
+        precalentar: Renderiza y descarta un documento de cada tipo para que
+            reportlab cargue métricas de fuentes y rellene sus cachés internas
+    """
+    _estado_worker['dieta'] = DietaPDFGenerator()
+    _estado_worker['menu_semanal'] = MenuSemanalPDFGenerator()
+    _estado_worker['planificador'] = PlanificadorSemanalSimple('dietas_2.json')
+
+    if precalentar:
+        _estado_worker['dieta'].renderizar_tabla_resumen()
+        _estado_worker['menu_semanal'].renderizar_menu_semanal(
+            'secuencial', planificador=_estado_worker['planificador']
+        )
+
+
+def _obtener_estado() -> Dict[str, Any]:
+    # Permite ejecutar las tareas también fuera del pool (sin trabajadores)
+    if not _estado_worker:
+        _inicializar_worker()
+    return _estado_worker
+
+
+def _ping() -> int:
+    """Tarea vacía usada para arrancar los trabajadores por adelantado"""
+    _obtener_estado()
+    return os.getpid()
+
+
+def renderizar_dieta(tipo: str, parametros: Tuple, huella: str, fecha_cabecera: str) -> bytes:
+    """
+    Renderiza un documento de modelos de dieta en el trabajador
+
+    Args:
+        tipo: 'completo', 'modelo' o 'resumen'
+        parametros: Parámetros del documento (número de modelo)
+        huella: Hash de modelos_dieta.json esperado por quien pide el PDF
+        fecha_cabecera: Fecha que se imprime en la cabecera
+    """
+    estado = _obtener_estado()
+    generator = estado['dieta']
+
+    # Si el JSON cambió desde que arrancó el trabajador, se recarga
+    if generator.huella_datos() != huella:
+        generator = estado['dieta'] = DietaPDFGenerator()
+
+    # El generador es compartido (sin trabajadores, entre hilos): la fecha va en la llamada
+    if tipo == 'completo':
+        return generator.renderizar_todos_los_modelos(fecha_cabecera)
+    if tipo == 'modelo':
+        return generator.renderizar_modelo_individual(*parametros, fecha_cabecera=fecha_cabecera)
+    if tipo == 'resumen':
+        return generator.renderizar_tabla_resumen(fecha_cabecera)
+
+    raise ValueError(f"Tipo de documento desconocido: {tipo}")
+
+
+def renderizar_menu_semanal(modo: str = 'aleatorio', semilla: Optional[int] = None,
+                            paciente: Optional[str] = None) -> bytes:
+    """Renderiza en el trabajador un menú semanal de dietas_2.json"""
+    estado = _obtener_estado()
+    return estado['menu_semanal'].renderizar_menu_semanal(
+        modo,
+        planificador=estado['planificador'],
+        semilla=semilla,
+        paciente=paciente
+    )
+
+
+def renderizar_menu_casa(menu_cristina: Dict, menu_marisa: Dict) -> bytes:
+    """Renderiza en el trabajador el PDF del menú de casa"""
+    _obtener_estado()
+    return menu_casa.renderizar_pdf_menu_semanal(menu_cristina, menu_marisa)
+
+
+def _resolver_espera(espera: asyncio.Future):
+    if not espera.done():
+        espera.set_result(None)
+
+
+class ServicioRender:
+    def __init__(self, max_workers: int = 1, max_cola: int = 64, precalentar: bool = False):
+        """
+        Inicializar el servicio
+
+        Args:
+            max_workers: Número de procesos trabajadores (0 renderiza en el propio proceso)
+            max_cola: Máximo de PDFs en curso o en espera antes de rechazar peticiones
+            precalentar: Preparar reportlab en cada trabajador al arrancar
+        """
+        self.max_workers = max_workers
+        self.max_cola = max_cola
+        self.precalentar = precalentar
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pendientes = 0
+        # Quienes esperan sitio en la cola, por orden de llegada
+        self._esperas: deque = deque()
+
+    def iniciar(self):
+        """Arranca el pool y espera a que todos los trabajadores estén preparados"""
+        if self.max_workers <= 0:
+            # Sin trabajadores se renderiza en este proceso: se prepara aquí
+            if self.precalentar and not _estado_worker:
+                _inicializar_worker(precalentar=True)
+            return
+
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_inicializar_worker,
+                initargs=(self.precalentar,)
+            )
+            executor = self._executor
+
+        # Cada envío sin trabajadores libres lanza un proceso nuevo
+        try:
+            arranques = [executor.submit(_ping) for _ in range(self.max_workers)]
+            for arranque in arranques:
+                arranque.result()
+        except BrokenProcessPool:
+            self.detener(esperar=False)
+            raise
+
+    def detener(self, esperar: bool = True):
+        """
+        Detiene el pool de procesos
+
+        Args:
+            esperar: Esperar a que terminen los trabajadores (no desde el bucle de eventos)
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=esperar, cancel_futures=True)
+
+    async def renderizar(self, tarea: Callable[..., bytes], *args, esperar_sitio: bool = False) -> bytes:
+        """
+        Ejecuta una tarea de renderizado y espera su resultado
+
+        Args:
+            tarea: Función de renderizado que se ejecuta en el trabajador
+            esperar_sitio: Con la cola llena, esperar a que se libere un puesto en lugar de rechazar
+
+        Raises:
+            ColaRenderLlena: si ya hay max_cola PDFs pendientes y no se espera sitio
+        """
+        await self._ocupar_puesto(esperar_sitio)
+
+        try:
+            if self.max_workers <= 0:
+                return await asyncio.to_thread(tarea, *args)
+
+            if self._executor is None:
+                await asyncio.to_thread(self.iniciar)
+
+            try:
+                return await asyncio.wrap_future(self._executor.submit(tarea, *args))
+            except BrokenProcessPool:
+                # Un trabajador murió: se descarta el pool sin bloquear el bucle y se recrea en la siguiente petición
+                self.detener(esperar=False)
+                raise
+        finally:
+            self._liberar_puesto()
+
+    async def _ocupar_puesto(self, esperar_sitio: bool):
+        while True:
+            with self._lock:
+                if self._pendientes < self.max_cola:
+                    self._pendientes += 1
+                    return
+                if not esperar_sitio:
+                    raise ColaRenderLlena(f"Hay {self._pendientes} PDFs pendientes de renderizar")
+                espera = asyncio.get_running_loop().create_future()
+                self._esperas.append(espera)
+
+            try:
+                await espera
+            except asyncio.CancelledError:
+                # Si ya nos habían despertado, el aviso pasa al siguiente en espera
+                if espera.done() and not espera.cancelled():
+                    self._despertar_siguiente()
+                raise
+
+    def _liberar_puesto(self):
+        with self._lock:
+            self._pendientes -= 1
+        self._despertar_siguiente()
+
+    def _despertar_siguiente(self):
+        """Avisa al primero que sigue esperando sitio; al despertar vuelve a comprobar la cola"""
+        with self._lock:
+            while self._esperas:
+                espera = self._esperas.popleft()
+                if not espera.done():
+                    espera.get_loop().call_soon_threadsafe(_resolver_espera, espera)
+                    return
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Devuelve la configuración y la ocupación actual del pool"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_cola": self.max_cola,
+                "pendientes": self._pendientes,
+                "esperando_sitio": sum(1 for espera in self._esperas if not espera.done()),
+                "activo": self._executor is not None,
+                "precalentar": self.precalentar,
+            }
+
+
+# Servicio compartido por las rutas de la aplicación
+servicio_render = ServicioRender(
+    max_workers=int(os.getenv("PDF_RENDER_WORKERS", str(os.cpu_count() or 1))),
+    max_cola=int(os.getenv("PDF_RENDER_MAX_COLA", "64")),
+    precalentar=os.getenv("PDF_PRECALENTAR", "").lower() in ("1", "true", "si", "sí")
+)
@@ -0,0 +1,129 @@
+"""
+Perfiles de salida y control de tamaño de los PDFs generados
+Planificador de Menús - 2026
+
+El perfil de salida decide cómo escribe reportlab los documentos:
+- estandar: valores por defecto de reportlab (rl_config)
+- compacto: flujos de página comprimidos siempre
+- reproducible: comprimido y en modo invariante (sin fecha de creación ni
+  identificador aleatorio), de modo que las mismas entradas producen los
+  mismos bytes y los artefactos se pueden deduplicar por hash. Las fechas
+  impresas son entradas del render con resolución de día, nunca la hora
+
+El perfil se elige con la variable de entorno PDF_PERFIL_SALIDA.
+"""
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True)
+class PerfilSalida:
+    """Opciones de escritura comunes a todos los generadores (None = valor por defecto de reportlab)"""
+    nombre: str
+    comprimir: Optional[bool]
+    invariante: Optional[bool]
+    autor: str = "OSAKIDETZA - Unidad de Nutrición"
+    creador: str = "Planificador de Menús"
+
+    def opciones_documento(self) -> Dict[str, Any]:
+        """Argumentos para SimpleDocTemplate"""
+        opciones = {
+            'author': self.autor,
+            'creator': self.creador,
+        }
+        if self.comprimir is not None:
+            opciones['pageCompression'] = 1 if self.comprimir else 0
+        if self.invariante is not None:
+            opciones['invariant'] = 1 if self.invariante else 0
+        return opciones
+
+
+PERFILES = {
+    "estandar": PerfilSalida("estandar", comprimir=None, invariante=None),
+    "compacto": PerfilSalida("compacto", comprimir=True, invariante=False),
+    "reproducible": PerfilSalida("reproducible", comprimir=True, invariante=True),
+}
+
+_perfil_actual = PERFILES["reproducible"]
+
+
+def obtener_perfil() -> PerfilSalida:
+    """Devuelve el perfil de salida activo"""
+    return _perfil_actual
+
+
+def configurar_perfil(nombre: str) -> PerfilSalida:
+    """Cambia el perfil de salida activo del proceso"""
+    global _perfil_actual
+
+    if nombre not in PERFILES:
+        raise ValueError(f"Perfil de salida desconocido: {nombre}. Opciones: {', '.join(PERFILES)}")
+
+    _perfil_actual = PERFILES[nombre]
+    return _perfil_actual
+
+
+# Un nombre mal escrito falla al importar con un error que lista las opciones
+configurar_perfil(os.getenv("PDF_PERFIL_SALIDA", "reproducible"))
+
+
+def opciones_documento() -> Dict[str, Any]:
+    """Argumentos de SimpleDocTemplate según el perfil activo"""
+    return _perfil_actual.opciones_documento()
+
+
+# Informe de tamaños por tipo de documento
+_informes: Dict[str, Dict[str, Any]] = {}
+_lock_informes = threading.Lock()
+
+
+def registrar_documento(tipo: str, contenido_pdf: bytes) -> Dict[str, Any]:
+    """
+    Registra el tamaño de un PDF generado
+
+    Args:
+        tipo: Tipo de documento ('modelo', 'menu_semanal', ...)
+        contenido_pdf: Bytes del PDF
+
+    Returns:
+        Informe del documento: bytes, hash sha256 y perfil usado
+    """
+    informe_documento = {
+        "bytes": len(contenido_pdf),
+        "sha256": hashlib.sha256(contenido_pdf).hexdigest(),
+        "perfil": _perfil_actual.nombre,
+    }
+
+    with _lock_informes:
+        acumulado = _informes.setdefault(tipo, {
+            "documentos": 0,
+            "bytes_totales": 0,
+            "bytes_min": None,
+            "bytes_max": None,
+        })
+        acumulado["documentos"] += 1
+        acumulado["bytes_totales"] += informe_documento["bytes"]
+        acumulado["bytes_min"] = min(filter(None, [acumulado["bytes_min"], informe_documento["bytes"]]))
+        acumulado["bytes_max"] = max(filter(None, [acumulado["bytes_max"], informe_documento["bytes"]]))
+        acumulado["ultimo"] = informe_documento
+
+    return informe_documento
+
+
+def informe_tamanos() -> Dict[str, Any]:
+    """Devuelve el informe de tamaños acumulado por tipo de documento"""
+    with _lock_informes:
+        return {
+            "perfil": _perfil_actual.nombre,
+            "documentos": {
+                tipo: dict(
+                    datos,
+                    bytes_medios=datos["bytes_totales"] // datos["documentos"]
+                )
+                for tipo, datos in _informes.items()
+            }
+        }
@@ -0,0 +1,61 @@
+"""
+Constructor de documentos en streaming para libros de menús muy largos
+Planificador de Menús - 2026
+
+SimpleDocTemplate.build recibe una lista con todos los flowables del
+documento, así que un libro de un año o una tirada de todo el hospital tiene
+cada Paragraph y cada Table en memoria a la vez. DocumentoStreaming acepta
+también un generador: los flowables se piden a medida que se maquetan y,
+cuando una página termina, reportlab la serializa y sus flowables se liberan.
+Solo hay en memoria una pequeña ventana de flowables pendientes.
+"""
+
+from typing import Iterable, Iterator, Optional
+
+from reportlab.platypus import Flowable, SimpleDocTemplate
+
+
+class FlujoFlowables(list):
+    """
+    Lista que se rellena bajo demanda desde un iterador
+
+    BaseDocTemplate.build consulta len(flowables) en cada vuelta y trabaja
+    siempre sobre el principio de la lista; cada consulta repone la ventana
+    hasta 'anticipacion' elementos.
+    """
+
+    def __init__(self, iterador: Iterator[Flowable], anticipacion: int = 16):
+        super().__init__()
+        self._iterador: Optional[Iterator[Flowable]] = iterador
+        self._anticipacion = anticipacion
+
+    def _rellenar(self):
+        while self._iterador is not None and list.__len__(self) < self._anticipacion:
+            try:
+                self.append(next(self._iterador))
+            except StopIteration:
+                self._iterador = None
+
+    def __len__(self) -> int:
+        self._rellenar()
+        return list.__len__(self)
+
+
+class DocumentoStreaming(SimpleDocTemplate):
+    """SimpleDocTemplate que acepta flowables desde cualquier iterable"""
+
+    def __init__(self, destino, anticipacion: int = 16, **opciones):
+        """
+        Args:
+            destino: Nombre de archivo o buffer donde escribir el PDF
+            anticipacion: Flowables que se piden por adelantado (cubre las cadenas keepWithNext)
+            opciones: Argumentos de SimpleDocTemplate
+        """
+        super().__init__(destino, **opciones)
+        self.anticipacion = anticipacion
+
+    def build(self, flowables: Iterable[Flowable], **kwargs):
+        """Construye el documento consumiendo los flowables de uno en uno"""
+        if not isinstance(flowables, list):
+            flowables = FlujoFlowables(iter(flowables), self.anticipacion)
+        super().build(flowables, **kwargs)
@@ -5,10 +5,13 @@ Planificador Semanal Simplificado - Dietas 2
 Versión sin dependencias externas (pandas, openpyxl)
 """
 
+import io
 import json
 import random
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+from almacen_artefactos import almacen
 
 class PlanificadorSemanalSimple:
     def __init__(self, json_file: str = 'dietas_2.json'):
@@ -131,13 +134,15 @@ class PlanificadorSemanalSimple:
                 texto_complementos.append(f"  • {nombre}")
         return '\n'.join(texto_complementos)
     
-    def generar_menu_semanal(self, modo: str = 'aleatorio') -> List[Dict]:
+    def generar_menu_semanal(self, modo: str = 'aleatorio', semilla: Optional[int] = None) -> List[Dict]:
         """
         Generar menú semanal
         
         Args:
             modo: 'aleatorio' para selección aleatoria, 'secuencial' para rotar opciones
+            semilla: Semilla para reproducir un menú aleatorio (opcional)
         """
+        aleatorio = random.Random(semilla) if semilla is not None else random
         opciones_desayuno = self.obtener_opciones_desayuno()
         opciones_snacks = self.obtener_opciones_snacks()
         opciones_comidas = self.obtener_opciones_comidas()
@@ -147,10 +152,10 @@ class PlanificadorSemanalSimple:
         
         for i, dia in enumerate(self.dias_semana):
             if modo == 'aleatorio':
-                desayuno = random.choice(opciones_desayuno)
-                snack = random.choice(opciones_snacks)
-                comida = random.choice(opciones_comidas)
-                cena = random.choice(opciones_cenas)
+                desayuno = aleatorio.choice(opciones_desayuno)
+                snack = aleatorio.choice(opciones_snacks)
+                comida = aleatorio.choice(opciones_comidas)
+                cena = aleatorio.choice(opciones_cenas)
             else:  # secuencial
                 desayuno = opciones_desayuno[i % len(opciones_desayuno)]
                 snack = opciones_snacks[i % len(opciones_snacks)]
@@ -223,92 +228,113 @@ class PlanificadorSemanalSimple:
             
             print("="*80 + "\n")
     
-    def guardar_menu_txt(self, menu_semanal: List[Dict], filename: str = None) -> str:
-        """Guardar menú en archivo de texto"""
-        if filename is None:
-            fecha_actual = datetime.now().strftime("%Y%m%d_%H%M")
-            filename = f"menu_semanal_dietas2_{fecha_actual}.txt"
+    def texto_menu_txt(self, menu_semanal: List[Dict]) -> str:
+        """Texto del menú en el formato del archivo .txt"""
+        f = io.StringIO()
+        f.write("PLANIFICADOR SEMANAL - DIETAS 2\n")
+        f.write("="*80 + "\n\n")
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write("PLANIFICADOR SEMANAL - DIETAS 2\n")
-            f.write("="*80 + "\n\n")
+        # Escribir requisitos diarios
+        requisitos = self.dietas_data.get('requisitos_diarios', {})
+        f.write("REQUISITOS DIARIOS:\n")
+        for key, value in requisitos.items():
+            nombre = key.replace('_', ' ').title()
+            f.write(f"• {nombre}: {value}\n")
+        f.write("\n" + "="*80 + "\n\n")
+        
+        for menu_dia in menu_semanal:
+            dia = menu_dia['dia']
+            desayuno = menu_dia['desayuno']
+            snack = menu_dia['snack']
+            comida = menu_dia['comida']
+            cena = menu_dia['cena']
             
-            # Escribir requisitos diarios
-            requisitos = self.dietas_data.get('requisitos_diarios', {})
-            f.write("REQUISITOS DIARIOS:\n")
-            for key, value in requisitos.items():
-                nombre = key.replace('_', ' ').title()
-                f.write(f"• {nombre}: {value}\n")
-            f.write("\n" + "="*80 + "\n\n")
+            f.write(f"{dia.upper()}\n")
+            f.write("-" * 50 + "\n\n")
             
-            for menu_dia in menu_semanal:
-                dia = menu_dia['dia']
-                desayuno = menu_dia['desayuno']
-                snack = menu_dia['snack']
-                comida = menu_dia['comida']
-                cena = menu_dia['cena']
-                
-                f.write(f"{dia.upper()}\n")
-                f.write("-" * 50 + "\n\n")
-                
-                # Desayuno
-                f.write(f"DESAYUNO - {desayuno['tipo']}\n")
-                f.write(self.formatear_alimentos(desayuno['alimentos']) + "\n\n")
-                
-                # Snack/Merienda
-                f.write(f"SNACK/MERIENDA - {snack['tipo']}\n")
-                f.write(self.formatear_alimentos(snack['alimentos']) + "\n\n")
-                
-                # Comida
-                f.write(f"COMIDA - {comida['plato_principal']}\n")
-                if comida['detalles']:
-                    f.write(f"Detalles: {comida['detalles']}\n")
-                f.write("Complementos:\n")
-                f.write(self.formatear_complementos(comida['complementos']) + "\n\n")
-                
-                # Cena
-                f.write(f"CENA - {cena['plato_principal']}\n")
-                if cena['detalles']:
-                    detalles_texto = []
-                    for key, value in cena['detalles'].items():
-                        detalles_texto.append(f"{key}: {value}")
-                    if detalles_texto:
-                        f.write(f"Detalles: {', '.join(detalles_texto)}\n")
-                f.write("Complementos:\n")
-                f.write(self.formatear_complementos(cena['complementos']) + "\n\n")
-                
-                f.write("="*80 + "\n\n")
+            # Desayuno
+            f.write(f"DESAYUNO - {desayuno['tipo']}\n")
+            f.write(self.formatear_alimentos(desayuno['alimentos']) + "\n\n")
+            
+            # Snack/Merienda
+            f.write(f"SNACK/MERIENDA - {snack['tipo']}\n")
+            f.write(self.formatear_alimentos(snack['alimentos']) + "\n\n")
+            
+            # Comida
+            f.write(f"COMIDA - {comida['plato_principal']}\n")
+            if comida['detalles']:
+                f.write(f"Detalles: {comida['detalles']}\n")
+            f.write("Complementos:\n")
+            f.write(self.formatear_complementos(comida['complementos']) + "\n\n")
+            
+            # Cena
+            f.write(f"CENA - {cena['plato_principal']}\n")
+            if cena['detalles']:
+                detalles_texto = []
+                for key, value in cena['detalles'].items():
+                    detalles_texto.append(f"{key}: {value}")
+                if detalles_texto:
+                    f.write(f"Detalles: {', '.join(detalles_texto)}\n")
+            f.write("Complementos:\n")
+            f.write(self.formatear_complementos(cena['complementos']) + "\n\n")
+            
+            f.write("="*80 + "\n\n")
+        
+        return f.getvalue()
+    
+    def guardar_menu_txt(self, menu_semanal: List[Dict], filename: str = None,
+                         prefijo: str = "menu_semanal_dietas2") -> str:
+        """
+        Guardar menú en archivo de texto
         
-        return filename
+        Sin 'filename' el archivo va al almacén de artefactos (con caducidad)
+        en lugar de quedarse en el directorio de trabajo.
+        """
+        return self._guardar_salida(self.texto_menu_txt(menu_semanal), filename, prefijo, "txt")
     
-    def generar_menu_csv(self, menu_semanal: List[Dict], filename: str = None) -> str:
-        """Generar archivo CSV simple del menú"""
-        if filename is None:
-            fecha_actual = datetime.now().strftime("%Y%m%d_%H%M")
-            filename = f"menu_semanal_dietas2_{fecha_actual}.csv"
+    def texto_menu_csv(self, menu_semanal: List[Dict]) -> str:
+        """Texto del menú en formato CSV simple"""
+        f = io.StringIO()
+        # Encabezados
+        f.write("Día,Desayuno,Snack/Merienda,Comida,Cena\n")
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            # Encabezados
-            f.write("Día,Desayuno,Snack/Merienda,Comida,Cena\n")
+        for menu_dia in menu_semanal:
+            dia = menu_dia['dia']
             
-            for menu_dia in menu_semanal:
-                dia = menu_dia['dia']
-                
-                # Simplificar contenido para CSV
-                desayuno_simple = f"{menu_dia['desayuno']['tipo']}: " + \
-                    " + ".join([a.get('nombre', '') for a in menu_dia['desayuno']['alimentos']])
-                
-                snack_simple = f"{menu_dia['snack']['tipo']}: " + \
-                    " + ".join([a.get('nombre', '') for a in menu_dia['snack']['alimentos']])
-                
-                comida_simple = menu_dia['comida']['plato_principal']
-                
-                cena_simple = menu_dia['cena']['plato_principal']
-                
-                # Escapar comillas para CSV
-                f.write(f'"{dia}","{desayuno_simple}","{snack_simple}","{comida_simple}","{cena_simple}"\n')
+            # Simplificar contenido para CSV
+            desayuno_simple = f"{menu_dia['desayuno']['tipo']}: " + \
+                " + ".join([a.get('nombre', '') for a in menu_dia['desayuno']['alimentos']])
+            
+            snack_simple = f"{menu_dia['snack']['tipo']}: " + \
+                " + ".join([a.get('nombre', '') for a in menu_dia['snack']['alimentos']])
+            
+            comida_simple = menu_dia['comida']['plato_principal']
+            
+            cena_simple = menu_dia['cena']['plato_principal']
+            
+            # Escapar comillas para CSV
+            f.write(f'"{dia}","{desayuno_simple}","{snack_simple}","{comida_simple}","{cena_simple}"\n')
+        
+        return f.getvalue()
+    
+    def generar_menu_csv(self, menu_semanal: List[Dict], filename: str = None,
+                         prefijo: str = "menu_semanal_dietas2") -> str:
+        """
+        Generar archivo CSV simple del menú
         
-        return filename
+        Sin 'filename' el archivo va al almacén de artefactos (con caducidad).
+        """
+        return self._guardar_salida(self.texto_menu_csv(menu_semanal), filename, prefijo, "csv")
+    
+    def _guardar_salida(self, contenido: str, filename: Optional[str], prefijo: str, extension: str) -> str:
+        """Escribe en 'filename' si se indica; si no, guarda en el almacén con nombre fechado"""
+        if filename is not None:
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(contenido)
+            return filename
+        
+        fecha_actual = datetime.now().strftime("%Y%m%d_%H%M")
+        return almacen.guardar(f"{prefijo}_{fecha_actual}.{extension}", contenido.encode('utf-8'))
 
 def main():
     """Función principal"""
@@ -344,14 +370,13 @@ def main():
         print("\n📋 Generando menú semanal secuencial...")
         menu_secuencial = planificador.generar_menu_semanal(modo='secuencial')
         
-        fecha_actual = datetime.now().strftime("%Y%m%d_%H%M")
         archivo_txt_seq = planificador.guardar_menu_txt(
             menu_secuencial, 
-            f"menu_semanal_dietas2_secuencial_{fecha_actual}.txt"
+            prefijo="menu_semanal_dietas2_secuencial"
         )
         archivo_csv_seq = planificador.generar_menu_csv(
             menu_secuencial, 
-            f"menu_semanal_dietas2_secuencial_{fecha_actual}.csv"
+            prefijo="menu_semanal_dietas2_secuencial"
         )
         
         print(f"💾 Menú secuencial guardado en: {archivo_txt_seq}")
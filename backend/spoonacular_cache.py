@@ -0,0 +1,257 @@
+"""
+Caché persistente de búsquedas de Spoonacular
+Planificador de Menús - 2026
+
+Las búsquedas complexSearch con los mismos parámetros (cocina, dieta, tipo,
+texto) se guardan en un archivo SQLite local, así que sobreviven a los
+reinicios y las comparten todos los workers:
+- cada entrada tiene su tiempo de vida
+- pasado el TTL, y durante un margen de gracia, la entrada obsoleta se sirve
+  al momento y se revalida en segundo plano (stale-while-revalidate)
+- el número de entradas está acotado; al superarlo se borran primero las
+  usadas hace más tiempo (LRU)
+
+Las respuestas con error (None) no se guardan.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pdf_cache import calcular_clave
+
+logger = logging.getLogger(__name__)
+
+Resultados = Optional[List[Dict[str, Any]]]
+
+
+def normalizar_parametros(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Parámetros sin la API key ni valores vacíos, con los textos en minúsculas"""
+    normalizados = {}
+    for nombre, valor in params.items():
+        if nombre == "apiKey" or valor is None or valor == "":
+            continue
+        if isinstance(valor, str):
+            valor = " ".join(valor.lower().split())
+        normalizados[nombre] = valor
+    return normalizados
+
+
+class CacheBusquedas:
+    def __init__(self, ruta: str = ":memory:", ttl: float = 24 * 3600,
+                 gracia: float = 7 * 24 * 3600, max_entradas: int = 2000):
+        """
+        Inicializar la caché
+
+        Args:
+            ruta: Archivo SQLite (':memory:' para una caché no persistente)
+            ttl: Segundos durante los que una entrada es vigente
+            gracia: Segundos tras el TTL en los que se sirve obsoleta mientras se revalida
+            max_entradas: Número máximo de búsquedas guardadas
+        """
+        self.ruta = ruta
+        self.ttl = ttl
+        self.gracia = gracia
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self._conexion: Optional[sqlite3.Connection] = None
+        self._revalidando = set()
+        self._tareas = set()
+        self.aciertos = 0
+        self.obsoletos = 0
+        self.fallos = 0
+        self.revalidaciones = 0
+
+    def _obtener_conexion(self) -> sqlite3.Connection:
+        """Abre la base de datos la primera vez (con el lock tomado)"""
+        if self._conexion is None:
+            if self.ruta != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.ruta)), exist_ok=True)
+            self._conexion = sqlite3.connect(self.ruta, check_same_thread=False, isolation_level=None)
+            if self.ruta != ":memory:":
+                # Varios workers leen y escriben el mismo archivo
+                self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS busquedas ("
+                " clave TEXT PRIMARY KEY,"
+                " parametros TEXT NOT NULL,"
+                " resultados TEXT NOT NULL,"
+                " caduca REAL NOT NULL,"
+                " ultimo_acceso REAL NOT NULL)"
+            )
+        return self._conexion
+
+    # Operaciones
+
+    def leer(self, params: Dict[str, Any]):
+        """
+        Busca una entrada
+
+        Returns:
+            tuple: (resultados, obsoleta), o None si no hay entrada utilizable
+        """
+        clave = calcular_clave(normalizar_parametros(params))
+        ahora = time.time()
+
+        with self._lock:
+            conexion = self._obtener_conexion()
+            fila = conexion.execute(
+                "SELECT resultados, caduca FROM busquedas WHERE clave = ?", (clave,)
+            ).fetchone()
+
+            if fila is None or ahora > fila[1] + self.gracia:
+                self.fallos += 1
+                return None
+
+            conexion.execute("UPDATE busquedas SET ultimo_acceso = ? WHERE clave = ?", (ahora, clave))
+            obsoleta = ahora > fila[1]
+            if obsoleta:
+                self.obsoletos += 1
+            else:
+                self.aciertos += 1
+            return json.loads(fila[0]), obsoleta
+
+    def guardar(self, params: Dict[str, Any], resultados: List[Dict[str, Any]]):
+        """Guarda los resultados de una búsqueda y expulsa las entradas sobrantes"""
+        normalizados = normalizar_parametros(params)
+        clave = calcular_clave(normalizados)
+        ahora = time.time()
+
+        with self._lock:
+            conexion = self._obtener_conexion()
+            conexion.execute(
+                "INSERT OR REPLACE INTO busquedas VALUES (?, ?, ?, ?, ?)",
+                (clave, json.dumps(normalizados, sort_keys=True), json.dumps(resultados, ensure_ascii=False),
+                 ahora + self.ttl, ahora)
+            )
+            self._purgar(ahora)
+
+    def obtener_o_buscar(self, params: Dict[str, Any], buscar: Callable[[], Resultados]) -> Resultados:
+        """
+        Devuelve los resultados cacheados o hace la búsqueda y la guarda
+
+        Una entrada obsoleta se devuelve al momento y se revalida en un hilo.
+        Las excepciones de buscar se propagan sin guardar nada.
+        """
+        encontrado = self.leer(params)
+        if encontrado is not None:
+            resultados, obsoleta = encontrado
+            if obsoleta and self._marcar_revalidacion(params):
+                threading.Thread(target=self._revalidar, args=(params, buscar), daemon=True).start()
+            return resultados
+
+        return self._buscar_y_guardar(params, buscar)
+
+    async def obtener_o_buscar_async(self, params: Dict[str, Any],
+                                     buscar: Callable[[], Awaitable[Resultados]]) -> Resultados:
+        """
+        Como obtener_o_buscar, para búsquedas asíncronas; la revalidación es una tarea
+
+        SQLite se consulta y se escribe en un hilo para no bloquear el bucle de eventos.
+        """
+        encontrado = await asyncio.to_thread(self.leer, params)
+        if encontrado is not None:
+            resultados, obsoleta = encontrado
+            if obsoleta and self._marcar_revalidacion(params):
+                tarea = asyncio.create_task(self._revalidar_async(params, buscar))
+                self._tareas.add(tarea)
+                tarea.add_done_callback(self._tareas.discard)
+            return resultados
+
+        resultados = await buscar()
+        if resultados is not None:
+            await asyncio.to_thread(self.guardar, params, resultados)
+        return resultados
+
+    def limpiar(self):
+        """Borra todas las entradas"""
+        with self._lock:
+            self._obtener_conexion().execute("DELETE FROM busquedas")
+
+    def cerrar(self):
+        """Cierra la base de datos"""
+        with self._lock:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Devuelve el estado actual de la caché"""
+        with self._lock:
+            entradas = self._obtener_conexion().execute("SELECT COUNT(*) FROM busquedas").fetchone()[0]
+            consultas = self.aciertos + self.obsoletos + self.fallos
+            return {
+                "ruta": self.ruta,
+                "entradas": entradas,
+                "max_entradas": self.max_entradas,
+                "aciertos": self.aciertos,
+                "obsoletos": self.obsoletos,
+                "fallos": self.fallos,
+                "revalidaciones": self.revalidaciones,
+                "tasa_aciertos": round((self.aciertos + self.obsoletos) / consultas, 3) if consultas else None,
+            }
+
+    # Revalidación y expulsión
+
+    def _buscar_y_guardar(self, params: Dict[str, Any], buscar: Callable[[], Resultados]) -> Resultados:
+        resultados = buscar()
+        if resultados is not None:
+            self.guardar(params, resultados)
+        return resultados
+
+    def _marcar_revalidacion(self, params: Dict[str, Any]) -> bool:
+        """True si nadie está revalidando ya esta búsqueda"""
+        clave = calcular_clave(normalizar_parametros(params))
+        with self._lock:
+            if clave in self._revalidando:
+                return False
+            self._revalidando.add(clave)
+            self.revalidaciones += 1
+            return True
+
+    def _fin_revalidacion(self, params: Dict[str, Any]):
+        with self._lock:
+            self._revalidando.discard(calcular_clave(normalizar_parametros(params)))
+
+    def _revalidar(self, params: Dict[str, Any], buscar: Callable[[], Resultados]):
+        try:
+            self._buscar_y_guardar(params, buscar)
+        except Exception as e:
+            # La entrada obsoleta sigue sirviéndose hasta que una revalidación funcione
+            logger.warning("Error al revalidar búsqueda cacheada: %s", e)
+        finally:
+            self._fin_revalidacion(params)
+
+    async def _revalidar_async(self, params: Dict[str, Any], buscar: Callable[[], Awaitable[Resultados]]):
+        try:
+            resultados = await buscar()
+            if resultados is not None:
+                await asyncio.to_thread(self.guardar, params, resultados)
+        except Exception as e:
+            logger.warning("Error al revalidar búsqueda cacheada: %s", e)
+        finally:
+            self._fin_revalidacion(params)
+
+    def _purgar(self, ahora: float):
+        """Borra las entradas fuera de gracia y las que exceden el máximo (con el lock tomado)"""
+        conexion = self._conexion
+        conexion.execute("DELETE FROM busquedas WHERE caduca + ? < ?", (self.gracia, ahora))
+        conexion.execute(
+            "DELETE FROM busquedas WHERE clave IN ("
+            " SELECT clave FROM busquedas ORDER BY ultimo_acceso DESC LIMIT -1 OFFSET ?)",
+            (self.max_entradas,)
+        )
+
+
+# Caché compartida por las búsquedas de ai_menu
+cache_busquedas = CacheBusquedas(
+    ruta=os.getenv("SPOONACULAR_CACHE_DB") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_spoonacular.sqlite3"),
+    ttl=float(os.getenv("SPOONACULAR_CACHE_TTL_HORAS", "24")) * 3600,
+    gracia=float(os.getenv("SPOONACULAR_CACHE_GRACIA_HORAS", str(7 * 24))) * 3600,
+    max_entradas=int(os.getenv("SPOONACULAR_CACHE_MAX_ENTRADAS", "2000"))
+)
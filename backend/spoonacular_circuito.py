@@ -0,0 +1,159 @@
+"""
+Cortocircuito y presupuesto de cuota para la API de Spoonacular
+Planificador de Menús - 2026
+
+Sin API key, con la cuota diaria agotada (HTTP 402) o con el servicio caído o
+lento, cada búsqueda esperaba a la red antes de caer en las recetas locales.
+El circuito cuenta los fallos consecutivos y, al llegar al umbral, se abre:
+las búsquedas fallan al momento (CircuitoAbierto) durante un tiempo. Pasado
+ese tiempo queda semiabierto y deja pasar una única prueba; si sale bien se
+cierra y si falla vuelve a abrirse.
+
+La cuota restante se lee de la cabecera X-API-Quota-Left de cada respuesta.
+Al agotarse (o con un 402) el circuito queda abierto hasta el reinicio diario
+de la cuota (medianoche UTC).
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+
+class CircuitoAbierto(Exception):
+    """La búsqueda no se hace porque el circuito está abierto"""
+
+
+def segundos_hasta_reinicio_cuota(ahora: Optional[datetime] = None) -> float:
+    """Segundos que faltan para la medianoche UTC, cuando Spoonacular repone la cuota"""
+    ahora = ahora or datetime.now(timezone.utc)
+    manana = (ahora + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (manana - ahora).total_seconds()
+
+
+class CircuitoSpoonacular:
+    def __init__(self, umbral_fallos: int = 5, tiempo_apertura: float = 30.0,
+                 latencia_lenta: float = 5.0, cuota_minima: float = 0.0):
+        """
+        Inicializar el circuito
+
+        Args:
+            umbral_fallos: Fallos consecutivos que abren el circuito
+            tiempo_apertura: Segundos abierto antes de dejar pasar una prueba
+            latencia_lenta: Segundos a partir de los que una respuesta cuenta como fallo
+            cuota_minima: Puntos restantes por debajo de los que se deja de llamar
+        """
+        self.umbral_fallos = umbral_fallos
+        self.tiempo_apertura = tiempo_apertura
+        self.latencia_lenta = latencia_lenta
+        self.cuota_minima = cuota_minima
+        self._lock = threading.Lock()
+        self.estado = CERRADO
+        self.motivo: Optional[str] = None
+        self._abierto_hasta = 0.0
+        self._prueba_en_curso = False
+        self.fallos_consecutivos = 0
+        self.cuota_restante: Optional[float] = None
+        self.rechazadas = 0
+        self.aperturas = 0
+
+    # Consulta
+
+    def permitir(self) -> bool:
+        """
+        Indica si una búsqueda puede salir a la red
+
+        Abierto y pasado el tiempo de apertura, pasa a semiabierto y deja
+        pasar solo a quien reciba la prueba.
+        """
+        with self._lock:
+            if self.estado == CERRADO:
+                return True
+
+            if self.estado == ABIERTO and time.monotonic() >= self._abierto_hasta:
+                self.estado = SEMIABIERTO
+                self._prueba_en_curso = False
+
+            if self.estado == SEMIABIERTO and not self._prueba_en_curso:
+                self._prueba_en_curso = True
+                return True
+
+            self.rechazadas += 1
+            return False
+
+    def comprobar(self):
+        """Lanza CircuitoAbierto si la búsqueda no puede salir a la red"""
+        if not self.permitir():
+            raise CircuitoAbierto(self.motivo or self.estado)
+
+    # Registro de resultados
+
+    def registrar_respuesta(self, status_code: int, segundos: float,
+                            cuota_restante: Optional[str] = None):
+        """
+        Registra una respuesta HTTP completa con su duración y la cuota restante
+
+        Además de 429 y 5xx, los demás 4xx cuentan como fallo: un 401/403 por
+        una API key mala no debe cerrar el circuito.
+        """
+        if cuota_restante is not None:
+            try:
+                self.cuota_restante = float(cuota_restante)
+            except ValueError:
+                pass
+
+        if status_code == 402 or (self.cuota_restante is not None and self.cuota_restante <= self.cuota_minima):
+            self.abrir("cuota_agotada", segundos_hasta_reinicio_cuota())
+        elif status_code >= 400:
+            self.registrar_fallo(f"http_{status_code}")
+        elif segundos > self.latencia_lenta:
+            self.registrar_fallo("lento")
+        else:
+            self.registrar_exito()
+
+    def registrar_exito(self):
+        with self._lock:
+            self.fallos_consecutivos = 0
+            if self.estado != ABIERTO:
+                self.estado = CERRADO
+                self.motivo = None
+                self._prueba_en_curso = False
+
+    def registrar_fallo(self, motivo: str):
+        """Cuenta un fallo; una prueba fallida o el umbral alcanzado abren el circuito"""
+        with self._lock:
+            self.fallos_consecutivos += 1
+            if self.estado == SEMIABIERTO or self.fallos_consecutivos >= self.umbral_fallos:
+                self._abrir(motivo, self.tiempo_apertura)
+
+    def abrir(self, motivo: str, segundos: float):
+        """Abre el circuito durante los segundos indicados"""
+        with self._lock:
+            self._abrir(motivo, segundos)
+
+    def _abrir(self, motivo: str, segundos: float):
+        # Con el lock tomado
+        if self.estado != ABIERTO:
+            self.aperturas += 1
+        self.estado = ABIERTO
+        self.motivo = motivo
+        self._abierto_hasta = time.monotonic() + segundos
+        self._prueba_en_curso = False
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Devuelve el estado actual del circuito"""
+        with self._lock:
+            restante = max(0.0, self._abierto_hasta - time.monotonic()) if self.estado == ABIERTO else 0.0
+            return {
+                "estado": self.estado,
+                "motivo": self.motivo,
+                "segundos_para_reintentar": round(restante, 1) if restante != float("inf") else None,
+                "fallos_consecutivos": self.fallos_consecutivos,
+                "cuota_restante": self.cuota_restante,
+                "rechazadas": self.rechazadas,
+                "aperturas": self.aperturas,
+            }
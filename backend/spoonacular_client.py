@@ -0,0 +1,324 @@
+"""
+Clientes HTTP compartidos para la API de Spoonacular
+Planificador de Menús - 2026
+
+Un único httpx.AsyncClient (y una única requests.Session para el código
+síncrono) por proceso reutiliza conexiones (keep-alive, TLS) entre todas las
+búsquedas. Los dos comparten la política de reintentos: las respuestas 429 y
+5xx y los fallos de conexión se reintentan con espera exponencial con jitter,
+respetando Retry-After cuando la API lo envía.
+
+Con un circuito (spoonacular_circuito) las búsquedas no salen a la red
+mientras está abierto, y cada llamada le comunica su resultado final.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from metricas import registro
+from spoonacular_circuito import CircuitoSpoonacular
+
+logger = logging.getLogger(__name__)
+
+ESTADOS_REINTENTABLES = frozenset({429, 500, 502, 503, 504})
+
+DURACION_LLAMADAS = registro.histograma(
+    "spoonacular_llamada_segundos", "Duración de cada llamada a complexSearch, reintentos incluidos", ("cliente",)
+)
+RESPUESTAS = registro.contador(
+    "spoonacular_respuestas_total", "Intentos HTTP a Spoonacular por código de estado ('conexion' si no hubo respuesta)",
+    ("cliente", "codigo")
+)
+REINTENTOS = registro.contador("spoonacular_reintentos_total", "Reintentos hechos tras un fallo transitorio", ("cliente",))
+
+
+def _leer_resultados(response) -> Optional[List[Dict[str, Any]]]:
+    """Resultados de una respuesta 200 (httpx o requests), o None con cualquier otro estado"""
+    if response.status_code != 200:
+        return None
+    return response.json().get("results") or []
+
+
+@dataclass(frozen=True)
+class PoliticaReintentos:
+    """Reintentos con espera exponencial y jitter completo"""
+    intentos: int = 3
+    espera_base: float = 0.25
+    espera_maxima: float = 4.0
+    estados: FrozenSet[int] = ESTADOS_REINTENTABLES
+
+    def __post_init__(self):
+        # Con cero intentos no se haría ninguna petición y no habría respuesta que devolver
+        if self.intentos < 1:
+            raise ValueError(f"intentos debe ser al menos 1 (la primera petición cuenta): {self.intentos}")
+
+    def espera(self, intento: int, retry_after: Optional[str] = None) -> float:
+        """
+        Segundos a esperar antes del reintento número `intento` (desde 0)
+
+        Un Retry-After en segundos manda, acotado por la espera máxima.
+        """
+        if retry_after:
+            try:
+                return min(float(retry_after), self.espera_maxima)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.espera_maxima, self.espera_base * 2 ** intento))
+
+
+class ClienteSpoonacular:
+    def __init__(self, base_url: str, api_key: Optional[str], timeout: float = 10.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 reintentos: Optional[PoliticaReintentos] = None, max_conexiones: int = 20,
+                 circuito: Optional[CircuitoSpoonacular] = None):
+        """
+        Inicializar el cliente
+
+        Args:
+            base_url: URL base de la API
+            api_key: API key de Spoonacular
+            timeout: Segundos máximos por petición
+            transport: Transporte httpx alternativo (pruebas)
+            reintentos: Política de reintentos (por defecto, 3 intentos)
+            max_conexiones: Conexiones simultáneas como máximo
+            circuito: Cortocircuito compartido (opcional)
+        """
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.reintentos = reintentos or PoliticaReintentos()
+        self.max_conexiones = max_conexiones
+        self.circuito = circuito
+        self._transport = transport
+        self._cliente: Optional[httpx.AsyncClient] = None
+
+    def _obtener_cliente(self) -> httpx.AsyncClient:
+        # Se crea en el primer uso, dentro del bucle de eventos que lo va a usar
+        if self._cliente is None or self._cliente.is_closed:
+            self._cliente = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                transport=self._transport,
+                limits=httpx.Limits(max_connections=self.max_conexiones,
+                                    max_keepalive_connections=self.max_conexiones)
+            )
+        return self._cliente
+
+    async def complex_search(self, params: Dict[str, Any],
+                             timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Llama a /recipes/complexSearch
+
+        Args:
+            params: Parámetros de la búsqueda (sin la API key)
+            timeout: Segundos máximos para esta llamada (por defecto, los del cliente)
+
+        Returns:
+            Lista de resultados, o None si la API responde con error
+
+        Raises:
+            httpx.HTTPError: si la última petición no llega a completarse
+            ValueError: si una respuesta 200 no trae JSON
+            CircuitoAbierto: si el circuito no deja salir la búsqueda
+        """
+        if self.circuito is not None:
+            self.circuito.comprobar()
+
+        inicio = time.perf_counter()
+        # Cualquier excepción cuenta como fallo: si era la prueba del circuito
+        # semiabierto, sin registrarla no volvería a salir ninguna búsqueda
+        motivo_fallo = "error"
+        try:
+            response = await self._get_con_reintentos(params, timeout)
+            resultados = _leer_resultados(response)
+            motivo_fallo = None
+        except httpx.TransportError:
+            motivo_fallo = "conexion"
+            raise
+        except asyncio.CancelledError:
+            # Cancelada por el plazo del menú: el servicio va lento
+            motivo_fallo = "plazo"
+            raise
+        finally:
+            DURACION_LLAMADAS.observar(time.perf_counter() - inicio, cliente="async")
+            if motivo_fallo is not None:
+                self._registrar_fallo(motivo_fallo)
+
+        if self.circuito is not None:
+            self.circuito.registrar_respuesta(response.status_code, time.perf_counter() - inicio,
+                                              response.headers.get("X-API-Quota-Left"))
+
+        if response.status_code != 200:
+            logger.warning("Error de Spoonacular: HTTP %s", response.status_code)
+        return resultados
+
+    async def _get_con_reintentos(self, params: Dict[str, Any], timeout: Optional[float]) -> httpx.Response:
+        """Hace la petición reintentando los estados transitorios y los fallos de conexión"""
+        politica = self.reintentos
+        for intento in range(politica.intentos):
+            ultimo = intento == politica.intentos - 1
+            try:
+                response = await self._obtener_cliente().get(
+                    "/recipes/complexSearch",
+                    params={"apiKey": self.api_key, **params},
+                    timeout=timeout if timeout is not None else self.timeout
+                )
+            except httpx.TransportError as e:
+                RESPUESTAS.inc(cliente="async", codigo="conexion")
+                if ultimo:
+                    raise
+                logger.info("Reintentando Spoonacular tras fallo de conexión: %r", e)
+                REINTENTOS.inc(cliente="async")
+                await asyncio.sleep(politica.espera(intento))
+                continue
+
+            RESPUESTAS.inc(cliente="async", codigo=str(response.status_code))
+            if response.status_code in politica.estados and not ultimo:
+                logger.info("Reintentando Spoonacular tras HTTP %s", response.status_code)
+                REINTENTOS.inc(cliente="async")
+                await asyncio.sleep(politica.espera(intento, response.headers.get("Retry-After")))
+                continue
+
+            return response
+
+    def _registrar_fallo(self, motivo: str):
+        if self.circuito is not None:
+            self.circuito.registrar_fallo(motivo)
+
+    async def cerrar(self):
+        """Cierra las conexiones abiertas"""
+        if self._cliente is not None:
+            await self._cliente.aclose()
+            self._cliente = None
+
+
+class SesionSpoonacular:
+    def __init__(self, base_url: str, api_key: Optional[str], timeout: float = 10.0,
+                 reintentos: Optional[PoliticaReintentos] = None, max_conexiones: int = 20,
+                 adaptador: Optional[requests.adapters.BaseAdapter] = None,
+                 circuito: Optional[CircuitoSpoonacular] = None):
+        """
+        Inicializar la sesión síncrona
+
+        Args:
+            base_url: URL base de la API
+            api_key: API key de Spoonacular
+            timeout: Segundos máximos por petición
+            reintentos: Política de reintentos (por defecto, 3 intentos)
+            max_conexiones: Conexiones keep-alive que conserva el pool
+            adaptador: Adaptador requests alternativo (pruebas)
+            circuito: Cortocircuito compartido (opcional)
+        """
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.reintentos = reintentos or PoliticaReintentos()
+        self.max_conexiones = max_conexiones
+        self.circuito = circuito
+        self._adaptador = adaptador
+        self._sesion: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+
+    def _obtener_sesion(self) -> requests.Session:
+        # Los endpoints síncronos corren en varios hilos: una sola sesión, con su pool, para todos
+        with self._lock:
+            if self._sesion is None:
+                sesion = requests.Session()
+                sesion.mount(
+                    self.base_url,
+                    self._adaptador or HTTPAdapter(pool_connections=1, pool_maxsize=self.max_conexiones)
+                )
+                self._sesion = sesion
+            return self._sesion
+
+    def complex_search(self, params: Dict[str, Any],
+                       timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Llama a /recipes/complexSearch
+
+        Args:
+            params: Parámetros de la búsqueda (sin la API key)
+            timeout: Segundos máximos para esta llamada (por defecto, los de la sesión)
+
+        Returns:
+            Lista de resultados, o None si la API responde con error
+
+        Raises:
+            requests.RequestException: si la última petición no llega a completarse
+            ValueError: si una respuesta 200 no trae JSON
+            CircuitoAbierto: si el circuito no deja salir la búsqueda
+        """
+        if self.circuito is not None:
+            self.circuito.comprobar()
+
+        inicio = time.perf_counter()
+        # Como en el cliente asíncrono, cualquier excepción libera la prueba del circuito
+        motivo_fallo = "error"
+        try:
+            response = self._get_con_reintentos(params, timeout)
+            resultados = _leer_resultados(response)
+            motivo_fallo = None
+        except (requests.ConnectionError, requests.Timeout):
+            motivo_fallo = "conexion"
+            raise
+        finally:
+            DURACION_LLAMADAS.observar(time.perf_counter() - inicio, cliente="sync")
+            if motivo_fallo is not None:
+                self._registrar_fallo(motivo_fallo)
+
+        if self.circuito is not None:
+            self.circuito.registrar_respuesta(response.status_code, time.perf_counter() - inicio,
+                                              response.headers.get("X-API-Quota-Left"))
+
+        if response.status_code != 200:
+            logger.warning("Error de Spoonacular: HTTP %s", response.status_code)
+        return resultados
+
+    def _get_con_reintentos(self, params: Dict[str, Any], timeout: Optional[float]) -> requests.Response:
+        """Hace la petición reintentando los estados transitorios y los fallos de conexión"""
+        politica = self.reintentos
+        for intento in range(politica.intentos):
+            ultimo = intento == politica.intentos - 1
+            try:
+                response = self._obtener_sesion().get(
+                    f"{self.base_url}/recipes/complexSearch",
+                    params={"apiKey": self.api_key, **params},
+                    timeout=timeout if timeout is not None else self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                RESPUESTAS.inc(cliente="sync", codigo="conexion")
+                if ultimo:
+                    raise
+                logger.info("Reintentando Spoonacular tras fallo de conexión: %r", e)
+                REINTENTOS.inc(cliente="sync")
+                time.sleep(politica.espera(intento))
+                continue
+
+            RESPUESTAS.inc(cliente="sync", codigo=str(response.status_code))
+            if response.status_code in politica.estados and not ultimo:
+                logger.info("Reintentando Spoonacular tras HTTP %s", response.status_code)
+                REINTENTOS.inc(cliente="sync")
+                time.sleep(politica.espera(intento, response.headers.get("Retry-After")))
+                continue
+
+            return response
+
+    def _registrar_fallo(self, motivo: str):
+        if self.circuito is not None:
+            self.circuito.registrar_fallo(motivo)
+
+    def cerrar(self):
+        """Cierra las conexiones abiertas"""
+        with self._lock:
+            sesion, self._sesion = self._sesion, None
+        if sesion is not None:
+            sesion.close()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sustituto local de Spoonacular para pruebas de carga y benchmarks
+Planificador de Menús - 2026
+
+Sirve /recipes/complexSearch sin gastar cuota ni necesitar red. ai_menu lo usa
+si SPOONACULAR_BASE_URL apunta a él:
+- modo reproducir (por defecto): responde con las grabaciones cuyos parámetros
+  normalizados coinciden. Sin grabación para esos parámetros, sortea recetas
+  entre todas las grabadas (o sintéticas si no hay ninguna)
+- modo grabar: reenvía cada búsqueda a la API real y guarda la respuesta, su
+  código y su latencia en el archivo de grabaciones
+- latencia inyectada: fija, lognormal o sorteada entre las latencias grabadas,
+  para medir nuestra sobrecarga con una distribución realista
+- errores inyectados: una fracción de las respuestas son 429/5xx, y la cuota
+  simulada (cabecera X-API-Quota-Left) devuelve 402 al agotarse
+
+Uso:
+    python spoonacular_simulado.py --puerto 8090
+    python spoonacular_simulado.py --grabar --puerto 8090
+    python spoonacular_simulado.py --latencia lognormal:0.3:0.5 --tasa-errores 0.05
+    SPOONACULAR_BASE_URL=http://localhost:8090 uvicorn app:app
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from pdf_cache import calcular_clave
+from spoonacular_cache import normalizar_parametros
+
+ARCHIVO_GRABACIONES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "spoonacular_grabaciones.json")
+
+URL_REAL = "https://api.spoonacular.com"
+
+
+class GrabacionesSpoonacular:
+    def __init__(self, ruta: Optional[str] = ARCHIVO_GRABACIONES):
+        """
+        Cargar las grabaciones
+
+        Args:
+            ruta: Archivo JSON de grabaciones (None: solo en memoria)
+        """
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._grabaciones: Dict[str, Dict[str, Any]] = {}
+
+        if ruta and os.path.exists(ruta):
+            with open(ruta, 'r', encoding='utf-8') as archivo:
+                self._grabaciones = json.load(archivo).get("grabaciones", {})
+
+    def buscar(self, params: Dict[str, Any], rng: random.Random) -> Optional[Dict[str, Any]]:
+        """Una de las respuestas grabadas para estos parámetros, o None"""
+        grabacion = self._grabaciones.get(calcular_clave(normalizar_parametros(params)))
+        if not grabacion or not grabacion["respuestas"]:
+            return None
+        return rng.choice(grabacion["respuestas"])
+
+    def recetas(self) -> List[Dict[str, Any]]:
+        """Todas las recetas grabadas, sin repetir IDs"""
+        recetas = {}
+        for grabacion in self._grabaciones.values():
+            for respuesta in grabacion["respuestas"]:
+                for receta in (respuesta.get("cuerpo") or {}).get("results", []):
+                    recetas[receta["id"]] = receta
+        return list(recetas.values())
+
+    def latencias(self) -> List[float]:
+        """Latencias de todas las respuestas grabadas, en segundos"""
+        return [respuesta["segundos"] for grabacion in self._grabaciones.values()
+                for respuesta in grabacion["respuestas"]]
+
+    def grabar(self, params: Dict[str, Any], status: int, cuerpo: Any, segundos: float,
+               cuota_restante: Optional[str] = None):
+        """Añade una respuesta real y guarda el archivo"""
+        normalizados = normalizar_parametros(params)
+        respuesta = {"status": status, "cuerpo": cuerpo, "segundos": round(segundos, 4),
+                     "cuota_restante": cuota_restante}
+
+        with self._lock:
+            grabacion = self._grabaciones.setdefault(
+                calcular_clave(normalizados), {"parametros": normalizados, "respuestas": []}
+            )
+            grabacion["respuestas"].append(respuesta)
+            if self.ruta:
+                # Escritura atómica: el archivo nunca queda a medias
+                ruta_temporal = f"{self.ruta}.{os.getpid()}.tmp"
+                with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+                    json.dump({"grabaciones": self._grabaciones}, archivo, ensure_ascii=False, indent=1)
+                os.replace(ruta_temporal, self.ruta)
+
+    def __len__(self) -> int:
+        return len(self._grabaciones)
+
+
+def crear_latencia(especificacion: str, grabaciones: GrabacionesSpoonacular) -> Callable[[random.Random], float]:
+    """
+    Distribución de latencia a partir de su especificación
+
+    Formatos:
+        '0' o 'fija:0.2'              siempre los mismos segundos
+        'lognormal:mediana:sigma'     lognormal con esa mediana (segundos)
+        'grabada'                     sorteada entre las latencias grabadas
+    """
+    tipo, _, argumentos = especificacion.partition(":")
+    valores = [float(valor) for valor in argumentos.split(":")] if argumentos else []
+
+    if tipo == "lognormal":
+        mediana, sigma = valores
+        return lambda rng: rng.lognormvariate(math.log(mediana), sigma)
+
+    if tipo == "grabada":
+        latencias = grabaciones.latencias()
+        if not latencias:
+            raise ValueError("No hay latencias grabadas")
+        return lambda rng: rng.choice(latencias)
+
+    segundos = valores[0] if tipo == "fija" else float(tipo)
+    return lambda rng: segundos
+
+
+@dataclass
+class ConfigSimulado:
+    """Comportamiento inyectado en el modo reproducir"""
+    latencia: str = "0"
+    tasa_errores: float = 0.0
+    estados_error: Sequence[int] = (429, 500, 503)
+    cuota_diaria: Optional[float] = None
+    semilla: Optional[int] = None
+
+
+def _resultados_sinteticos(recetas: List[Dict[str, Any]], numero: int, rng: random.Random) -> List[Dict[str, Any]]:
+    if not recetas:
+        recetas = [{"id": 900000 + i, "title": f"Receta Simulada {i}"} for i in range(1, 201)]
+    return rng.sample(recetas, min(numero, len(recetas)))
+
+
+def crear_app(grabaciones: Optional[GrabacionesSpoonacular] = None, config: Optional[ConfigSimulado] = None,
+              grabar: bool = False, url_real: str = URL_REAL,
+              transporte_real: Optional[httpx.AsyncBaseTransport] = None) -> FastAPI:
+    """
+    Crea la aplicación del sustituto
+
+    Args:
+        grabaciones: Grabaciones a reproducir o donde grabar
+        config: Latencia y errores inyectados (modo reproducir)
+        grabar: Reenviar a la API real y grabar en lugar de reproducir
+        url_real: URL base de la API real (modo grabar)
+        transporte_real: Transporte httpx alternativo hacia la API real (pruebas)
+    """
+    grabaciones = grabaciones if grabaciones is not None else GrabacionesSpoonacular()
+    config = config or ConfigSimulado()
+    rng = random.Random(config.semilla)
+    latencia = crear_latencia(config.latencia, grabaciones)
+    estado = {"peticiones": 0, "reproducidas": 0, "sinteticas": 0, "errores": 0, "grabadas": 0,
+              "cuota_usada": 0.0}
+    recetas_grabadas = grabaciones.recetas()
+
+    app = FastAPI(title="Spoonacular simulado")
+    app.state.simulado = estado
+
+    async def reenviar(params: Dict[str, Any]) -> JSONResponse:
+        async with httpx.AsyncClient(base_url=url_real, transport=transporte_real, timeout=30) as cliente:
+            inicio = time.perf_counter()
+            response = await cliente.get("/recipes/complexSearch", params=params)
+            segundos = time.perf_counter() - inicio
+
+        cuerpo = response.json() if response.headers.get("content-type", "").startswith("application/json") else None
+        cuota = response.headers.get("X-API-Quota-Left")
+        grabaciones.grabar(params, response.status_code, cuerpo, segundos, cuota)
+        estado["grabadas"] += 1
+        cabeceras = {"X-API-Quota-Left": cuota} if cuota is not None else {}
+        return JSONResponse(cuerpo, status_code=response.status_code, headers=cabeceras)
+
+    @app.get("/recipes/complexSearch")
+    async def complex_search(request: Request):
+        params = dict(request.query_params)
+        estado["peticiones"] += 1
+
+        if grabar:
+            return await reenviar(params)
+
+        await asyncio.sleep(latencia(rng))
+
+        # Coste de Spoonacular: 1 punto por búsqueda y 0.01 por resultado
+        numero = int(params.get("number", 10))
+        cabeceras = {}
+        if config.cuota_diaria is not None:
+            if estado["cuota_usada"] >= config.cuota_diaria:
+                estado["errores"] += 1
+                return JSONResponse({"status": "failure", "code": 402}, status_code=402,
+                                    headers={"X-API-Quota-Left": "0"})
+            estado["cuota_usada"] += 1 + 0.01 * numero
+            cabeceras["X-API-Quota-Left"] = str(round(max(0.0, config.cuota_diaria - estado["cuota_usada"]), 2))
+
+        if config.tasa_errores and rng.random() < config.tasa_errores:
+            estado["errores"] += 1
+            return JSONResponse({"status": "failure"}, status_code=rng.choice(list(config.estados_error)),
+                                headers=cabeceras)
+
+        grabada = grabaciones.buscar(params, rng)
+        if grabada is not None:
+            estado["reproducidas"] += 1
+            return JSONResponse(grabada["cuerpo"], status_code=grabada["status"], headers=cabeceras)
+
+        estado["sinteticas"] += 1
+        resultados = _resultados_sinteticos(recetas_grabadas, numero, rng)
+        return JSONResponse({"results": resultados, "offset": 0, "number": numero,
+                             "totalResults": len(resultados)}, headers=cabeceras)
+
+    @app.get("/simulado/estado")
+    def estado_simulado():
+        """Peticiones atendidas por tipo de respuesta"""
+        return {"modo": "grabar" if grabar else "reproducir", "grabaciones": len(grabaciones), **estado}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sustituto local de Spoonacular")
+    parser.add_argument("--puerto", type=int, default=8090)
+    parser.add_argument("--grabaciones", default=ARCHIVO_GRABACIONES, help="Archivo JSON de grabaciones")
+    parser.add_argument("--grabar", action="store_true", help="Reenviar a la API real y grabar las respuestas")
+    parser.add_argument("--url-real", default=URL_REAL, help="URL base de la API real (modo grabar)")
+    parser.add_argument("--latencia", default="0", help="'fija:S', 'lognormal:MEDIANA:SIGMA' o 'grabada'")
+    parser.add_argument("--tasa-errores", type=float, default=0.0, help="Fracción de respuestas 429/5xx")
+    parser.add_argument("--cuota", type=float, default=None, help="Puntos de cuota diaria simulada")
+    parser.add_argument("--semilla", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = ConfigSimulado(latencia=args.latencia, tasa_errores=args.tasa_errores,
+                            cuota_diaria=args.cuota, semilla=args.semilla)
+    app = crear_app(GrabacionesSpoonacular(args.grabaciones), config, grabar=args.grabar, url_real=args.url_real)
+    uvicorn.run(app, host="127.0.0.1", port=args.puerto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Reserva de sugerencias precargadas para /sugerir-comida
+Planificador de Menús - 2026
+
+Cada sugerencia esperaba una búsqueda complexSearch. La reserva guarda en
+memoria una cola acotada de títulos listos por (cocina, tipo de comida):
+- sacar() toma un título de la cola al momento, sin red
+- cuando una cola baja del umbral se pide su relleno a un trabajador en
+  segundo plano (una tarea asyncio del bucle de la aplicación), que busca un
+  lote nuevo y lo añade sin repetir títulos
+- si la cola está vacía, sacar() devuelve None y quien llama hace la búsqueda
+  en directo, como antes
+
+sacar() se puede llamar desde cualquier hilo (los endpoints síncronos corren
+en el pool de hilos de FastAPI); los rellenos siempre se hacen en el bucle.
+Sin trabajador iniciado la reserva no se rellena y todo va en directo.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Clave = Tuple[str, str]
+BuscarTitulos = Callable[[str, str, int], Awaitable[Optional[List[str]]]]
+
+
+class ReservaSugerencias:
+    def __init__(self, buscar: BuscarTitulos, capacidad: int = 10, umbral: int = 3):
+        """
+        Inicializar la reserva
+
+        Args:
+            buscar: Corrutina (cuisine, meal_type, numero) -> títulos, o None si falla
+            capacidad: Títulos máximos por cola
+            umbral: Por debajo de este tamaño la cola se rellena
+        """
+        self.buscar = buscar
+        self.capacidad = capacidad
+        self.umbral = umbral
+        self._lock = threading.Lock()
+        self._colas: Dict[Clave, Deque[str]] = {}
+        self._pendientes: Set[Clave] = set()
+        self._bucle: Optional[asyncio.AbstractEventLoop] = None
+        self._peticiones: Optional[asyncio.Queue] = None
+        self._trabajador: Optional[asyncio.Task] = None
+        self.servidas = 0
+        self.vacias = 0
+        self.rellenos = 0
+        self.errores = 0
+
+    # Ciclo de vida
+
+    def iniciar(self, precargar: Iterable[Clave] = ()):
+        """Arranca el trabajador en el bucle actual y pide el relleno de las claves dadas"""
+        if self._trabajador is not None:
+            return
+        self._bucle = asyncio.get_running_loop()
+        self._peticiones = asyncio.Queue()
+        self._trabajador = asyncio.create_task(self._trabajar())
+        for cuisine, meal_type in precargar:
+            self.solicitar_relleno(cuisine, meal_type)
+
+    async def detener(self):
+        """Para el trabajador; los títulos en memoria se conservan"""
+        trabajador, self._trabajador = self._trabajador, None
+        with self._lock:
+            self._bucle = None
+            self._pendientes.clear()
+        if trabajador is not None:
+            trabajador.cancel()
+            try:
+                await trabajador
+            except asyncio.CancelledError:
+                pass
+
+    # Operaciones
+
+    def sacar(self, cuisine: str, meal_type: str) -> Optional[str]:
+        """
+        Toma una sugerencia lista y pide el relleno si la cola queda bajo el umbral
+
+        Returns:
+            str: Título de la receta, o None si la cola está vacía
+        """
+        clave = (cuisine, meal_type)
+        with self._lock:
+            cola = self._colas.get(clave)
+            titulo = cola.popleft() if cola else None
+            restantes = len(cola) if cola else 0
+            if titulo is None:
+                self.vacias += 1
+            else:
+                self.servidas += 1
+
+        if restantes < self.umbral:
+            self.solicitar_relleno(cuisine, meal_type)
+        return titulo
+
+    def agregar(self, cuisine: str, meal_type: str, titulos: Iterable[str]) -> int:
+        """Añade títulos a una cola hasta su capacidad, sin repetir los que ya tiene"""
+        with self._lock:
+            cola = self._colas.setdefault((cuisine, meal_type), deque())
+            añadidos = 0
+            for titulo in titulos:
+                if len(cola) >= self.capacidad:
+                    break
+                if titulo not in cola:
+                    cola.append(titulo)
+                    añadidos += 1
+            return añadidos
+
+    def solicitar_relleno(self, cuisine: str, meal_type: str):
+        """Pide al trabajador que rellene una cola (una sola petición pendiente por clave)"""
+        clave = (cuisine, meal_type)
+        with self._lock:
+            if self._bucle is None or clave in self._pendientes:
+                return
+            self._pendientes.add(clave)
+            bucle, peticiones = self._bucle, self._peticiones
+        try:
+            bucle.call_soon_threadsafe(peticiones.put_nowait, clave)
+        except RuntimeError:
+            # Bucle ya cerrado: la aplicación se está deteniendo
+            with self._lock:
+                self._pendientes.discard(clave)
+
+    def estadisticas(self) -> Dict[str, object]:
+        """Devuelve el estado actual de la reserva"""
+        with self._lock:
+            return {
+                "activa": self._trabajador is not None,
+                "capacidad": self.capacidad,
+                "umbral": self.umbral,
+                "colas": {f"{cuisine}/{meal_type}": len(cola) for (cuisine, meal_type), cola in self._colas.items()},
+                "servidas": self.servidas,
+                "vacias": self.vacias,
+                "rellenos": self.rellenos,
+                "errores": self.errores,
+            }
+
+    # Trabajador
+
+    async def _trabajar(self):
+        while True:
+            cuisine, meal_type = await self._peticiones.get()
+            await self._rellenar(cuisine, meal_type)
+
+    async def _rellenar(self, cuisine: str, meal_type: str):
+        clave = (cuisine, meal_type)
+        try:
+            titulos = await self.buscar(cuisine, meal_type, self.capacidad)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # La cola sigue vacía: las sugerencias van en directo hasta que un relleno funcione
+            logger.warning("Error al rellenar sugerencias %s/%s: %s", cuisine, meal_type, e)
+            titulos = None
+        finally:
+            with self._lock:
+                self._pendientes.discard(clave)
+
+        if titulos:
+            añadidos = self.agregar(cuisine, meal_type, titulos)
+            self.rellenos += 1
+            logger.debug("Sugerencias %s/%s rellenadas con %d títulos", cuisine, meal_type, añadidos)
+        else:
+            self.errores += 1
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para el almacén de archivos generados
+Verifica deduplicación, caducidad por tipo y expulsión LRU por presupuesto de disco
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+
+from almacen_artefactos import AlmacenArtefactos
+from planificador_semanal_simple import PlanificadorSemanalSimple
+import planificador_semanal_simple
+
+
+def test_deduplicacion_y_caducidad():
+    """Contenidos iguales comparten archivo y cada tipo caduca según su TTL"""
+    with tempfile.TemporaryDirectory() as directorio:
+        almacen = AlmacenArtefactos(directorio, ttl_por_tipo={"txt": 0.2})
+
+        ruta_a = almacen.guardar("a.pdf", b"%PDF-igual")
+        ruta_b = almacen.guardar("b.pdf", b"%PDF-igual")
+        assert ruta_a == ruta_b
+        assert almacen.estadisticas()["objetos"] == 1
+        assert almacen.estadisticas()["archivos"] == 2
+
+        ruta_txt = almacen.guardar("menu.txt", b"texto")
+        time.sleep(0.3)
+        assert almacen.obtener("menu.txt") is None
+        assert almacen.purgar() == 1
+        assert not os.path.exists(ruta_txt)
+        assert almacen.obtener("a.pdf") == ruta_a
+
+        # Otro proceso que arranca lee el mismo índice
+        assert AlmacenArtefactos(directorio).obtener("b.pdf") == ruta_b
+    print("✅ Deduplicación y caducidad por tipo")
+
+
+def test_presupuesto_lru():
+    """Al superar el presupuesto se expulsa el archivo usado hace más tiempo"""
+    with tempfile.TemporaryDirectory() as directorio:
+        almacen = AlmacenArtefactos(directorio, max_bytes=250)
+
+        almacen.guardar("viejo.csv", b"v" * 100)
+        almacen.guardar("usado.csv", b"u" * 100)
+        time.sleep(0.01)
+        almacen.obtener("viejo.csv")
+        almacen.guardar("nuevo.csv", b"n" * 100)
+
+        assert almacen.obtener("usado.csv") is None
+        assert almacen.obtener("viejo.csv") is not None
+        assert almacen.obtener("nuevo.csv") is not None
+        assert almacen.estadisticas()["bytes_en_disco"] <= 250
+    print("✅ Expulsión LRU por presupuesto de disco")
+
+
+def _guardar_varios(directorio: str, proceso: int):
+    almacen = AlmacenArtefactos(directorio)
+    for i in range(20):
+        almacen.guardar(f"p{proceso}_{i}.txt", f"{proceso}-{i}".encode())
+
+
+def test_varios_procesos():
+    """Procesos que guardan a la vez no se pisan el índice"""
+    with tempfile.TemporaryDirectory() as directorio:
+        procesos = [multiprocessing.Process(target=_guardar_varios, args=(directorio, n)) for n in range(4)]
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join()
+
+        almacen = AlmacenArtefactos(directorio)
+        assert almacen.estadisticas()["archivos"] == 80
+        assert all(almacen.obtener(f"p{n}_{i}.txt") for n in range(4) for i in range(20))
+    print("✅ Índice compartido entre procesos")
+
+
+def test_planificador_usa_almacen():
+    """Sin nombre explícito los menús TXT y CSV van al almacén y no al directorio de trabajo"""
+    with tempfile.TemporaryDirectory() as directorio:
+        anterior = planificador_semanal_simple.almacen
+        planificador_semanal_simple.almacen = AlmacenArtefactos(directorio)
+        antes = set(os.listdir(os.getcwd()))
+        try:
+            planificador = PlanificadorSemanalSimple('dietas_2.json')
+            menu = planificador.generar_menu_semanal(modo='secuencial')
+            ruta_txt = planificador.guardar_menu_txt(menu)
+            ruta_csv = planificador.generar_menu_csv(menu)
+        finally:
+            planificador_semanal_simple.almacen = anterior
+
+        assert ruta_txt.startswith(directorio) and ruta_csv.startswith(directorio)
+        with open(ruta_csv, encoding='utf-8') as archivo:
+            assert archivo.readline().startswith("Día,Desayuno")
+        assert set(os.listdir(os.getcwd())) == antes
+    print("✅ Menús TXT y CSV guardados en el almacén")
+
+
+if __name__ == "__main__":
+    test_deduplicacion_y_caducidad()
+    test_presupuesto_lru()
+    test_varios_procesos()
+    test_planificador_usa_almacen()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para el benchmark de PDFs
+Verifica las medidas de un caso y la detección de regresiones
+"""
+
+from benchmark_pdf import comparar_con_baseline, crear_casos, medir_caso
+
+
+def test_medir_caso():
+    """Un caso medido devuelve tiempos, pico de memoria y bytes"""
+    resultado = medir_caso(crear_casos()["modelo_individual"], repeticiones=2)
+    assert resultado["tiempo_minimo_ms"] > 0
+    assert resultado["pico_memoria_bytes"] > 0
+    assert resultado["bytes"] > 0
+    print("✅ Caso del benchmark medido")
+
+
+def test_detectar_regresiones():
+    """Solo se marcan las métricas que superan la tolerancia"""
+    baseline = {"caso": {"tiempo_minimo_ms": 100.0, "pico_memoria_bytes": 1000, "bytes": 500}}
+
+    assert comparar_con_baseline(
+        {"caso": {"tiempo_minimo_ms": 140.0, "pico_memoria_bytes": 1200, "bytes": 540}}, baseline
+    ) == []
+
+    regresiones = comparar_con_baseline(
+        {"caso": {"tiempo_minimo_ms": 200.0, "pico_memoria_bytes": 1000, "bytes": 600}}, baseline
+    )
+    assert len(regresiones) == 2
+    assert all(regresion.startswith("caso:") for regresion in regresiones)
+    print("✅ Regresiones detectadas")
+
+
+if __name__ == "__main__":
+    test_medir_caso()
+    test_detectar_regresiones()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para el catálogo indexado de recetas locales
+Verifica IDs estables, muestreo sin reemplazo, exclusión y reproducibilidad
+"""
+
+import os
+import random
+import subprocess
+import sys
+import time
+
+from catalogo_local import CatalogoLocal
+
+RECETAS = {
+    "italian": {"lunch": ["Pizza", "Lasaña", "Risotto"], "dinner": ["Minestrone", "Pizza"]},
+    "spanish": {"lunch": ["Paella", "Fabada"], "dinner": ["Tortilla"]},
+}
+
+
+def test_ids_estables():
+    """Cada nombre tiene un ID negativo único, el mismo en todas sus cocinas y comidas"""
+    catalogo = CatalogoLocal(RECETAS)
+    assert catalogo.ids("italian", "lunch") == (-1, -2, -3)
+    assert catalogo.ids("italian", "dinner") == (-4, -1)
+    # 'main course' de Spoonacular es la comida del mediodía
+    assert catalogo.ids("italian", "main course") == catalogo.ids("italian", "dinner")
+    assert catalogo.ids("italian", "lunch") != catalogo.ids("italian", "main course")
+    assert catalogo.ids("greek", "lunch") is None
+    assert catalogo.nombre(catalogo.id_de("Paella")) == "Paella"
+    assert catalogo.candidatos("spanish", "dinner") == [("Tortilla", -7)]
+    print("✅ IDs estables y únicos")
+
+
+def test_ids_iguales_entre_procesos():
+    """Los IDs no dependen de la aleatorización de hash() de cada proceso"""
+    codigo = (
+        "from catalogo_local import CatalogoLocal; import test_catalogo_local as t; "
+        "print(CatalogoLocal(t.RECETAS).id_de('Fabada'))"
+    )
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    salidas = set()
+    for semilla in ("1", "2"):
+        entorno = {**os.environ, "PYTHONHASHSEED": semilla}
+        salida = subprocess.run([sys.executable, "-c", codigo], cwd=directorio, env=entorno,
+                                capture_output=True, text=True, check=True).stdout
+        salidas.add(salida.strip())
+    assert salidas == {str(CatalogoLocal(RECETAS).id_de("Fabada"))}
+    print("✅ IDs iguales entre procesos")
+
+
+def test_muestreo_sin_reemplazo():
+    """Cada receta sale una sola vez y las excluidas no salen"""
+    catalogo = CatalogoLocal(RECETAS)
+    muestreador = catalogo.muestreador()
+    excluidos = {catalogo.id_de("Lasaña")}
+
+    extraidas = []
+    while True:
+        eleccion = muestreador.extraer("italian", "lunch", excluidos)
+        if eleccion is None:
+            break
+        extraidas.append(eleccion[0])
+    assert sorted(extraidas) == ["Pizza", "Risotto"]
+    assert muestreador.extraer("greek", "lunch") is None
+    print("✅ Muestreo sin reemplazo con exclusión")
+
+
+def test_muestreo_reproducible():
+    """Con la misma semilla, el mismo orden"""
+    catalogo = CatalogoLocal(RECETAS)
+
+    def orden(semilla):
+        muestreador = catalogo.muestreador(random.Random(semilla))
+        return [muestreador.extraer("italian", "lunch") for _ in range(3)]
+
+    assert orden(7) == orden(7)
+    print("✅ Muestreo reproducible")
+
+
+def test_muestreo_rapido():
+    """Una semana local (14 extracciones) cuesta microsegundos"""
+    catalogo = CatalogoLocal({"c": {"lunch": [f"L{i}" for i in range(10)], "dinner": [f"D{i}" for i in range(10)]}})
+    repeticiones = 2000
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        muestreador = catalogo.muestreador()
+        usados = set()
+        for _ in range(7):
+            for comida in ("lunch", "dinner"):
+                usados.add(muestreador.extraer("c", comida, usados)[1])
+    por_semana = (time.perf_counter() - inicio) / repeticiones
+    assert por_semana < 0.001
+    print(f"✅ Semana local en {por_semana * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    test_ids_estables()
+    test_ids_iguales_entre_procesos()
+    test_muestreo_sin_reemplazo()
+    test_muestreo_reproducible()
+    test_muestreo_rapido()
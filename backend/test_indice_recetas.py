@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para el índice invertido de platos locales
+Verifica la normalización, el orden por relevancia y la carga de dietas_2.json y los menús de casa
+"""
+
+import random
+import time
+
+from catalogo_local import CatalogoLocal
+from indice_recetas import IndiceRecetas, agregar_platos_locales, tokenizar
+
+RECETAS = {
+    "spanish": {"lunch": ["Guiso de Lentejas", "Paella Valenciana"], "dinner": ["Tortilla Española"]},
+    "mediterranean": {"lunch": ["Lentejas con Verduras", "Albóndigas en Salsa"], "dinner": ["Sopa de Verduras"]},
+}
+
+
+def test_tokenizar():
+    """Sin tildes, sin palabras vacías y con singular aproximado"""
+    assert tokenizar("Albóndigas en Salsa") == ["albondiga", "salsa"]
+    assert tokenizar("Lentejas con verdura y ARROZ") == ["lenteja", "verdura", "arroz"]
+    print("✅ Tokenización")
+
+
+def test_busqueda_por_preferencias():
+    """Encuentra por términos sin tildes, filtra por comida y se queda en la cocina pedida"""
+    indice = IndiceRecetas(CatalogoLocal(RECETAS))
+
+    assert [n for n, _ in indice.buscar("albondigas")] == ["Albóndigas en Salsa"]
+    assert indice.buscar("lentejas", meal_type="dinner") == []
+    assert indice.buscar("sushi") == []
+
+    nombres = [n for n, _ in indice.buscar("lentejas", meal_type="lunch", cuisine="spanish")]
+    assert nombres == ["Guiso de Lentejas"]
+    nombres = [n for n, _ in indice.buscar("lentejas", meal_type="lunch", cuisine="mediterranean")]
+    assert nombres == ["Lentejas con Verduras"]
+
+    # Sin coincidencias en la cocina pedida, se completa hasta el mínimo con otras
+    assert [n for n, _ in indice.buscar("paella", cuisine="mediterranean")] == ["Paella Valenciana"]
+    nombres = [n for n, _ in indice.buscar("lentejas", cuisine="spanish", minimo=2)]
+    assert nombres == ["Guiso de Lentejas", "Lentejas con Verduras"]
+
+    # Más términos encontrados, más arriba
+    nombres = [n for n, _ in indice.buscar("lentejas verduras")]
+    assert nombres[0] == "Lentejas con Verduras"
+    print("✅ Búsqueda por preferencias")
+
+
+def test_fuentes_locales():
+    """dietas_2.json y los menús de casa se indexan; los platos repetidos conservan su ID"""
+    catalogo = CatalogoLocal(RECETAS)
+    id_tortilla = catalogo.id_de("Tortilla Española")
+    agregar_platos_locales(catalogo)
+    indice = IndiceRecetas(catalogo)
+
+    assert catalogo.id_de("Tortilla Española") == id_tortilla
+    assert "Lentejas con verdura y arroz" in [n for n, _ in indice.buscar("lentejas", meal_type="lunch")]
+    assert "Garbanzos con espinacas y huevo duro" in [n for n, _ in indice.buscar("garbanzos")]
+    assert any("bacalao" in n.lower() for n, _ in indice.buscar("bacalao", meal_type="dinner"))
+
+    repeticiones = 1000
+    rng = random.Random(3)
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        indice.buscar("pollo con verduras", meal_type="lunch", cuisine="spanish", rng=rng)
+    por_busqueda = (time.perf_counter() - inicio) / repeticiones
+    assert por_busqueda < 0.001
+    print(f"✅ Fuentes locales indexadas, búsqueda en {por_busqueda * 1e6:.0f} µs")
+
+
+def test_preferencias_dentro_de_la_cocina():
+    """Con todas las fuentes indexadas, las preferencias no sacan el menú de la cocina elegida"""
+    import ai_menu
+
+    # Cada cocina tiene algún plato con el término; otras fuentes tienen bastantes más
+    for cuisine, meal_type, preferencias in (("mediterranean", "lunch", "pollo"), ("italian", "lunch", "pasta"),
+                                             ("spanish", "dinner", "tortilla")):
+        recetas_cocina = set(ai_menu.RECETAS_LOCALES[cuisine][meal_type])
+        preferidas = ai_menu.reserva_local(ai_menu.catalogo_local.muestreador(), cuisine, meal_type,
+                                           preferencias).preferidas
+        assert preferidas
+        assert {nombre for nombre, _ in preferidas} <= recetas_cocina, (cuisine, preferencias, preferidas)
+    print("✅ Preferencias dentro de la cocina pedida")
+
+
+if __name__ == "__main__":
+    test_tokenizar()
+    test_busqueda_por_preferencias()
+    test_fuentes_locales()
+    test_preferencias_dentro_de_la_cocina()
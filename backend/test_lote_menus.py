@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para la generación por lotes de menús semanales en ZIP
+"""
+
+import asyncio
+import io
+import threading
+import zipfile
+
+from lote_menus import generar_zip_menus
+from pdf_render_service import ColaRenderLlena, ServicioRender
+from planificador_semanal_simple import PlanificadorSemanalSimple
+
+
+async def _recoger_zip(pacientes):
+    servicio = ServicioRender(max_workers=0)
+    trozos = [trozo async for trozo in generar_zip_menus(pacientes, servicio, max_en_curso=2)]
+    return trozos, b''.join(trozos)
+
+
+def test_lote_menus_zip():
+    """El ZIP contiene un PDF por paciente y se entrega en varios trozos"""
+    pacientes = [
+        {"nombre": "Ana López", "modo": "aleatorio", "semilla": 7},
+        {"nombre": "Paciente 2", "modo": "secuencial", "semilla": None},
+        {"nombre": "../raro", "modo": "aleatorio", "semilla": 3},
+    ]
+    trozos, contenido = asyncio.run(_recoger_zip(pacientes))
+
+    assert len(trozos) > len(pacientes)
+    archivo_zip = zipfile.ZipFile(io.BytesIO(contenido))
+    assert archivo_zip.testzip() is None
+    assert sorted(archivo_zip.namelist()) == ["001_Ana_López.pdf", "002_Paciente_2.pdf", "003_raro.pdf"]
+    for nombre in archivo_zip.namelist():
+        assert archivo_zip.read(nombre).startswith(b'%PDF-')
+    print("✅ ZIP de menús generado en streaming")
+
+
+def test_semilla_reproducible():
+    """La misma semilla produce el mismo menú aleatorio"""
+    planificador = PlanificadorSemanalSimple('dietas_2.json')
+    assert planificador.generar_menu_semanal(semilla=11) == planificador.generar_menu_semanal(semilla=11)
+    print("✅ Menús aleatorios reproducibles con semilla")
+
+
+def test_esperar_sitio_en_la_cola():
+    """Con la cola llena, esperar_sitio aguarda a que se libere un puesto en lugar de reintentar"""
+    liberar = threading.Event()
+
+    def renderizar_bloqueado():
+        liberar.wait(5)
+        return b'%PDF-1'
+
+    async def probar():
+        servicio = ServicioRender(max_workers=0, max_cola=1)
+        primera = asyncio.ensure_future(servicio.renderizar(renderizar_bloqueado))
+        await asyncio.sleep(0.05)
+
+        # Sin esperar se rechaza; esperando se queda en turno sin consumir CPU
+        try:
+            await servicio.renderizar(renderizar_bloqueado)
+            assert False, "La cola llena debería rechazar"
+        except ColaRenderLlena:
+            pass
+        segunda = asyncio.ensure_future(servicio.renderizar(lambda: b'%PDF-2', esperar_sitio=True))
+        cancelada = asyncio.ensure_future(servicio.renderizar(lambda: b'%PDF-3', esperar_sitio=True))
+        await asyncio.sleep(0.05)
+        assert servicio.estadisticas()["esperando_sitio"] == 2
+        cancelada.cancel()
+
+        liberar.set()
+        assert await primera == b'%PDF-1'
+        assert await asyncio.wait_for(segunda, 1) == b'%PDF-2'
+        assert servicio.estadisticas()["pendientes"] == 0
+
+    asyncio.run(probar())
+    print("✅ Espera de sitio en la cola de renderizado")
+
+
+if __name__ == "__main__":
+    test_lote_menus_zip()
+    test_semilla_reproducible()
+    test_esperar_sitio_en_la_cola()
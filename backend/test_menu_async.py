@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para la generación concurrente del menú semanal con Spoonacular
+Usa un transporte httpx simulado: no hace peticiones reales
+"""
+
+import asyncio
+import json
+import random
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+import ai_menu
+from spoonacular_cache import CacheBusquedas
+from spoonacular_circuito import CircuitoSpoonacular
+from spoonacular_client import ClienteSpoonacular
+
+RETARDO = 0.2
+CATALOGO = 40
+
+llamadas = []
+
+
+async def _api_simulada(request: httpx.Request) -> httpx.Response:
+    """complexSearch simulado: `number` recetas al azar de un catálogo de 40, con retardo fijo"""
+    llamadas.append(request)
+    await asyncio.sleep(RETARDO)
+    numero = min(int(request.url.params.get("number", 10)), CATALOGO)
+    recetas = random.sample(range(1, CATALOGO + 1), numero)
+    return httpx.Response(200, json={"results": [{"id": i, "title": f"Receta {i}"} for i in recetas]})
+
+
+async def _api_colgada(request: httpx.Request) -> httpx.Response:
+    """complexSearch que tarda mucho más que el plazo del menú"""
+    llamadas.append(request)
+    await asyncio.sleep(5)
+    return httpx.Response(200, json={"results": []})
+
+
+async def _api_sin_json(request: httpx.Request) -> httpx.Response:
+    """complexSearch que responde 200 con un cuerpo que no es JSON (p. ej. la página de un proxy)"""
+    llamadas.append(request)
+    return httpx.Response(200, text="<html>Bad Gateway</html>", headers={"Content-Type": "text/html"})
+
+
+async def _generar(tipo_cocina: str, api=_api_simulada, circuito=None, preferencias: str = ""):
+    llamadas.clear()
+    anterior, cache_anterior = ai_menu.cliente_spoonacular, ai_menu.cache_busquedas
+    ai_menu.cliente_spoonacular = ClienteSpoonacular(
+        "https://spoonacular.test", "clave", transport=httpx.MockTransport(api), circuito=circuito
+    )
+    ai_menu.cache_busquedas = CacheBusquedas()
+    try:
+        return await ai_menu.generar_menu_semanal_async(preferencias=preferencias, tipo_cocina=tipo_cocina)
+    finally:
+        await ai_menu.cliente_spoonacular.cerrar()
+        ai_menu.cliente_spoonacular, ai_menu.cache_busquedas = anterior, cache_anterior
+
+
+def test_menu_concurrente_sin_repeticiones():
+    """Una búsqueda por comida, en paralelo, y ninguna receta se repite en la semana"""
+    inicio = time.perf_counter()
+    menu = asyncio.run(_generar("saludable"))
+    duracion = time.perf_counter() - inicio
+
+    assert list(menu) == ai_menu.DIAS_SEMANA
+    recetas = [menu[dia][comida] for dia in menu for comida in ("lunch", "dinner")]
+    assert len(recetas) == 14
+    assert len(set(recetas)) == 14
+    # Comidas y cenas salen de dos reservas pedidas a la vez
+    assert len(llamadas) == 2
+    assert all(r.url.params["number"] == str(ai_menu.CANDIDATOS_POR_RESERVA) for r in llamadas)
+    assert duracion < RETARDO * 3
+    print(f"✅ Menú concurrente en {duracion:.2f}s con {len(llamadas)} llamadas, sin repeticiones")
+
+
+def test_reserva_agotada_se_rellena():
+    """Solo se vuelve a la API cuando los IDs usados agotan la reserva"""
+    reserva = ai_menu.ReservaCandidatos([("A", 1), ("B", 2)])
+    assert not reserva.necesita_relleno({1})
+    assert reserva.necesita_relleno({1, 2})
+
+    reserva.rellenar([("B", 2), ("C", 3)])
+    assert [c[1] for c in reserva.candidatos] == [1, 2, 3]
+    assert reserva.elegir({1, 2}) == ("C", 3)
+
+    # Ni las reservas vacías ni las del banco local se rellenan
+    assert not ai_menu.ReservaCandidatos([]).necesita_relleno(set())
+    assert not ai_menu.ReservaLocal(ai_menu.catalogo_local.muestreador(), "italian", "lunch").necesita_relleno(set())
+    print("✅ Reserva rellenada solo al agotarse")
+
+
+def test_menu_local_sin_repeticiones():
+    """Las cocinas del banco local tampoco repiten recetas"""
+    menu = asyncio.run(_generar("italiana"))
+    recetas = [menu[dia][comida] for dia in menu for comida in ("lunch", "dinner")]
+    assert len(set(recetas)) == 14
+    assert llamadas == []
+    print("✅ Menú local sin repeticiones")
+
+
+def test_preferencias_sin_api():
+    """Con una cocina local las preferencias se resuelven en memoria, sin llamadas"""
+    menu = asyncio.run(_generar("italiana", preferencias="pasta"))
+    comidas = [menu[dia]["lunch"] for dia in menu]
+    recetas = comidas + [menu[dia]["dinner"] for dia in menu]
+
+    assert llamadas == []
+    assert len(set(recetas)) == 14
+    # Las pastas italianas van primero
+    assert {"Pasta Carbonara", "Pasta Primavera"} <= set(comidas[:2])
+    print("✅ Preferencias resueltas con el índice local")
+
+
+def _recetas_locales_mediterraneas():
+    return set(ai_menu.RECETAS_LOCALES["mediterranean"]["lunch"] + ai_menu.RECETAS_LOCALES["mediterranean"]["dinner"])
+
+
+def test_plazo_del_menu():
+    """Con la API colgada el menú responde al cumplirse el plazo, con recetas locales"""
+    anterior = ai_menu.PLAZO_MENU_SEGUNDOS
+    ai_menu.PLAZO_MENU_SEGUNDOS = 0.3
+    circuito = CircuitoSpoonacular(umbral_fallos=2)
+    try:
+        inicio = time.perf_counter()
+        menu = asyncio.run(_generar("saludable", api=_api_colgada, circuito=circuito))
+        duracion = time.perf_counter() - inicio
+    finally:
+        ai_menu.PLAZO_MENU_SEGUNDOS = anterior
+
+    recetas = [menu[dia][comida] for dia in menu for comida in ("lunch", "dinner")]
+    assert duracion < 1
+    assert len(set(recetas)) == 14
+    assert set(recetas) <= _recetas_locales_mediterraneas()
+    # Las dos búsquedas canceladas por el plazo cuentan como fallos
+    assert circuito.estado == "abierto"
+    print(f"✅ Menú local al agotarse el plazo ({duracion:.2f}s)")
+
+
+def test_circuito_abierto_no_llama_a_la_api():
+    """Con el circuito abierto el menú sale del banco local sin ninguna llamada"""
+    circuito = CircuitoSpoonacular()
+    circuito.abrir("cuota_agotada", 60)
+    menu = asyncio.run(_generar("saludable", circuito=circuito))
+
+    recetas = [menu[dia][comida] for dia in menu for comida in ("lunch", "dinner")]
+    assert llamadas == []
+    assert len(set(recetas)) == 14
+    assert set(recetas) <= _recetas_locales_mediterraneas()
+    print("✅ Circuito abierto: recetas locales al momento")
+
+
+def test_cuerpo_malformado_usa_recetas_locales():
+    """Un 200 cuyo cuerpo no es JSON no rompe el menú: sale del banco local"""
+    antes = ai_menu.RESPALDOS_LOCALES.valor(motivo="error")
+    menu = asyncio.run(_generar("saludable", api=_api_sin_json))
+
+    recetas = [menu[dia][comida] for dia in menu for comida in ("lunch", "dinner")]
+    assert len(llamadas) == 2
+    assert len(set(recetas)) == 14
+    assert set(recetas) <= _recetas_locales_mediterraneas()
+    assert ai_menu.RESPALDOS_LOCALES.valor(motivo="error") == antes + 2
+    print("✅ Cuerpo no JSON: recetas locales")
+
+
+def test_dias_en_streaming():
+    """Los días salen en orden, cada uno con comida y cena, y la semana no repite recetas"""
+    async def recoger():
+        llamadas.clear()
+        anterior, cache_anterior = ai_menu.cliente_spoonacular, ai_menu.cache_busquedas
+        ai_menu.cliente_spoonacular = ClienteSpoonacular(
+            "https://spoonacular.test", "clave", transport=httpx.MockTransport(_api_simulada)
+        )
+        ai_menu.cache_busquedas = CacheBusquedas()
+        try:
+            return [(dia, comidas) async for dia, comidas in ai_menu.generar_dias_menu_async(tipo_cocina="saludable")]
+        finally:
+            await ai_menu.cliente_spoonacular.cerrar()
+            ai_menu.cliente_spoonacular, ai_menu.cache_busquedas = anterior, cache_anterior
+
+    dias = asyncio.run(recoger())
+    assert [dia for dia, _ in dias] == ai_menu.DIAS_SEMANA
+    assert all(set(comidas) == {"lunch", "dinner"} for _, comidas in dias)
+    recetas = [comidas[comida] for _, comidas in dias for comida in ("lunch", "dinner")]
+    assert len(set(recetas)) == 14
+    print("✅ Días del menú en streaming")
+
+
+def test_endpoint_stream_ndjson_y_sse():
+    """/generar-menu/stream envía un evento por día y uno final, en NDJSON o SSE"""
+    import app
+
+    cliente = TestClient(app.app)
+    response = cliente.post("/generar-menu/stream", json={"tipo_cocina": "italiana"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    eventos = [json.loads(linea) for linea in response.text.splitlines()]
+    assert [e["dia"] for e in eventos[:-1]] == ai_menu.DIAS_SEMANA
+    assert eventos[-1]["tipo"] == "fin" and eventos[-1]["success"]
+    recetas = [e["comidas"][comida] for e in eventos[:-1] for comida in ("lunch", "dinner")]
+    assert len(set(recetas)) == 14
+
+    response = cliente.post("/generar-menu/stream?formato=sse", json={"tipo_cocina": "italiana"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    bloques = response.text.strip().split("\n\n")
+    assert len(bloques) == 8
+    assert bloques[0].startswith("event: dia\ndata: ")
+    assert bloques[-1].startswith("event: fin\n")
+    print("✅ Endpoint de menú en streaming (NDJSON y SSE)")
+
+
+if __name__ == "__main__":
+    test_menu_concurrente_sin_repeticiones()
+    test_reserva_agotada_se_rellena()
+    test_menu_local_sin_repeticiones()
+    test_preferencias_sin_api()
+    test_plazo_del_menu()
+    test_circuito_abierto_no_llama_a_la_api()
+    test_cuerpo_malformado_usa_recetas_locales()
+    test_dias_en_streaming()
+    test_endpoint_stream_ndjson_y_sse()
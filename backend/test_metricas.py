@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para el registro de métricas
+Verifica contadores, histogramas y métricas calculadas en formato de texto de Prometheus
+"""
+
+from metricas import RegistroMetricas
+
+
+def test_contador_con_etiquetas():
+    """Cada combinación de etiquetas lleva su propia cuenta"""
+    registro = RegistroMetricas()
+    respuestas = registro.contador("respuestas_total", "Respuestas por código", ("codigo",))
+    respuestas.inc(codigo="200")
+    respuestas.inc(codigo="200")
+    respuestas.inc(codigo="503")
+
+    assert respuestas.valor(codigo="200") == 2
+    texto = registro.exponer()
+    assert "# TYPE respuestas_total counter" in texto
+    assert 'respuestas_total{codigo="200"} 2' in texto
+    assert 'respuestas_total{codigo="503"} 1' in texto
+    # Registrar otra vez el mismo nombre devuelve la misma métrica
+    assert registro.contador("respuestas_total", "Respuestas por código", ("codigo",)) is respuestas
+    print("✅ Contadores con etiquetas")
+
+
+def test_histograma_acumulado():
+    """Las cubetas son acumuladas y +Inf cuenta también lo que supera la última"""
+    registro = RegistroMetricas()
+    duracion = registro.histograma("llamada_segundos", "Duración", ("cliente",), cubetas=(0.1, 1))
+    for valor in (0.05, 0.5, 3):
+        duracion.observar(valor, cliente="async")
+
+    texto = registro.exponer()
+    assert 'llamada_segundos_bucket{cliente="async",le="0.1"} 1' in texto
+    assert 'llamada_segundos_bucket{cliente="async",le="1"} 2' in texto
+    assert 'llamada_segundos_bucket{cliente="async",le="+Inf"} 3' in texto
+    assert 'llamada_segundos_sum{cliente="async"} 3.55' in texto
+    assert 'llamada_segundos_count{cliente="async"} 3' in texto
+    assert duracion.total(cliente="async") == 3
+    print("✅ Histogramas acumulados")
+
+
+def test_metrica_calculada():
+    """Se evalúa en cada lectura y no se expone si no hay valor"""
+    registro = RegistroMetricas()
+    estado = {"cuota": None}
+    registro.calculada("cuota_restante", "Cuota restante", lambda: estado["cuota"])
+
+    assert not any(linea.startswith("cuota_restante ") for linea in registro.exponer().splitlines())
+    estado["cuota"] = 42.5
+    assert "cuota_restante 42.5" in registro.exponer().splitlines()
+    print("✅ Métricas calculadas")
+
+
+if __name__ == "__main__":
+    test_contador_con_etiquetas()
+    test_histograma_acumulado()
+    test_metrica_calculada()
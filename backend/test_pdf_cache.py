@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para la caché de artefactos PDF y las respuestas ETag/304
+"""
+
+import tempfile
+import time
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+from pypdf import PdfReader
+
+import app
+from dieta_pdf_generator import DietaPDFGenerator
+from almacen_artefactos import AlmacenArtefactos
+from pdf_cache import CacheArtefactos, etag_coincide
+
+
+def test_cache_lru_y_disco():
+    """El LRU respeta su límite y el nivel en disco sobrevive a la expulsión"""
+    with tempfile.TemporaryDirectory() as directorio:
+        cache = CacheArtefactos(max_entradas=2, almacen=AlmacenArtefactos(directorio))
+        for clave in ("a", "b", "c"):
+            cache.guardar(clave, f"%PDF-{clave}".encode())
+
+        assert cache.estadisticas()["entradas"] == 2
+
+        # "a" se expulsó de memoria, pero se recupera desde disco
+        artefacto = cache.obtener("a")
+        assert artefacto is not None
+        assert artefacto.contenido == b"%PDF-a"
+
+    print("✅ Caché LRU con nivel en disco correcta")
+
+
+def test_nivel_disco_caduca_y_respeta_presupuesto():
+    """El nivel en disco sigue el TTL de PDFs y el presupuesto del almacén"""
+    with tempfile.TemporaryDirectory() as directorio:
+        cache = CacheArtefactos(max_entradas=1, almacen=AlmacenArtefactos(directorio, ttl_por_tipo={"pdf": 0}))
+        cache.guardar("a", b"%PDF-a")
+        cache.guardar("b", b"%PDF-b")
+        time.sleep(0.01)
+
+        # "a" salió de memoria y su copia en disco ya caducó
+        assert cache.obtener("a") is None
+
+    with tempfile.TemporaryDirectory() as directorio:
+        almacen = AlmacenArtefactos(directorio, max_bytes=10)
+        cache = CacheArtefactos(max_entradas=1, almacen=almacen)
+        for clave in ("a", "b", "c"):
+            cache.guardar(clave, f"%PDF-{clave}".encode())
+
+        assert almacen.estadisticas()["bytes_en_disco"] <= 10
+        assert cache.obtener("a") is None
+        assert cache.obtener("c").contenido == b"%PDF-c"
+
+    print("✅ Nivel en disco con TTL y presupuesto del almacén")
+
+
+def test_etag_304():
+    """Las rutas de modelos de dieta devuelven ETag y responden 304 al revalidar"""
+    client = TestClient(app.app)
+
+    respuesta = client.get("/dieta-modelos/generar-pdf-modelo/1")
+    assert respuesta.status_code == 200
+    etag = respuesta.headers["etag"]
+    assert etag_coincide(f'W/{etag}, "otro"', etag)
+
+    revalidacion = client.get("/dieta-modelos/generar-pdf-modelo/1", headers={"If-None-Match": etag})
+    assert revalidacion.status_code == 304
+    assert revalidacion.content == b""
+    print("✅ ETag y 304 funcionando")
+
+
+def test_numeracion_todos_los_modelos():
+    """El PDF completo se maqueta de una vez y numera sus páginas de forma continua"""
+    documento = PdfReader(BytesIO(DietaPDFGenerator().renderizar_todos_los_modelos()))
+
+    assert len(documento.pages) > 1
+    for numero, pagina in enumerate(documento.pages, start=1):
+        assert f"Página {numero}" in pagina.extract_text()
+    print("✅ Numeración continua en el PDF completo")
+
+
+if __name__ == "__main__":
+    test_cache_lru_y_disco()
+    test_nivel_disco_caduca_y_respeta_presupuesto()
+    test_etag_304()
+    test_numeracion_todos_los_modelos()
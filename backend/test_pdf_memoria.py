@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para el renderizado de PDFs en memoria
+Verifica que los generadores devuelven bytes sin escribir archivos en disco
+"""
+
+import os
+from datetime import datetime
+
+from dieta_pdf_generator import DietaPDFGenerator
+from menu_semanal_pdf_generator import MenuSemanalPDFGenerator
+import menu_casa
+import pdf_salida
+
+
+def _archivos_pdf():
+    """Lista los PDFs presentes en el directorio actual y en el del módulo"""
+    directorios = {os.getcwd(), os.path.dirname(os.path.abspath(__file__))}
+    return {
+        os.path.join(directorio, nombre)
+        for directorio in directorios
+        for nombre in os.listdir(directorio)
+        if nombre.endswith('.pdf')
+    }
+
+
+def test_pdf_memoria():
+    """Los generadores renderizan PDFs válidos sin tocar el disco"""
+    antes = _archivos_pdf()
+
+    generator = DietaPDFGenerator()
+    documentos = [
+        generator.renderizar_todos_los_modelos(),
+        generator.renderizar_modelo_individual(1),
+        generator.renderizar_tabla_resumen(),
+        MenuSemanalPDFGenerator().renderizar_menu_semanal(modo='secuencial'),
+        menu_casa.renderizar_menu_desde_cristina_menu1(),
+    ]
+
+    for contenido_pdf in documentos:
+        assert isinstance(contenido_pdf, bytes)
+        assert contenido_pdf.startswith(b'%PDF-')
+
+    assert _archivos_pdf() == antes
+    print("✅ PDFs renderizados en memoria sin archivos temporales")
+
+
+def test_perfil_reproducible():
+    """Con el perfil reproducible las mismas entradas producen los mismos bytes"""
+    perfil_anterior = pdf_salida.obtener_perfil().nombre
+    pdf_salida.configurar_perfil("reproducible")
+    try:
+        generator = DietaPDFGenerator()
+        assert generator.renderizar_modelo_individual(2) == generator.renderizar_modelo_individual(2)
+
+        generador_menu = MenuSemanalPDFGenerator()
+        primero = generador_menu.renderizar_menu_semanal(semilla=5, paciente="Prueba")
+        informe = pdf_salida.registrar_documento("prueba", primero)
+        assert informe["bytes"] == len(primero)
+        assert pdf_salida.informe_tamanos()["documentos"]["prueba"]["documentos"] >= 1
+    finally:
+        pdf_salida.configurar_perfil(perfil_anterior)
+    print("✅ Salida reproducible e informe de tamaños")
+
+
+class _RelojParado(datetime):
+    """datetime cuyo now() devuelve la hora fijada en `ahora`"""
+    ahora = datetime(2026, 3, 2, 10, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.ahora
+
+
+def test_reproducible_con_el_reloj_movido():
+    """En el perfil reproducible, renders del mismo plan con minutos de diferencia dan los mismos bytes"""
+    import menu_semanal_pdf_generator
+
+    perfil_anterior = pdf_salida.obtener_perfil().nombre
+    pdf_salida.configurar_perfil("reproducible")
+    menu_semanal_pdf_generator.datetime = menu_casa.datetime = _RelojParado
+    menus = menu_casa.construir_menus_desde_cristina_menu1(semilla=3)
+    try:
+        generador_menu = MenuSemanalPDFGenerator()
+        renders = []
+        for ahora in (datetime(2026, 3, 2, 10, 0), datetime(2026, 3, 2, 10, 1), datetime(2026, 3, 2, 18, 30)):
+            _RelojParado.ahora = ahora
+            renders.append((generador_menu.renderizar_menu_semanal(semilla=5, paciente="Prueba"),
+                            menu_casa.renderizar_pdf_menu_semanal(*menus)))
+        assert renders[0] == renders[1] == renders[2]
+
+        # Con la fecha como entrada, tampoco cambian al pasar de día
+        _RelojParado.ahora = datetime(2026, 3, 5, 9, 0)
+        fecha = datetime(2026, 3, 2)
+        assert generador_menu.renderizar_menu_semanal(semilla=5, paciente="Prueba", fecha=fecha) == renders[0][0]
+        assert menu_casa.renderizar_pdf_menu_semanal(*menus, fecha=fecha) == renders[0][1]
+    finally:
+        menu_semanal_pdf_generator.datetime = menu_casa.datetime = datetime
+        pdf_salida.configurar_perfil(perfil_anterior)
+    print("✅ Bytes reproducibles aunque avance el reloj")
+
+
+def test_perfil_desconocido():
+    """Un PDF_PERFIL_SALIDA mal escrito falla al importar con un error claro, no con KeyError"""
+    import subprocess
+    import sys
+
+    resultado = subprocess.run(
+        [sys.executable, "-c", "import pdf_salida"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, "PDF_PERFIL_SALIDA": "comprimido"},
+        capture_output=True, text=True
+    )
+    assert resultado.returncode != 0
+    assert "ValueError: Perfil de salida desconocido: comprimido" in resultado.stderr
+    print("✅ Perfil de salida desconocido rechazado con un error claro")
+
+
+if __name__ == "__main__":
+    test_pdf_memoria()
+    test_perfil_reproducible()
+    test_reproducible_con_el_reloj_movido()
+    test_perfil_desconocido()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para la caché de párrafos de celda
+Verifica que los textos repetidos se maquetan una vez y que el PDF no cambia
+"""
+
+from menu_semanal_pdf_generator import MenuSemanalPDFGenerator
+from pdf_estilos import ESTILOS_MENU_SEMANAL
+from pdf_parrafos import estadisticas_parrafos, limpiar_parrafos, parrafo_celda
+import pdf_salida
+
+
+def test_parrafo_compartido():
+    """El mismo texto y estilo devuelven la misma instancia con la maquetación memorizada"""
+    limpiar_parrafos()
+    estilo = ESTILOS_MENU_SEMANAL.cell_style
+    primero = parrafo_celda("<b>Lunes</b> con un texto algo más largo que una línea", estilo)
+    assert parrafo_celda("<b>Lunes</b> con un texto algo más largo que una línea", estilo) is primero
+
+    estrecho = primero.wrap(40, 1000)
+    ancho = primero.wrap(400, 1000)
+    assert estrecho[1] > ancho[1]
+    assert primero.wrap(40, 1000) == estrecho
+    assert len(primero.blPara.lines) > 1
+
+    estadisticas = estadisticas_parrafos()
+    assert estadisticas["aciertos"] == 1 and estadisticas["fallos"] == 1
+    print("✅ Párrafos de celda compartidos")
+
+
+def test_pdf_identico_con_cache():
+    """Un PDF renderizado con la caché caliente es idéntico al renderizado en frío"""
+    perfil_anterior = pdf_salida.obtener_perfil().nombre
+    pdf_salida.configurar_perfil("reproducible")
+    try:
+        generador = MenuSemanalPDFGenerator()
+        limpiar_parrafos()
+        en_frio = generador.renderizar_libro_menus(3, semilla=4)
+        fallos = estadisticas_parrafos()["fallos"]
+        en_caliente = generador.renderizar_libro_menus(3, semilla=4)
+    finally:
+        pdf_salida.configurar_perfil(perfil_anterior)
+
+    assert en_frio == en_caliente
+    assert estadisticas_parrafos()["fallos"] == fallos
+    print("✅ PDF idéntico con la caché de párrafos")
+
+
+if __name__ == "__main__":
+    test_parrafo_compartido()
+    test_pdf_identico_con_cache()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para el servicio de renderizado de PDFs
+Verifica el renderizado concurrente en el propio proceso y la recuperación de un pool roto
+"""
+
+import asyncio
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from pypdf import PdfReader
+
+import pdf_render_service
+from dieta_pdf_generator import DietaPDFGenerator
+from pdf_render_service import ServicioRender
+
+
+def test_fechas_concurrentes_sin_mezclarse():
+    """Sin trabajadores, renders simultáneos con fechas distintas imprimen cada uno la suya"""
+    huella = DietaPDFGenerator().huella_datos()
+    fechas = [f"{dia:02d}/03/2026" for dia in range(1, 9)]
+
+    async def renderizar():
+        servicio = ServicioRender(max_workers=0)
+        return await asyncio.gather(*(
+            servicio.renderizar(pdf_render_service.renderizar_dieta, "modelo", (1,), huella, fecha)
+            for fecha in fechas
+        ))
+
+    for fecha, contenido_pdf in zip(fechas, asyncio.run(renderizar())):
+        texto = PdfReader(BytesIO(contenido_pdf)).pages[0].extract_text()
+        assert f"Fecha: {fecha}" in texto
+    print("✅ Fechas de cabecera sin mezclarse entre hilos")
+
+
+class _PoolRoto:
+    """Executor cuyos envíos fallan como si un trabajador hubiera muerto; su cierre tarda"""
+
+    def __init__(self):
+        self.cierres = []
+
+    def submit(self, tarea, *args):
+        futuro = Future()
+        futuro.set_exception(BrokenProcessPool("trabajador muerto"))
+        return futuro
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.cierres.append(wait)
+        if wait:
+            time.sleep(1)
+
+
+def test_pool_roto_no_bloquea_el_bucle():
+    """Un BrokenProcessPool descarta el pool sin esperar a los trabajadores desde el bucle"""
+    servicio = ServicioRender(max_workers=1)
+    pool = servicio._executor = _PoolRoto()
+
+    async def renderizar():
+        inicio = time.perf_counter()
+        try:
+            await servicio.renderizar(pdf_render_service._ping)
+            raise AssertionError("debería propagar BrokenProcessPool")
+        except BrokenProcessPool:
+            return time.perf_counter() - inicio
+
+    assert asyncio.run(renderizar()) < 0.5
+    assert pool.cierres == [False]
+    assert servicio.estadisticas()["activo"] is False
+    assert servicio.estadisticas()["pendientes"] == 0
+    print("✅ Pool roto descartado sin bloquear el bucle")
+
+
+if __name__ == "__main__":
+    test_fechas_concurrentes_sin_mezclarse()
+    test_pool_roto_no_bloquea_el_bucle()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para el constructor de documentos en streaming
+Verifica que los flowables se consumen bajo demanda y que los libros de menús se maquetan
+"""
+
+import io
+
+from pypdf import PdfReader
+from reportlab.platypus import Paragraph
+
+from menu_semanal_pdf_generator import MenuSemanalPDFGenerator
+from pdf_estilos import HOJA_BASE
+from pdf_streaming import DocumentoStreaming
+import menu_casa
+
+
+def test_consumo_bajo_demanda():
+    """El documento nunca pide más flowables que la ventana de anticipación"""
+    producidos = []
+    maquetados = []
+
+    def parrafos():
+        for i in range(300):
+            producidos.append(i)
+            yield Paragraph(f"Línea {i}", HOJA_BASE['Normal'])
+
+    buffer = io.BytesIO()
+    doc = DocumentoStreaming(buffer, anticipacion=8)
+
+    def despues_de_maquetar(flowable):
+        if isinstance(flowable, Paragraph):
+            maquetados.append(len(producidos) - len(maquetados) - 1)
+
+    doc.afterFlowable = despues_de_maquetar
+    doc.build(parrafos())
+
+    assert len(producidos) == 300
+    assert len(maquetados) == 300
+    assert max(maquetados) <= 8
+    assert len(PdfReader(buffer).pages) > 1
+    print("✅ Flowables consumidos bajo demanda")
+
+
+def test_libros_de_menus():
+    """Los libros de varias semanas salen de los dos generadores"""
+    libro = MenuSemanalPDFGenerator().renderizar_libro_menus(6, semilla=1, paciente="Prueba")
+    texto = "".join(pagina.extract_text() for pagina in PdfReader(io.BytesIO(libro)).pages)
+    assert "SEMANA 1" in texto and "SEMANA 6" in texto
+
+    menus = menu_casa.construir_menus_desde_cristina_menu1()
+    assert menus is not None
+    libro_casa = menu_casa.renderizar_libro_menus_casa(menus for _ in range(4))
+    assert len(PdfReader(io.BytesIO(libro_casa)).pages) == 8
+    print("✅ Libros de menús generados en streaming")
+
+
+if __name__ == "__main__":
+    test_consumo_bajo_demanda()
+    test_libros_de_menus()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para el precalentamiento de PDFs al arrancar
+Verifica que /ready solo responde 200 cuando los PDFs de dieta están en la caché
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+import app
+from dieta_pdf_generator import DietaPDFGenerator
+from pdf_cache import cache_pdfs
+from pdf_render_service import servicio_render
+
+
+def test_precalentado_y_ready():
+    """Con precalentamiento activo los PDFs de dieta quedan cacheados antes de estar listo"""
+    configuracion = (servicio_render.max_workers, servicio_render.precalentar)
+    servicio_render.max_workers, servicio_render.precalentar = 0, True
+    app.estado_arranque.update(listo=False, precalentado=[], error=None, segundos=None)
+    cache_pdfs.limpiar()
+    try:
+        with TestClient(app.app) as client:
+            assert client.get("/health").status_code == 200
+
+            for _ in range(100):
+                respuesta = client.get("/ready")
+                if respuesta.status_code == 200:
+                    break
+                assert respuesta.status_code == 503
+                time.sleep(0.1)
+
+            assert respuesta.status_code == 200
+            estado = respuesta.json()
+            assert estado["error"] is None
+            assert "completo" in estado["precalentado"] and "modelo_1" in estado["precalentado"]
+
+            generator = DietaPDFGenerator()
+            for documento in (("completo",), ("resumen",), ("modelo", 4)):
+                assert cache_pdfs.obtener(generator.clave_artefacto(*documento)) is not None
+    finally:
+        servicio_render.max_workers, servicio_render.precalentar = configuracion
+    print("✅ PDFs precalentados antes de /ready")
+
+
+if __name__ == "__main__":
+    test_precalentado_y_ready()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para la caché persistente de búsquedas de Spoonacular
+Verifica aciertos, persistencia entre instancias, stale-while-revalidate y el límite de entradas
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from spoonacular_cache import CacheBusquedas
+
+PARAMS = {"cuisine": "Greek", "type": "main course", "query": "", "number": 30}
+
+
+def _buscador(resultados):
+    """Búsqueda simulada que cuenta sus llamadas"""
+    llamadas = []
+
+    def buscar():
+        llamadas.append(1)
+        return resultados
+    return buscar, llamadas
+
+
+def test_aciertos_y_persistencia():
+    """Los mismos parámetros normalizados no vuelven a la red, tampoco tras reiniciar"""
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "cache.sqlite3")
+        cache = CacheBusquedas(ruta)
+        buscar, llamadas = _buscador([{"id": 1, "title": "Moussaka"}])
+
+        assert cache.obtener_o_buscar(PARAMS, buscar) == [{"id": 1, "title": "Moussaka"}]
+        # Mayúsculas, espacios, valores vacíos y la API key no cambian la clave
+        parecidos = {"apiKey": "otra", "cuisine": " greek ", "type": "Main  Course", "number": 30}
+        assert cache.obtener_o_buscar(parecidos, buscar) == [{"id": 1, "title": "Moussaka"}]
+        assert len(llamadas) == 1
+        assert cache.estadisticas()["aciertos"] == 1
+        assert cache.estadisticas()["fallos"] == 1
+        cache.cerrar()
+
+        # Otro proceso que arranca lee el mismo archivo
+        assert CacheBusquedas(ruta).obtener_o_buscar(PARAMS, buscar) == [{"id": 1, "title": "Moussaka"}]
+        assert len(llamadas) == 1
+    print("✅ Aciertos y persistencia entre instancias")
+
+
+def test_errores_no_se_guardan():
+    """Una respuesta con error (None) se devuelve pero no se cachea"""
+    cache = CacheBusquedas()
+    buscar, llamadas = _buscador(None)
+    assert cache.obtener_o_buscar(PARAMS, buscar) is None
+    assert cache.obtener_o_buscar(PARAMS, buscar) is None
+    assert len(llamadas) == 2
+    print("✅ Errores no cacheados")
+
+
+def test_obsoleta_se_sirve_y_revalida():
+    """Pasado el TTL la entrada se sirve al momento y se refresca en segundo plano"""
+    cache = CacheBusquedas(ttl=0.1, gracia=60)
+    cache.guardar(PARAMS, [{"id": 1, "title": "Vieja"}])
+    time.sleep(0.2)
+
+    buscar, llamadas = _buscador([{"id": 2, "title": "Nueva"}])
+    assert cache.obtener_o_buscar(PARAMS, buscar) == [{"id": 1, "title": "Vieja"}]
+    for _ in range(50):
+        if cache.leer(PARAMS)[0] == [{"id": 2, "title": "Nueva"}]:
+            break
+        time.sleep(0.02)
+    assert cache.leer(PARAMS) == ([{"id": 2, "title": "Nueva"}], False)
+    assert len(llamadas) == 1
+    assert cache.estadisticas()["revalidaciones"] == 1
+
+    # Fuera del margen de gracia ya no se sirve
+    cache = CacheBusquedas(ttl=0.05, gracia=0.05)
+    cache.guardar(PARAMS, [])
+    time.sleep(0.15)
+    assert cache.leer(PARAMS) is None
+    print("✅ Stale-while-revalidate")
+
+
+def test_revalidacion_async():
+    """La variante asíncrona revalida con una tarea del bucle de eventos"""
+    async def escenario():
+        cache = CacheBusquedas(ttl=0.05)
+        cache.guardar(PARAMS, [{"id": 1, "title": "Vieja"}])
+        await asyncio.sleep(0.1)
+
+        async def buscar():
+            return [{"id": 2, "title": "Nueva"}]
+
+        assert await cache.obtener_o_buscar_async(PARAMS, buscar) == [{"id": 1, "title": "Vieja"}]
+        await asyncio.sleep(0.05)
+        return await cache.obtener_o_buscar_async(PARAMS, buscar)
+
+    assert asyncio.run(escenario()) == [{"id": 2, "title": "Nueva"}]
+    print("✅ Revalidación asíncrona")
+
+
+class _CacheConHilos(CacheBusquedas):
+    """Caché que anota en qué hilo se lee y se escribe SQLite"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.hilos = []
+
+    def leer(self, params):
+        self.hilos.append(threading.get_ident())
+        return super().leer(params)
+
+    def guardar(self, params, resultados):
+        self.hilos.append(threading.get_ident())
+        super().guardar(params, resultados)
+
+
+def test_async_no_usa_sqlite_en_el_bucle():
+    """La variante asíncrona consulta y guarda fuera del hilo del bucle de eventos"""
+    cache = _CacheConHilos()
+
+    async def escenario():
+        async def buscar():
+            return [{"id": 1, "title": "Nueva"}]
+
+        await cache.obtener_o_buscar_async(PARAMS, buscar)
+        await cache.obtener_o_buscar_async(PARAMS, buscar)
+        return threading.get_ident()
+
+    hilo_bucle = asyncio.run(escenario())
+    assert len(cache.hilos) == 3  # fallo, guardado y acierto
+    assert hilo_bucle not in cache.hilos
+    print("✅ SQLite fuera del bucle de eventos")
+
+
+def test_limite_de_entradas():
+    """Al superar el máximo se expulsa la búsqueda usada hace más tiempo"""
+    cache = CacheBusquedas(max_entradas=2)
+    cache.guardar({"cuisine": "a"}, [])
+    time.sleep(0.01)
+    cache.guardar({"cuisine": "b"}, [])
+    time.sleep(0.01)
+    cache.leer({"cuisine": "a"})
+    time.sleep(0.01)
+    cache.guardar({"cuisine": "c"}, [])
+
+    assert cache.estadisticas()["entradas"] == 2
+    assert cache.leer({"cuisine": "b"}) is None
+    assert cache.leer({"cuisine": "a"}) is not None
+    print("✅ Límite de entradas LRU")
+
+
+if __name__ == "__main__":
+    test_aciertos_y_persistencia()
+    test_errores_no_se_guardan()
+    test_obsoleta_se_sirve_y_revalida()
+    test_revalidacion_async()
+    test_async_no_usa_sqlite_en_el_bucle()
+    test_limite_de_entradas()
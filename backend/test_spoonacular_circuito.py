@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para el cortocircuito de Spoonacular
+Verifica la apertura por fallos, la prueba semiabierta y el corte por cuota
+"""
+
+import time
+from datetime import datetime, timezone
+
+from spoonacular_circuito import (ABIERTO, CERRADO, CircuitoAbierto, CircuitoSpoonacular,
+                                  segundos_hasta_reinicio_cuota)
+
+
+def test_abre_tras_fallos_y_prueba_semiabierto():
+    """Al llegar al umbral se abre; pasado el tiempo deja pasar una sola prueba"""
+    circuito = CircuitoSpoonacular(umbral_fallos=3, tiempo_apertura=0.1)
+    for _ in range(2):
+        circuito.registrar_respuesta(503, 0.01)
+    assert circuito.permitir()
+    circuito.registrar_fallo("conexion")
+    assert circuito.estado == ABIERTO
+
+    try:
+        circuito.comprobar()
+        assert False, "el circuito debería estar abierto"
+    except CircuitoAbierto as e:
+        assert str(e) == "conexion"
+
+    time.sleep(0.15)
+    assert circuito.permitir()
+    assert not circuito.permitir()
+
+    # La prueba falla: vuelve a abrirse sin esperar al umbral
+    circuito.registrar_respuesta(500, 0.01)
+    assert circuito.estado == ABIERTO
+
+    time.sleep(0.15)
+    assert circuito.permitir()
+    circuito.registrar_respuesta(200, 0.01)
+    assert circuito.estado == CERRADO
+    assert circuito.permitir() and circuito.permitir()
+    assert circuito.estadisticas()["rechazadas"] == 2
+    print("✅ Apertura por fallos y prueba semiabierta")
+
+
+def test_respuestas_lentas_cuentan_como_fallo():
+    """Una respuesta correcta pero lenta suma para abrir el circuito"""
+    circuito = CircuitoSpoonacular(umbral_fallos=2, latencia_lenta=1.0)
+    circuito.registrar_respuesta(200, 2.0)
+    circuito.registrar_respuesta(200, 0.1)
+    assert circuito.fallos_consecutivos == 0
+    circuito.registrar_respuesta(200, 2.0)
+    circuito.registrar_respuesta(200, 3.0)
+    assert circuito.estado == ABIERTO
+    print("✅ Lentitud como fallo")
+
+
+def test_cuota_agotada_hasta_medianoche():
+    """Un 402 o la cuota restante a cero abren el circuito hasta el reinicio diario"""
+    circuito = CircuitoSpoonacular()
+    circuito.registrar_respuesta(200, 0.1, cuota_restante="12.5")
+    assert circuito.cuota_restante == 12.5
+    assert circuito.estado == CERRADO
+
+    circuito.registrar_respuesta(200, 0.1, cuota_restante="0")
+    assert circuito.estado == ABIERTO
+    assert circuito.motivo == "cuota_agotada"
+    assert circuito.estadisticas()["segundos_para_reintentar"] > 0
+
+    circuito = CircuitoSpoonacular()
+    circuito.registrar_respuesta(402, 0.1)
+    assert not circuito.permitir()
+
+    ahora = datetime(2026, 3, 1, 23, 0, tzinfo=timezone.utc)
+    assert segundos_hasta_reinicio_cuota(ahora) == 3600
+    print("✅ Corte por cuota")
+
+
+def test_4xx_cuentan_como_fallo():
+    """Una API key mala (401/403) o un 404 no cierran el circuito: suman fallos"""
+    circuito = CircuitoSpoonacular(umbral_fallos=3)
+    for status_code in (401, 403, 404):
+        circuito.registrar_respuesta(status_code, 0.1)
+    assert circuito.estado == ABIERTO
+    assert circuito.motivo == "http_404"
+    print("✅ 4xx como fallo")
+
+
+def test_sin_api_key_siempre_abierto():
+    """Abierto sin límite de tiempo nunca deja pasar pruebas"""
+    circuito = CircuitoSpoonacular(tiempo_apertura=0)
+    circuito.abrir("sin_api_key", float("inf"))
+    assert not circuito.permitir()
+    assert circuito.estadisticas()["segundos_para_reintentar"] is None
+    print("✅ Sin API key no se llama a la red")
+
+
+if __name__ == "__main__":
+    test_abre_tras_fallos_y_prueba_semiabierto()
+    test_respuestas_lentas_cuentan_como_fallo()
+    test_cuota_agotada_hasta_medianoche()
+    test_4xx_cuentan_como_fallo()
+    test_sin_api_key_siempre_abierto()
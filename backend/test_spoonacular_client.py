@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para los clientes compartidos de Spoonacular
+Verifica los reintentos con espera para 429/5xx y fallos de conexión, sin peticiones reales
+"""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter
+
+from spoonacular_circuito import ABIERTO, CERRADO, CircuitoSpoonacular
+from spoonacular_client import REINTENTOS, RESPUESTAS, ClienteSpoonacular, PoliticaReintentos, SesionSpoonacular
+
+# Esperas mínimas para que la prueba sea rápida
+POLITICA = PoliticaReintentos(intentos=3, espera_base=0.001, espera_maxima=0.01)
+RESULTADOS = {"results": [{"id": 1, "title": "Moussaka"}]}
+
+
+def test_espera_exponencial_con_jitter():
+    """La espera crece con el intento, nunca supera el máximo y respeta Retry-After"""
+    politica = PoliticaReintentos(espera_base=1, espera_maxima=3)
+    for intento in range(6):
+        assert 0 <= politica.espera(intento) <= min(3, 2 ** intento)
+    assert politica.espera(0, "2") == 2
+    assert politica.espera(0, "60") == 3
+    print("✅ Espera exponencial acotada")
+
+
+def test_politica_sin_intentos():
+    """Una política sin ningún intento se rechaza al crearla"""
+    for intentos in (0, -1):
+        try:
+            PoliticaReintentos(intentos=intentos)
+        except ValueError:
+            continue
+        raise AssertionError(f"intentos={intentos} debería fallar")
+    assert PoliticaReintentos(intentos=1).intentos == 1
+    print("✅ Política sin intentos rechazada")
+
+
+def test_async_reintenta_429_y_5xx():
+    """El cliente asíncrono reintenta los estados transitorios y se queda con la respuesta buena"""
+    respuestas = [httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(503),
+                  httpx.Response(200, json=RESULTADOS)]
+
+    async def api(request):
+        return respuestas.pop(0)
+
+    async def buscar():
+        cliente = ClienteSpoonacular("https://spoonacular.test", "clave",
+                                     transport=httpx.MockTransport(api), reintentos=POLITICA)
+        try:
+            return await cliente.complex_search({"cuisine": "greek"})
+        finally:
+            await cliente.cerrar()
+
+    reintentos_antes = REINTENTOS.valor(cliente="async")
+    respuestas_429 = RESPUESTAS.valor(cliente="async", codigo="429")
+    assert asyncio.run(buscar()) == RESULTADOS["results"]
+    assert respuestas == []
+    assert REINTENTOS.valor(cliente="async") == reintentos_antes + 2
+    assert RESPUESTAS.valor(cliente="async", codigo="429") == respuestas_429 + 1
+    print("✅ Reintentos asíncronos")
+
+
+def test_async_error_definitivo():
+    """Agotados los intentos, un 5xx devuelve None y un 4xx no se reintenta"""
+    llamadas = []
+
+    async def api(request):
+        llamadas.append(request)
+        return httpx.Response(502 if len(llamadas) < 4 else 402)
+
+    async def buscar():
+        cliente = ClienteSpoonacular("https://spoonacular.test", "clave",
+                                     transport=httpx.MockTransport(api), reintentos=POLITICA)
+        try:
+            return [await cliente.complex_search({}), await cliente.complex_search({})]
+        finally:
+            await cliente.cerrar()
+
+    assert asyncio.run(buscar()) == [None, None]
+    assert len(llamadas) == 4
+    print("✅ Errores definitivos sin reintentos de más")
+
+
+class _AdaptadorSimulado(BaseAdapter):
+    """Adaptador requests que devuelve respuestas preparadas o lanza excepciones"""
+
+    def __init__(self, salidas):
+        super().__init__()
+        self.salidas = list(salidas)
+        self.peticiones = []
+
+    def send(self, request, **kwargs):
+        self.peticiones.append((request, kwargs))
+        salida = self.salidas.pop(0)
+        if isinstance(salida, Exception):
+            raise salida
+        estado, cuerpo = salida
+        response = requests.Response()
+        response.status_code = estado
+        response._content = cuerpo
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def test_sesion_reintenta_y_reutiliza():
+    """La sesión síncrona reintenta fallos de conexión y usa el timeout de cada llamada"""
+    adaptador = _AdaptadorSimulado([
+        requests.ConnectionError("caída"),
+        (500, b"{}"),
+        (200, b'{"results": [{"id": 1, "title": "Moussaka"}]}'),
+    ])
+    sesion = SesionSpoonacular("https://spoonacular.test", "clave", reintentos=POLITICA, adaptador=adaptador)
+
+    assert sesion.complex_search({"cuisine": "greek"}, timeout=2) == RESULTADOS["results"]
+    assert len(adaptador.peticiones) == 3
+    assert all(kwargs["timeout"] == 2 for _, kwargs in adaptador.peticiones)
+    assert "apiKey=clave" in adaptador.peticiones[0][0].url
+    sesion.cerrar()
+    print("✅ Reintentos síncronos con sesión compartida")
+
+
+def test_sesion_compartida_entre_hilos():
+    """Los hilos que piden la sesión a la vez reciben todos la misma"""
+    sesion = SesionSpoonacular("https://spoonacular.test", "clave", adaptador=_AdaptadorSimulado([]))
+    barrera = threading.Barrier(8)
+    obtenidas = []
+
+    def obtener():
+        barrera.wait()
+        obtenidas.append(sesion._obtener_sesion())
+
+    hilos = [threading.Thread(target=obtener) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(obtenidas) == 8 and len({id(s) for s in obtenidas}) == 1
+    sesion.cerrar()
+    assert sesion._sesion is None
+    print("✅ Una sola sesión para todos los hilos")
+
+
+def _circuito_semiabierto() -> CircuitoSpoonacular:
+    """Circuito abierto cuyo tiempo de apertura ya ha pasado: la siguiente búsqueda es la prueba"""
+    circuito = CircuitoSpoonacular(tiempo_apertura=0.05)
+    circuito.abrir("conexion", 0.05)
+    time.sleep(0.06)
+    return circuito
+
+
+def test_prueba_con_excepcion_inesperada():
+    """Una excepción que no es de conexión durante la prueba vuelve a abrir el circuito, no lo bloquea"""
+    async def api(request):
+        return httpx.Response(200, text="<html>Bad Gateway</html>")
+
+    async def buscar(circuito):
+        cliente = ClienteSpoonacular("https://spoonacular.test", "clave", transport=httpx.MockTransport(api),
+                                     reintentos=POLITICA, circuito=circuito)
+        try:
+            await cliente.complex_search({})
+        finally:
+            await cliente.cerrar()
+
+    circuito = _circuito_semiabierto()
+    try:
+        asyncio.run(buscar(circuito))
+        raise AssertionError("un cuerpo que no es JSON debería lanzar")
+    except ValueError:
+        pass
+    assert circuito.estado == ABIERTO
+
+    circuito = _circuito_semiabierto()
+    sesion = SesionSpoonacular("https://spoonacular.test", "clave", reintentos=POLITICA, circuito=circuito,
+                               adaptador=_AdaptadorSimulado([requests.exceptions.ChunkedEncodingError("cortada")]))
+    try:
+        sesion.complex_search({})
+        raise AssertionError("ChunkedEncodingError debería propagarse")
+    except requests.exceptions.ChunkedEncodingError:
+        pass
+    assert circuito.estado == ABIERTO
+
+    # Pasado el tiempo de apertura se deja pasar otra prueba
+    time.sleep(0.06)
+    sesion._adaptador.salidas.append((200, b'{"results": []}'))
+    assert sesion.complex_search({}) == []
+    assert circuito.estado == CERRADO
+    print("✅ Excepciones inesperadas liberan la prueba del circuito")
+
+
+if __name__ == "__main__":
+    test_espera_exponencial_con_jitter()
+    test_politica_sin_intentos()
+    test_async_reintenta_429_y_5xx()
+    test_async_error_definitivo()
+    test_sesion_reintenta_y_reutiliza()
+    test_sesion_compartida_entre_hilos()
+    test_prueba_con_excepcion_inesperada()
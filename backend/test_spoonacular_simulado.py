@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba del sustituto local de Spoonacular
+Reproduce, graba e inyecta errores sin hacer peticiones reales
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+import httpx
+from fastapi.testclient import TestClient
+
+from spoonacular_client import ClienteSpoonacular
+from spoonacular_simulado import ConfigSimulado, GrabacionesSpoonacular, crear_app, crear_latencia
+
+PARAMS = {"cuisine": "Italian", "type": "main course", "number": "2", "apiKey": "clave"}
+
+
+def _grabaciones_de_ejemplo() -> GrabacionesSpoonacular:
+    grabaciones = GrabacionesSpoonacular(None)
+    grabaciones.grabar(PARAMS, 200, {"results": [{"id": 1, "title": "Lasagna"}, {"id": 2, "title": "Risotto"}]},
+                       0.31, "149.5")
+    return grabaciones
+
+
+def test_reproduce_grabacion():
+    """Los mismos parámetros (sin la API key ni mayúsculas) devuelven la respuesta grabada"""
+    cliente = TestClient(crear_app(_grabaciones_de_ejemplo(), ConfigSimulado(semilla=1)))
+    response = cliente.get("/recipes/complexSearch",
+                           params={"cuisine": "italian", "type": "main course", "number": "2", "apiKey": "otra"})
+
+    assert response.status_code == 200
+    assert [r["title"] for r in response.json()["results"]] == ["Lasagna", "Risotto"]
+
+    # Sin grabación para esos parámetros se sortean recetas entre las grabadas
+    response = cliente.get("/recipes/complexSearch", params={"cuisine": "thai", "number": "1"})
+    assert len(response.json()["results"]) == 1
+    assert response.json()["results"][0]["id"] in (1, 2)
+    assert cliente.get("/simulado/estado").json()["sinteticas"] == 1
+    print("✅ Grabaciones reproducidas")
+
+
+def test_errores_y_cuota_inyectados():
+    """Con tasa de errores 1 todo falla; al agotar la cuota responde 402"""
+    cliente = TestClient(crear_app(GrabacionesSpoonacular(None), ConfigSimulado(tasa_errores=1.0, semilla=1)))
+    assert all(cliente.get("/recipes/complexSearch").status_code in (429, 500, 503) for _ in range(5))
+
+    cliente = TestClient(crear_app(GrabacionesSpoonacular(None), ConfigSimulado(cuota_diaria=2)))
+    primera = cliente.get("/recipes/complexSearch", params={"number": "10"})
+    assert primera.headers["X-API-Quota-Left"] == "0.9"
+    cliente.get("/recipes/complexSearch", params={"number": "10"})
+    assert cliente.get("/recipes/complexSearch").status_code == 402
+    print("✅ Errores y cuota inyectados")
+
+
+def test_latencias():
+    """Latencia fija, lognormal con su mediana y sorteada entre las grabadas"""
+    import random
+    rng = random.Random(1)
+    grabaciones = _grabaciones_de_ejemplo()
+
+    assert crear_latencia("fija:0.2", grabaciones)(rng) == 0.2
+    assert crear_latencia("0", grabaciones)(rng) == 0
+    assert crear_latencia("grabada", grabaciones)(rng) == 0.31
+    muestras = sorted(crear_latencia("lognormal:0.3:0.5", grabaciones)(rng) for _ in range(2001))
+    assert 0.25 < muestras[1000] < 0.35
+    print("✅ Distribuciones de latencia")
+
+
+def test_modo_grabar():
+    """En modo grabar se reenvía a la API real y la respuesta queda en el archivo"""
+    def api_real(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"results": [{"id": 7, "title": "Paella"}]},
+                              headers={"X-API-Quota-Left": "42"})
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "grabaciones.json")
+        app = crear_app(GrabacionesSpoonacular(ruta), grabar=True, transporte_real=httpx.MockTransport(api_real))
+        response = TestClient(app).get("/recipes/complexSearch", params=PARAMS)
+        assert response.json()["results"][0]["title"] == "Paella"
+        assert response.headers["X-API-Quota-Left"] == "42"
+
+        with open(ruta, encoding="utf-8") as archivo:
+            (grabacion,) = json.load(archivo)["grabaciones"].values()
+        assert "apiKey" not in grabacion["parametros"]
+
+        # Lo grabado se reproduce después sin la API real
+        cliente = TestClient(crear_app(GrabacionesSpoonacular(ruta)))
+        assert cliente.get("/recipes/complexSearch", params=PARAMS).json()["results"][0]["id"] == 7
+    print("✅ Modo grabar")
+
+
+def test_cliente_contra_el_sustituto():
+    """El cliente de ai_menu funciona contra el sustituto montado en el proceso"""
+    async def buscar():
+        app = crear_app(_grabaciones_de_ejemplo(), ConfigSimulado(latencia="fija:0.01"))
+        cliente = ClienteSpoonacular("http://spoonacular.simulado", "clave", transport=httpx.ASGITransport(app=app))
+        try:
+            return await cliente.complex_search(PARAMS)
+        finally:
+            await cliente.cerrar()
+
+    resultados = asyncio.run(buscar())
+    assert [r["id"] for r in resultados] == [1, 2]
+    print("✅ Cliente de Spoonacular contra el sustituto")
+
+
+if __name__ == "__main__":
+    test_reproduce_grabacion()
+    test_errores_y_cuota_inyectados()
+    test_latencias()
+    test_modo_grabar()
+    test_cliente_contra_el_sustituto()
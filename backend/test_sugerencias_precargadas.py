@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba de la reserva de sugerencias precargadas
+Usa una búsqueda simulada: no hace peticiones reales
+"""
+
+import asyncio
+import threading
+
+from sugerencias_precargadas import ReservaSugerencias
+
+busquedas = []
+
+
+async def _buscar(cuisine: str, meal_type: str, numero: int):
+    """Devuelve `numero` títulos nuevos en cada llamada"""
+    busquedas.append((cuisine, meal_type))
+    await asyncio.sleep(0.01)
+    inicio = len(busquedas) * 100
+    return [f"{cuisine} {meal_type} {i}" for i in range(inicio, inicio + numero)]
+
+
+async def _fallar(cuisine: str, meal_type: str, numero: int):
+    busquedas.append((cuisine, meal_type))
+    raise RuntimeError("API caída")
+
+
+async def _esperar_rellenos():
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+
+
+def test_sin_trabajador_todo_va_en_directo():
+    """Sin iniciar la reserva, sacar() devuelve None y no pide nada"""
+    busquedas.clear()
+    reserva = ReservaSugerencias(_buscar)
+    assert reserva.sacar("italian", "dinner") is None
+    assert busquedas == []
+
+    reserva.agregar("italian", "dinner", ["Lasagna", "Lasagna", "Risotto"])
+    assert reserva.sacar("italian", "dinner") == "Lasagna"
+    assert reserva.estadisticas()["colas"] == {"italian/dinner": 1}
+    print("✅ Sin trabajador: búsqueda directa")
+
+
+def test_precarga_y_relleno_bajo_el_umbral():
+    """Las colas se precargan al iniciar y se rellenan al bajar del umbral, una búsqueda por clave"""
+    async def probar():
+        busquedas.clear()
+        reserva = ReservaSugerencias(_buscar, capacidad=5, umbral=2)
+        reserva.iniciar([("italian", "dinner"), ("asian", "main course")])
+        await _esperar_rellenos()
+        assert sorted(busquedas) == [("asian", "main course"), ("italian", "dinner")]
+        assert reserva.estadisticas()["colas"] == {"italian/dinner": 5, "asian/main course": 5}
+
+        # Sacar hasta quedar bajo el umbral pide un único relleno
+        servidas = [reserva.sacar("italian", "dinner") for _ in range(4)]
+        assert None not in servidas and len(set(servidas)) == 4
+        await _esperar_rellenos()
+        assert busquedas.count(("italian", "dinner")) == 2
+        assert reserva.estadisticas()["colas"]["italian/dinner"] == 5
+
+        await reserva.detener()
+        return reserva
+
+    reserva = asyncio.run(probar())
+    assert not reserva.estadisticas()["activa"]
+    print("✅ Precarga y relleno bajo el umbral")
+
+
+def test_cola_vacia_pide_relleno():
+    """Una clave nunca pedida devuelve None la primera vez y queda rellena después"""
+    async def probar():
+        busquedas.clear()
+        reserva = ReservaSugerencias(_buscar, capacidad=3, umbral=1)
+        reserva.iniciar()
+        assert reserva.sacar("mexican", "dinner") is None
+        await _esperar_rellenos()
+        assert reserva.sacar("mexican", "dinner") is not None
+        await reserva.detener()
+
+    asyncio.run(probar())
+    assert busquedas == [("mexican", "dinner")]
+    print("✅ Cola vacía: directa y relleno en segundo plano")
+
+
+def test_sacar_desde_otros_hilos():
+    """Los endpoints síncronos sacan desde el pool de hilos sin repetir sugerencias"""
+    async def probar():
+        busquedas.clear()
+        reserva = ReservaSugerencias(_buscar, capacidad=40, umbral=0)
+        reserva.iniciar([("spanish", "dinner")])
+        await _esperar_rellenos()
+
+        servidas = []
+        hilos = [threading.Thread(target=lambda: servidas.extend(reserva.sacar("spanish", "dinner") for _ in range(10)))
+                 for _ in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        await reserva.detener()
+        return servidas
+
+    servidas = asyncio.run(probar())
+    assert len(servidas) == 40 and len(set(servidas)) == 40
+    print("✅ Sacar desde varios hilos")
+
+
+def test_error_de_relleno():
+    """Un relleno fallido no rompe el trabajador y se reintenta en la siguiente petición"""
+    async def probar():
+        busquedas.clear()
+        reserva = ReservaSugerencias(_fallar, capacidad=3, umbral=1)
+        reserva.iniciar([("italian", "dinner")])
+        await _esperar_rellenos()
+        assert reserva.sacar("italian", "dinner") is None
+        await _esperar_rellenos()
+        estadisticas = reserva.estadisticas()
+        await reserva.detener()
+        return estadisticas
+
+    estadisticas = asyncio.run(probar())
+    assert estadisticas["errores"] == 2
+    assert busquedas == [("italian", "dinner")] * 2
+    print("✅ Errores de relleno")
+
+
+if __name__ == "__main__":
+    test_sin_trabajador_todo_va_en_directo()
+    test_precarga_y_relleno_bajo_el_umbral()
+    test_cola_vacia_pide_relleno()
+    test_sacar_desde_otros_hilos()
+    test_error_de_relleno()
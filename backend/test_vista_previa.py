@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para la vista previa de menús en JSON y HTML
+Verifica que la semilla de la vista previa reproduce el mismo menú en el PDF
+"""
+
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+from pypdf import PdfReader
+
+import app
+import menu_vista_previa
+
+
+def test_vista_previa_dietas():
+    """La vista previa devuelve una semilla que reproduce el menú y su PDF"""
+    client = TestClient(app.app)
+
+    respuesta = client.get("/dieta-2/menu-semanal")
+    assert respuesta.status_code == 200
+    vista = respuesta.json()
+    assert len(vista["menu"]) == 7
+    semilla = vista["semilla"]
+
+    repetida = client.get("/dieta-2/menu-semanal", params={"semilla": semilla}).json()
+    assert repetida["menu"] == vista["menu"]
+
+    html = client.get("/dieta-2/menu-semanal/html", params={"semilla": semilla})
+    assert html.status_code == 200
+    assert "Miércoles" in html.text
+    assert f"semilla={semilla}" in html.text
+
+    pdf = client.get("/dieta-2/generar-menu-semanal-pdf", params={"semilla": semilla})
+    assert pdf.status_code == 200
+    texto = "".join(pagina.extract_text() for pagina in PdfReader(BytesIO(pdf.content)).pages)
+    assert vista["menu"][0]["comida"]["plato_principal"].split()[0] in texto
+
+    assert menu_vista_previa.estadisticas_cache()["dietas_json"]["hits"] >= 2
+    print("✅ Vista previa de dietas_2 reproducible")
+
+
+def test_vista_previa_igual_que_el_pdf():
+    """Cada celda de la vista previa lleva lo mismo que la del PDF: complementos y cantidades de las opciones"""
+    from menu_semanal_pdf_generator import MenuSemanalPDFGenerator
+
+    generador = MenuSemanalPDFGenerator()
+    vista = menu_vista_previa.vista_menu_dietas("aleatorio", 11)
+    for dia in vista["menu"]:
+        for comida in ("desayuno", "snack", "comida", "cena"):
+            celda_pdf = generador.formatear_texto_comida(dia[comida])
+            assert menu_vista_previa.formatear_comida_html(dia[comida]) == celda_pdf.replace("<br/>", "<br>")
+
+    comida = {
+        "plato_principal": "Merluza & patatas",
+        "detalles": "150gr",
+        "complementos": [{"nombre": "Pan", "cantidad": "20gr"}, {"nombre": "Fruta"}],
+    }
+    html = menu_vista_previa.formatear_comida_html(comida)
+    assert "Merluza &amp; patatas" in html
+    assert "<b>Complementos:</b><br>• Pan: 20gr<br>• Fruta<br>" in html
+
+    desayuno = {"tipo": "Opción 2", "alimentos": [
+        {"nombre": "Lácteo", "cantidad": "1 ración", "opciones": [{"tipo": "Yogur", "cantidad": "125gr"}, "Queso"]},
+    ]}
+    assert "Opciones: Yogur (125gr), Queso" in menu_vista_previa.formatear_comida_html(desayuno)
+    print("✅ Vista previa con el mismo formato que el PDF")
+
+
+def test_vista_previa_casa():
+    """La vista previa de casa es estable para una semilla y escapa el HTML"""
+    client = TestClient(app.app)
+
+    primera = client.get("/menu-casa/vista-previa", params={"semilla": 9}).json()
+    segunda = client.get("/menu-casa/vista-previa", params={"semilla": 9}).json()
+    assert primera["cristina"]["semana"] == segunda["cristina"]["semana"]
+
+    html = client.get("/menu-casa/vista-previa/html", params={"semilla": 9}).text
+    assert "CRISTINA" in html and "MARISA" in html
+    assert "<script" not in html
+
+    pdf = client.post("/generar-menu-casa", json={"semilla": 9})
+    assert pdf.status_code == 200
+    assert pdf.content.startswith(b"%PDF-")
+    print("✅ Vista previa de casa reproducible")
+
+
+if __name__ == "__main__":
+    test_vista_previa_dietas()
+    test_vista_previa_igual_que_el_pdf()
+    test_vista_previa_casa()